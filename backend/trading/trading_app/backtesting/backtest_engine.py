@@ -1,35 +1,51 @@
 
+import copy
 from datetime import datetime
 from decimal import Decimal
 from binance.client import Client
-from typing import Dict, List, Type
+from typing import Callable, Dict, List, Optional, Type, Union
 import pandas as pd
 import numpy as np
 from .data_feed import HistoricalDataFeed
-from ..strategies.base_strategy import BaseStrategy
+from .intrabar import IntrabarResolver, first_level_cross
+from .metrics import OnlineMetrics
+from .trade_ledger import TradeLedger
+from ..indicators.base import SIGNAL_BUY, SIGNAL_SELL
+from ..strategies.base_strategy import BaseStrategy, has_signals
+from ..strategies.market_context import MarketContext, accepts_context
 
 
 class BacktestResult:
     def __init__(self):
-        self.trades: List[Dict] = []
+        self.trades = TradeLedger()
         self.equity_curve: pd.Series = None
         self.metrics: Dict = {}
+        self.online = OnlineMetrics()
+        # État du moteur en fin de backtest (capital, position ouverte)
+        self.final_state: Dict = {}
 
     def calculate_metrics(self):
         """Calcule les métriques de performance du backtest"""
+        if self.equity_curve is None and self.online.bars:
+            # Courbe d'équité non conservée: métriques de l'accumulateur
+            self.metrics = self.online.metrics()
+            return
+
         if not self.trades:
             return
 
         # Métriques de base
-        total_trades = len(self.trades)
-        winning_trades = len([t for t in self.trades if t['pnl'] > 0])
+        pnl = self.trades.column('pnl')
+        total_trades = len(pnl)
+        winning_trades = int(np.count_nonzero(pnl > 0))
+        total_pnl = float(pnl.sum())
 
         self.metrics = {
             'total_trades': total_trades,
             'winning_trades': winning_trades,
             'win_rate': winning_trades / total_trades if total_trades > 0 else 0,
-            'total_pnl': sum(t['pnl'] for t in self.trades),
-            'avg_pnl': sum(t['pnl'] for t in self.trades) / total_trades if total_trades > 0 else 0,
+            'total_pnl': total_pnl,
+            'avg_pnl': total_pnl / total_trades if total_trades > 0 else 0,
             'max_drawdown': self._calculate_max_drawdown(),
             'sharpe_ratio': self._calculate_sharpe_ratio(),
             'sortino_ratio': self._calculate_sortino_ratio(),
@@ -72,20 +88,41 @@ class BacktestResult:
 
         return float(excess_returns.mean() / downside_returns.std() * np.sqrt(252))
 
+    def _calculate_risk_adjusted_return(self) -> float:
+        """Calcule le rendement total rapporté au drawdown maximum"""
+        if self.equity_curve is None or len(self.equity_curve) < 2:
+            return 0
+
+        total_return = self.equity_curve.iloc[-1] / self.equity_curve.iloc[0] - 1
+        max_drawdown = abs(self._calculate_max_drawdown())
+
+        if max_drawdown == 0:
+            return float(total_return)
+
+        return float(total_return / max_drawdown)
+
 
 class BacktestEngine:
+    # Bougies d'un MarketContext en boucle barre par barre (None: tout l'historique)
+    CONTEXT_LOOKBACK = 500
+
     def __init__(
             self,
             data_feed: HistoricalDataFeed,
             initial_capital: float = 10000.0,
-            commission: float = 0.001
+            commission: float = 0.001,
+            keep_equity_curve: bool = True,
+            result_cache=None
     ):
         self.data_feed = data_feed
         self.initial_capital = initial_capital
         self.commission = commission
+        self.keep_equity_curve = keep_equity_curve
+        self.result_cache = result_cache
         self.current_capital = initial_capital
         self.position = None
         self.result = BacktestResult()
+        self.intrabar_resolver = None
 
     def run(
             self,
@@ -93,52 +130,465 @@ class BacktestEngine:
             symbol: str,
             start_time: datetime,
             end_time: datetime,
-            interval: str = Client.KLINE_INTERVAL_1HOUR
+            interval: str = Client.KLINE_INTERVAL_1HOUR,
+            stop_loss_pct: Optional[float] = None,
+            take_profit_pct: Optional[float] = None,
+            intrabar_interval: Optional[str] = None
     ) -> BacktestResult:
         """
         Exécute le backtest d'une stratégie
+
+        Avec ``stop_loss_pct``/``take_profit_pct``, les niveaux sont testés
+        sur le haut/bas de chaque barre. Si ``intrabar_interval`` est fourni
+        (ex. '1m'), les barres fines ne sont chargées que pour les barres
+        qui franchissent un niveau, afin de dater et valoriser l'exécution.
         """
         # Récupération des données historiques
         data = self.data_feed.get_historical_data(
             symbol, start_time, end_time, interval
         )
 
+        return self.run_on_data(
+            strategy, data, symbol, interval,
+            stop_loss_pct=stop_loss_pct,
+            take_profit_pct=take_profit_pct,
+            intrabar_interval=intrabar_interval
+        )
+
+    def run_on_data(
+            self,
+            strategy: BaseStrategy,
+            data: pd.DataFrame,
+            symbol: str,
+            interval: str = Client.KLINE_INTERVAL_1HOUR,
+            stop_loss_pct: Optional[float] = None,
+            take_profit_pct: Optional[float] = None,
+            intrabar_interval: Optional[str] = None,
+            lookback: Optional[int] = CONTEXT_LOOKBACK
+    ) -> BacktestResult:
+        """
+        Simulation barre par barre sur des données déjà chargées
+
+        Les stratégies qui acceptent ``context`` reçoivent à chaque barre un
+        ``MarketContext`` des ``lookback`` dernières bougies connues (tout
+        l'historique si None) au lieu de les redemander à l'API. Les
+        signaux d'une stratégie qui expose ``generate_signals`` sont calculés
+        une seule fois sur ``data``; chaque contexte en reçoit le début, et
+        chaque entrée engage la fraction ``size`` de sa barre, comme en mode
+        vectorisé (mêmes niveaux de sortie, voir ``_exit_levels``).
+        """
+        stop_loss_pct, take_profit_pct = self._exit_levels(strategy, stop_loss_pct, take_profit_pct)
+        protective = stop_loss_pct is not None or take_profit_pct is not None
+        self.intrabar_resolver = None
+        if protective and intrabar_interval is not None:
+            self.intrabar_resolver = IntrabarResolver(
+                self.data_feed, symbol, interval, intrabar_interval
+            )
+
         equity_history = []
+        online = self.result.online
+        buy_context = accepts_context(strategy.should_buy)
+        sell_context = accepts_context(strategy.should_sell)
+        history_signals = None
+        allocation = np.full(len(data), 0.95)
+        if has_signals(strategy):
+            history_signals = strategy.generate_signals(data)
+            if len(history_signals) > 2:
+                allocation = np.broadcast_to(np.asarray(history_signals[2], dtype=float), (len(data),))
 
         # Simulation trade par trade
-        for timestamp, row in data.iterrows():
+        for i, (timestamp, row) in enumerate(data.iterrows()):
             current_price = float(row['close'])
+            context_kwargs = {}
+            if buy_context or sell_context:
+                start = 0 if lookback is None else max(0, i + 1 - lookback)
+                known = None
+                if history_signals is not None:
+                    known = {strategy: tuple(values[:i + 1] for values in history_signals)}
+                context_kwargs['context'] = MarketContext(
+                    symbol, interval, data.iloc[start:i + 1], Decimal(str(current_price)),
+                    signals=known
+                )
 
             # Mise à jour de la valeur du portfolio
-            equity_history.append(self._calculate_equity(current_price))
+            equity = self._calculate_equity(current_price)
+            online.update_equity(equity)
+            if self.keep_equity_curve:
+                equity_history.append(equity)
 
             # Vérification des signaux de trading
             if self.position is None:
-                if strategy.should_buy(symbol, Decimal(str(current_price))):
-                    self._enter_position(timestamp, current_price, symbol)
+                if strategy.should_buy(symbol, Decimal(str(current_price)),
+                                       **(context_kwargs if buy_context else {})):
+                    self._enter_position(timestamp, current_price, symbol, float(allocation[i]))
             else:
-                if strategy.should_sell(
+                fill = None
+                if protective and timestamp != self.position['entry_time']:
+                    fill = self._protective_fill(timestamp, row, stop_loss_pct, take_profit_pct)
+
+                if fill is not None:
+                    self._exit_position(*fill)
+                elif strategy.should_sell(
                         symbol,
                         Decimal(str(current_price)),
-                        Decimal(str(self.position['entry_price']))
+                        Decimal(str(self.position['entry_price'])),
+                        **(context_kwargs if sell_context else {})
                 ):
                     self._exit_position(timestamp, current_price)
 
         # Création de la courbe d'équité
-        self.result.equity_curve = pd.Series(
-            equity_history,
-            index=data.index,
-            name='equity'
-        )
+        if self.keep_equity_curve:
+            self.result.equity_curve = pd.Series(
+                equity_history,
+                index=data.index,
+                name='equity'
+            )
 
         # Calcul des métriques finales
         self.result.calculate_metrics()
 
         return self.result
 
+    def run_strategy(
+            self,
+            strategy: BaseStrategy,
+            data: pd.DataFrame,
+            symbol: str,
+            **kwargs
+    ) -> BacktestResult:
+        """
+        Mode vectorisé si la stratégie expose ``generate_signals``, boucle
+        barre par barre sinon; les deux modes donnent les mêmes trades.
+        ``intrabar_interval`` n'est pas pris en charge en mode vectorisé.
+        """
+        if has_signals(strategy):
+            if kwargs.get('intrabar_interval') is not None:
+                raise ValueError("Le mode vectorisé ne prend pas en charge intrabar_interval")
+            stop_loss_pct, take_profit_pct = self._exit_levels(
+                strategy, kwargs.get('stop_loss_pct'), kwargs.get('take_profit_pct')
+            )
+
+            signals = strategy.generate_signals(data)
+            entries, exits = signals[:2]
+            # Taille de position facultative (fraction du capital par barre)
+            allocation = signals[2] if len(signals) > 2 else 0.95
+            return self.run_vectorized(
+                data, entries, exits, symbol,
+                stop_loss_pct=stop_loss_pct,
+                take_profit_pct=take_profit_pct,
+                allocation=allocation
+            )
+        return self.run_on_data(strategy, data, symbol, **kwargs)
+
+    @staticmethod
+    def _exit_levels(strategy: BaseStrategy, stop_loss_pct: Optional[float],
+                     take_profit_pct: Optional[float]) -> tuple:
+        """
+        Stop-loss et take-profit du backtest: valeurs explicites, sinon ceux
+        d'une stratégie qui expose ``generate_signals`` (ses signaux ne les
+        contiennent pas)
+        """
+        if has_signals(strategy):
+            if stop_loss_pct is None:
+                stop_loss_pct = getattr(strategy, 'stop_loss_pct', None)
+            if take_profit_pct is None:
+                take_profit_pct = getattr(strategy, 'take_profit_pct', None)
+        return stop_loss_pct, take_profit_pct
+
+    def run_cached(
+            self,
+            strategy_class: Type[BaseStrategy],
+            params: Dict,
+            data: pd.DataFrame,
+            symbol: str,
+            strategy_factory: Optional[Callable[[], BaseStrategy]] = None,
+            **kwargs
+    ) -> BacktestResult:
+        """
+        Exécute ``run_strategy`` en mémorisant le résultat: un backtest déjà
+        joué (mêmes stratégie, paramètres, réglages et données) est restitué
+        depuis ``result_cache`` sans rejouer les barres.
+
+        Le backtest part de l'état initial du moteur (capital initial, sans
+        position); l'état final est restitué avec le résultat.
+        """
+        self.reset()
+        key = None
+        if self.result_cache is not None:
+            settings = dict(self.settings(), symbol=symbol, options=kwargs)
+            key = self.result_cache.key(strategy_class, params, settings, data)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.result = cached
+                self.current_capital = cached.final_state['capital']
+                self.position = copy.deepcopy(cached.final_state['position'])
+                return cached
+
+        strategy = strategy_factory() if strategy_factory else strategy_class(None, params)
+        result = self.run_strategy(strategy, data, symbol, **kwargs)
+        result.final_state = {
+            'capital': self.current_capital,
+            'position': copy.deepcopy(self.position)
+        }
+
+        if key is not None:
+            self.result_cache.put(key, result)
+        return result
+
+    def reset(self):
+        """Remet le moteur dans son état initial"""
+        self.current_capital = self.initial_capital
+        self.position = None
+        self.result = BacktestResult()
+
+    def settings(self) -> Dict:
+        """Réglages du moteur qui déterminent le résultat d'un backtest"""
+        return {
+            'capital': self.initial_capital,
+            'commission': self.commission,
+            'keep_equity_curve': self.keep_equity_curve
+        }
+
+    def run_vectorized(
+            self,
+            data: pd.DataFrame,
+            entries: np.ndarray,
+            exits: np.ndarray,
+            symbol: str,
+            stop_loss_pct: Optional[float] = None,
+            take_profit_pct: Optional[float] = None,
+            allocation: Union[float, np.ndarray] = 0.95
+    ) -> BacktestResult:
+        """
+        Exécute le backtest à partir de signaux d'entrée/sortie précalculés.
+
+        ``entries`` et ``exits`` sont des tableaux booléens alignés sur ``data``;
+        ``allocation`` (fraction du capital engagée) est une constante ou un
+        tableau aligné, lu à la barre de chaque entrée.
+        Les positions, exécutions, commissions et la courbe d'équité sont
+        calculées par opérations NumPy; seule la chaîne des trades est
+        parcourue. Les résultats sont identiques à ceux de ``run`` pour une
+        stratégie qui émet les mêmes signaux: stop-loss et take-profit sont
+        exécutés sur le haut/bas des barres, comme dans la boucle.
+        """
+        if self.position is not None:
+            raise ValueError("Le mode vectorisé exige une position à plat")
+
+        close = data['close'].to_numpy(dtype=float)
+        open_ = data['open'].to_numpy(dtype=float)
+        high = data['high'].to_numpy(dtype=float)
+        low = data['low'].to_numpy(dtype=float)
+        entries = np.asarray(entries, dtype=bool)
+        exits = np.asarray(exits, dtype=bool)
+        n = len(close)
+
+        if len(entries) != n or len(exits) != n:
+            raise ValueError("Les signaux doivent être alignés sur les données")
+        allocation = np.broadcast_to(np.asarray(allocation, dtype=float), (n,))
+
+        # Appariement des entrées et sorties
+        trades = self._match_signals(
+            open_, high, low, close, entries, exits, stop_loss_pct, take_profit_pct
+        )
+
+        # État du portefeuille après chaque événement
+        event_bars = []
+        event_cash = []
+        event_qty = []
+        closed_trades = []
+        capital = self.current_capital
+
+        for entry_idx, exit_idx, exit_price in trades:
+            entry_price = close[entry_idx]
+            position_size = capital * allocation[entry_idx]
+            quantity = position_size / entry_price
+            entry_commission = position_size * self.commission
+            holding_capital = capital - entry_commission
+
+            event_bars.append(entry_idx)
+            event_cash.append(holding_capital)
+            event_qty.append(quantity)
+
+            if exit_idx is None:
+                self.position = {
+                    'entry_time': data.index[entry_idx],
+                    'entry_price': entry_price,
+                    'quantity': quantity,
+                    'symbol': symbol,
+                    'commission': entry_commission
+                }
+                capital = holding_capital
+                break
+
+            exit_value = quantity * exit_price
+            commission_cost = exit_value * self.commission
+            pnl = (
+                    exit_value -
+                    (quantity * entry_price) -
+                    entry_commission -
+                    commission_cost
+            )
+            capital = exit_value - commission_cost
+
+            event_bars.append(exit_idx)
+            event_cash.append(capital)
+            event_qty.append(0.0)
+
+            self.result.online.add_trade(float(pnl))
+            closed_trades.append((
+                entry_idx, exit_idx, entry_price, exit_price, quantity, pnl,
+                pnl / (quantity * entry_price)
+            ))
+
+        # Enregistrement des trades clôturés en un seul bloc
+        if closed_trades:
+            columns = np.array(closed_trades)
+            bars = columns[:, :2].astype(np.int64)
+            self.result.trades.extend_columns(
+                symbol,
+                data.index.asi8[bars[:, 0]],
+                data.index.asi8[bars[:, 1]],
+                tz=data.index.tz,
+                entry_price=columns[:, 2],
+                exit_price=columns[:, 3],
+                quantity=columns[:, 4],
+                pnl=columns[:, 5],
+                **{'return': columns[:, 6]}
+            )
+
+        # Propagation de l'état: l'équité d'une barre est évaluée avant
+        # l'exécution des signaux de cette barre
+        last_event = np.full(n, -1)
+        last_event[event_bars] = np.arange(len(event_bars))
+        last_event = np.maximum.accumulate(last_event)
+
+        cash_after = np.where(
+            last_event >= 0,
+            np.asarray(event_cash + [0.0])[last_event],
+            self.current_capital
+        )
+        qty_after = np.where(
+            last_event >= 0,
+            np.asarray(event_qty + [0.0])[last_event],
+            0.0
+        )
+        cash_before = np.concatenate(([self.current_capital], cash_after[:-1]))
+        qty_before = np.concatenate(([0.0], qty_after[:-1]))
+        held = qty_before > 0
+
+        equity = np.where(held, qty_before * close + cash_before, cash_before)
+        self.current_capital = capital
+
+        self.result.online.update_equity_batch(equity)
+        if self.keep_equity_curve:
+            self.result.equity_curve = pd.Series(
+                equity,
+                index=data.index,
+                name='equity'
+            )
+        self.result.calculate_metrics()
+
+        return self.result
+
+    def run_signal_series(
+            self,
+            data: pd.DataFrame,
+            signal: np.ndarray,
+            symbol: str,
+            **kwargs
+    ) -> BacktestResult:
+        """
+        Exécute le backtest vectorisé à partir d'une série de codes de signal
+        (``IndicatorSeries.signal`` ou signal combiné de ``CompositeAnalysis``)
+        """
+        signal = np.asarray(signal)
+        return self.run_vectorized(
+            data, signal == SIGNAL_BUY, signal == SIGNAL_SELL, symbol, **kwargs
+        )
+
+    @staticmethod
+    def _match_signals(
+            open_: np.ndarray,
+            high: np.ndarray,
+            low: np.ndarray,
+            close: np.ndarray,
+            entries: np.ndarray,
+            exits: np.ndarray,
+            stop_loss_pct: Optional[float],
+            take_profit_pct: Optional[float]
+    ) -> List[tuple]:
+        """
+        Apparie chaque entrée à sa sortie (barre, prix): franchissement du
+        stop-loss/take-profit sur le haut/bas des barres suivant l'entrée,
+        prioritaire jusqu'à la barre du signal de sortie incluse, sinon
+        clôture de cette barre. Une position encore ouverte en fin de
+        période a une sortie ``None``.
+        """
+        n = len(close)
+        entry_bars = np.flatnonzero(entries)
+        exit_bars = np.flatnonzero(exits)
+        trades = []
+        next_bar = 0
+
+        while True:
+            k = np.searchsorted(entry_bars, next_bar)
+            if k == len(entry_bars):
+                break
+            entry_idx = int(entry_bars[k])
+
+            j = np.searchsorted(exit_bars, entry_idx, side='right')
+            exit_idx = int(exit_bars[j]) if j < len(exit_bars) else n
+
+            exit_price = close[exit_idx] if exit_idx < n else None
+
+            # Stop-loss / take-profit jusqu'à la barre du signal de sortie
+            if stop_loss_pct is not None or take_profit_pct is not None:
+                window = slice(entry_idx + 1, min(exit_idx + 1, n))
+                cross = first_level_cross(
+                    open_[window], high[window], low[window],
+                    *BacktestEngine._level_prices(close[entry_idx], stop_loss_pct, take_profit_pct)
+                )
+                if cross is not None:
+                    exit_idx = entry_idx + 1 + cross[0]
+                    exit_price = cross[1]
+
+            if exit_idx >= n:
+                trades.append((entry_idx, None, None))
+                break
+
+            trades.append((entry_idx, exit_idx, float(exit_price)))
+            next_bar = exit_idx + 1
+
+        return trades
+
+    def _protective_fill(self, timestamp, row: pd.Series,
+                         stop_loss_pct: Optional[float],
+                         take_profit_pct: Optional[float]) -> Optional[tuple]:
+        """Exécution stop-loss/take-profit dans la barre courante, ou None"""
+        stop_price, target_price = self._level_prices(
+            self.position['entry_price'], stop_loss_pct, take_profit_pct
+        )
+
+        if self.intrabar_resolver is not None:
+            return self.intrabar_resolver.resolve(timestamp, row, stop_price, target_price)
+
+        cross = first_level_cross(
+            np.array([row['open']]), np.array([row['high']]), np.array([row['low']]),
+            stop_price, target_price
+        )
+        return (timestamp, cross[1]) if cross is not None else None
+
+    @staticmethod
+    def _level_prices(entry_price: float, stop_loss_pct: Optional[float],
+                      take_profit_pct: Optional[float]) -> tuple:
+        """Prix du stop et de l'objectif d'une position longue (None si absent)"""
+        stop_price = entry_price * (1 - stop_loss_pct / 100) if stop_loss_pct is not None else None
+        target_price = entry_price * (1 + take_profit_pct / 100) if take_profit_pct is not None else None
+        return stop_price, target_price
+
     def _enter_position(self, timestamp: datetime, price: float, symbol: str, allocation: float = 0.95):
         """Ouvre une nouvelle position"""
-        position_size = self.current_capital * allocation  # 95% du capital
+        position_size = self.current_capital * allocation  # 95% du capital par défaut
         quantity = position_size / price
         commission_cost = position_size * self.commission
 
@@ -169,18 +619,17 @@ class BacktestEngine:
 
         self.current_capital = exit_value - commission_cost
 
-        trade_record = {
-            'entry_time': self.position['entry_time'],
-            'exit_time': timestamp,
-            'symbol': self.position['symbol'],
-            'entry_price': self.position['entry_price'],
-            'exit_price': price,
-            'quantity': self.position['quantity'],
-            'pnl': pnl,
-            'return': pnl / (self.position['quantity'] * self.position['entry_price'])
-        }
-
-        self.result.trades.append(trade_record)
+        self.result.trades.record(
+            self.position['entry_time'],
+            timestamp,
+            self.position['symbol'],
+            self.position['entry_price'],
+            price,
+            self.position['quantity'],
+            pnl,
+            pnl / (self.position['quantity'] * self.position['entry_price'])
+        )
+        self.result.online.add_trade(pnl)
         self.position = None
 
     def _calculate_equity(self, current_price: float) -> float:
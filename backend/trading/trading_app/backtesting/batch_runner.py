@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from .backtest_engine import BacktestEngine
+from ..strategies.base_strategy import BaseStrategy
+
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+@dataclass
+class BacktestJob:
+    """Descripteur de tâche: seul objet envoyé aux processus de calcul"""
+    strategy_class: Type[BaseStrategy]
+    symbol: str
+    params: Dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SharedArrayDescriptor:
+    """Référence à un bloc de mémoire partagée contenant les bougies d'un symbole"""
+    values_name: str
+    timestamps_name: str
+    length: int
+
+
+class SharedMarketData:
+    """
+    Charge une fois les tableaux OHLCV de chaque symbole en mémoire partagée.
+
+    Les processus de calcul s'y attachent par nom, sans sérialiser de
+    DataFrame: la mémoire reste constante quel que soit le nombre de cœurs.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.descriptors: Dict[str, SharedArrayDescriptor] = {}
+
+        for symbol, df in frames.items():
+            values = df[OHLCV_FIELDS].to_numpy(dtype=np.float64)
+            timestamps = df.index.asi8
+
+            values_block = self._share(values)
+            timestamps_block = self._share(timestamps)
+            self.descriptors[symbol] = SharedArrayDescriptor(
+                values_block.name, timestamps_block.name, len(df)
+            )
+
+    def _share(self, array: np.ndarray) -> shared_memory.SharedMemory:
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        self._blocks.append(block)
+        return block
+
+    def close(self):
+        """Libère les blocs (à appeler une fois les calculs terminés)"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> 'SharedMarketData':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_frame(descriptor: SharedArrayDescriptor) -> Tuple[pd.DataFrame, list]:
+    """
+    Reconstruit un DataFrame adossé à la mémoire partagée, sans copie.
+    Retourne aussi les blocs ouverts, qui doivent rester référencés.
+    """
+    values_block = shared_memory.SharedMemory(name=descriptor.values_name)
+    timestamps_block = shared_memory.SharedMemory(name=descriptor.timestamps_name)
+
+    # Le processus propriétaire gère seul la destruction des blocs
+    for block in (values_block, timestamps_block):
+        try:
+            resource_tracker.unregister(block._name, 'shared_memory')
+        except Exception:
+            pass
+
+    values = np.ndarray(
+        (descriptor.length, len(OHLCV_FIELDS)), dtype=np.float64, buffer=values_block.buf
+    )
+    timestamps = np.ndarray((descriptor.length,), dtype=np.int64, buffer=timestamps_block.buf)
+    values.flags.writeable = False
+
+    frame = pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(timestamps.view('datetime64[ns]'), name='timestamp'),
+        columns=OHLCV_FIELDS,
+        copy=False
+    )
+    return frame, [values_block, timestamps_block]
+
+
+# État des processus de calcul, initialisé une fois par processus
+_worker_descriptors: Dict[str, SharedArrayDescriptor] = {}
+_worker_frames: Dict[str, pd.DataFrame] = {}
+_worker_blocks: list = []
+_worker_settings: Dict = {}
+
+
+def _init_worker(descriptors: Dict[str, SharedArrayDescriptor], settings: Dict):
+    _worker_descriptors.clear()
+    _worker_descriptors.update(descriptors)
+    _worker_frames.clear()
+    _worker_settings.clear()
+    _worker_settings.update(settings)
+
+
+def _worker_frame(symbol: str) -> pd.DataFrame:
+    if symbol not in _worker_frames:
+        frame, blocks = attach_frame(_worker_descriptors[symbol])
+        _worker_frames[symbol] = frame
+        _worker_blocks.extend(blocks)
+    return _worker_frames[symbol]
+
+
+def run_job(job: BacktestJob, frame: pd.DataFrame, initial_capital: float,
+            commission: float) -> Dict:
+    """Exécute une tâche de backtest et retourne une ligne de résultats"""
+    engine = BacktestEngine(None, initial_capital, commission)
+    result = engine.run_strategy(job.strategy_class(None, job.params), frame, job.symbol)
+
+    row = {'strategy': job.strategy_class.__name__, 'symbol': job.symbol}
+    row.update(job.params)
+    row.update(result.metrics)
+    return row
+
+
+def _run_worker_job(job: BacktestJob) -> Dict:
+    return run_job(
+        job,
+        _worker_frame(job.symbol),
+        _worker_settings['initial_capital'],
+        _worker_settings['commission']
+    )
+
+
+class BatchBacktestRunner:
+    """
+    Exécute un lot de backtests (stratégies x symboles x paramètres) en
+    parallèle sur des données de marché en mémoire partagée
+    """
+
+    def __init__(self,
+                 frames: Dict[str, pd.DataFrame],
+                 initial_capital: float = 10000.0,
+                 commission: float = 0.001,
+                 max_workers: Optional[int] = None):
+        self.frames = frames
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.max_workers = max_workers
+
+    def run(self, jobs: List[BacktestJob]) -> pd.DataFrame:
+        """Retourne une ligne de métriques par tâche, dans l'ordre des tâches"""
+        settings = {
+            'initial_capital': self.initial_capital,
+            'commission': self.commission
+        }
+        symbols = {job.symbol for job in jobs}
+
+        with SharedMarketData({s: self.frames[s] for s in symbols}) as market_data:
+            with ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(market_data.descriptors, settings)
+            ) as executor:
+                rows = list(executor.map(_run_worker_job, jobs, chunksize=4))
+
+        return pd.DataFrame(rows)
@@ -1,15 +1,21 @@
-
 from typing import Dict, List, Optional
+import time
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from binance.client import Client
 
+from .kline_store import (CALENDAR_INTERVALS, STORED_COLUMNS, KlineStore, arrays_to_frame,
+                          interval_to_ms, klines_to_arrays)
+from .range_cache import KlineRangeCache
+from .resampler import bucket_start, resample_arrays, source_intervals
+
 
 class HistoricalDataFeed:
-    def __init__(self, binance_service):
+    def __init__(self, binance_service, store: Optional[KlineStore] = None):
         self.binance_service = binance_service
-        self.data_cache = {}
+        self.store = store
+        self.data_cache = KlineRangeCache()
 
     def get_historical_data(
             self,
@@ -19,33 +25,97 @@ class HistoricalDataFeed:
             interval: str = Client.KLINE_INTERVAL_1HOUR
     ) -> pd.DataFrame:
         """
-        Récupère les données historiques de Binance et les met en cache
+        Récupère les données historiques de Binance et les met en cache.
+
+        Une fenêtre contenue dans une plage déjà en cache est servie sans
+        copie; seules les portions manquantes sont récupérées. Les bougies
+        mensuelles (durée variable) sont téléchargées directement, sans
+        stockage ni cache de plages.
         """
-        cache_key = f"{symbol}_{interval}_{start_time.date()}_{end_time.date()}"
+        start_ms, end_ms = self._day_range_ms(start_time, end_time)
 
-        if cache_key in self.data_cache:
-            return self.data_cache[cache_key]
+        if interval in CALENDAR_INTERVALS:
+            data = arrays_to_frame(self._download_klines(symbol, interval, start_ms, end_ms))
+        else:
+            data = self.data_cache.get(
+                symbol, interval, start_ms, end_ms,
+                lambda gap_start, gap_end: self._fetch_range(symbol, interval, gap_start, gap_end)
+            )
+        # Identifie les données pour le cache d'indicateurs
+        data.attrs.update(symbol=symbol, interval=interval)
+        return data
 
-        klines = self.binance_service.client.get_historical_klines(
-            symbol=symbol,
-            interval=interval,
-            start_str=start_time.strftime('%Y-%m-%d'),
-            end_str=end_time.strftime('%Y-%m-%d')
-        )
+    def _fetch_range(self, symbol: str, interval: str,
+                     start_ms: int, end_ms: int) -> pd.DataFrame:
+        """Récupère une plage [start_ms, end_ms) depuis le disque ou le réseau"""
+        if self.store is not None:
+            derived = self._resample_from_store(symbol, interval, start_ms, end_ms)
+            if derived is not None:
+                return derived
+
+            for gap_start, gap_end in self.store.missing_ranges(symbol, interval, start_ms, end_ms):
+                self._download_range(symbol, interval, gap_start, gap_end)
+
+            return arrays_to_frame(self.store.read(symbol, interval, start_ms, end_ms))
+
+        return arrays_to_frame(self._download_klines(symbol, interval, start_ms, end_ms))
+
+    def _resample_from_store(self, symbol: str, interval: str,
+                             start_ms: int, end_ms: int) -> Optional[pd.DataFrame]:
+        """
+        Construit la plage à partir du plus fin intervalle entièrement stocké,
+        sans téléchargement; None si aucun ne couvre la plage
+        """
+        if not self.store.missing_ranges(symbol, interval, start_ms, end_ms):
+            return None
+
+        # Bougies larges complètes: la lecture source couvre des bougies entières
+        step = interval_to_ms(interval)
+        source_start = int(bucket_start(np.array([start_ms]), interval)[0])
+        source_end = int(bucket_start(np.array([end_ms - 1]), interval)[0]) + step
+
+        for source in source_intervals(interval):
+            if not self.store.missing_ranges(symbol, source, source_start, source_end):
+                derived = resample_arrays(
+                    self.store.read(symbol, source, source_start, source_end), interval
+                )
+                keep = (derived['timestamp'] >= start_ms) & (derived['timestamp'] < end_ms)
+                return arrays_to_frame({name: values[keep] for name, values in derived.items()})
+        return None
 
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades_count',
-            'taker_buy_volume', 'taker_buy_quote_volume', 'ignored'
-        ])
+    def _download_range(self, symbol: str, interval: str, start_ms: int, end_ms: int):
+        """Télécharge une plage [start_ms, end_ms) et l'enregistre sur disque"""
+        arrays = self._download_klines(symbol, interval, start_ms, end_ms)
 
-        # Conversion des types
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Seules les bougies clôturées sont persistées
+        now_ms = int(time.time() * 1000)
+        closed = arrays['close_time'] < now_ms
+        covered_end = min(end_ms, now_ms)
+        if not closed.all():
+            covered_end = min(covered_end, int(arrays['timestamp'][~closed].min()))
 
-        df.set_index('timestamp', inplace=True)
-        self.data_cache[cache_key] = df
+        self.store.write(
+            symbol, interval,
+            {name: values[closed] for name, values in arrays.items()},
+            (start_ms, covered_end)
+        )
+
+    def _download_klines(self, symbol: str, interval: str,
+                         start_ms: int, end_ms: int) -> Dict[str, np.ndarray]:
+        """
+        Bougies de [start_ms, end_ms): pages téléchargées en parallèle par
+        le service, sous son budget de poids partagé
+        """
+        pages = list(self.binance_service.get_kline_arrays_range(
+            symbol, interval, start_ms, end_ms - 1
+        ))
+        if not pages:
+            return klines_to_arrays([])
+        return {name: np.concatenate([page[name] for page in pages]) for name in STORED_COLUMNS}
 
-        return df
\ No newline at end of file
+    @staticmethod
+    def _day_range_ms(start_time: datetime, end_time: datetime) -> tuple:
+        """Plage [début, fin) en millisecondes couvrant les jours demandés (UTC)"""
+        start_day = datetime.combine(start_time.date(), datetime.min.time(), tzinfo=timezone.utc)
+        end_day = datetime.combine(end_time.date(), datetime.min.time(), tzinfo=timezone.utc)
+        return int(start_day.timestamp() * 1000), int(end_day.timestamp() * 1000) + 1
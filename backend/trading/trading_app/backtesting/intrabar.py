@@ -0,0 +1,95 @@
+from datetime import timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from binance.client import Client
+
+from .data_feed import HistoricalDataFeed
+from .kline_store import interval_to_ms
+
+Fill = Tuple[pd.Timestamp, float]
+
+
+def first_level_cross(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                      stop_price: Optional[float], target_price: Optional[float]) -> Optional[Tuple[int, float]]:
+    """
+    Première barre franchissant le stop ou l'objectif d'une position longue.
+
+    Retourne (position, prix d'exécution): un gap à l'ouverture est exécuté
+    au prix d'ouverture; si les deux niveaux sont touchés dans la même
+    barre, le stop est retenu (hypothèse prudente).
+    """
+    stop_hit = low <= stop_price if stop_price is not None else np.zeros(len(low), dtype=bool)
+    target_hit = high >= target_price if target_price is not None else np.zeros(len(high), dtype=bool)
+    hit = stop_hit | target_hit
+    if not hit.any():
+        return None
+
+    i = int(np.argmax(hit))
+    if stop_hit[i]:
+        return i, float(min(open_[i], stop_price))
+    return i, float(max(open_[i], target_price))
+
+
+class IntrabarResolver:
+    """
+    Résout les exécutions stop/objectif à l'intérieur d'une barre large.
+
+    Les barres fines (1m par défaut) ne sont chargées, via le flux de
+    données et son stockage local, que pour les barres larges dont le
+    haut/bas franchit un niveau actif.
+    """
+
+    def __init__(
+            self,
+            data_feed: HistoricalDataFeed,
+            symbol: str,
+            interval: str,
+            fine_interval: str = Client.KLINE_INTERVAL_1MINUTE
+    ):
+        self.data_feed = data_feed
+        self.symbol = symbol
+        self.interval_ms = interval_to_ms(interval)
+        self.fine_interval = fine_interval
+        self.drilldowns = 0
+
+    def resolve(self, bar_time: pd.Timestamp, bar: pd.Series,
+                stop_price: Optional[float], target_price: Optional[float]) -> Optional[Fill]:
+        """Exécution (horodatage, prix) dans la barre ``bar_time``, ou None"""
+        coarse = first_level_cross(
+            np.array([bar['open']]), np.array([bar['high']]), np.array([bar['low']]),
+            stop_price, target_price
+        )
+        if coarse is None:
+            return None
+
+        fine = self._fine_bars(bar_time)
+        if fine.empty:
+            return bar_time, coarse[1]
+
+        cross = first_level_cross(
+            fine['open'].to_numpy(dtype=float),
+            fine['high'].to_numpy(dtype=float),
+            fine['low'].to_numpy(dtype=float),
+            stop_price, target_price
+        )
+        if cross is None:
+            return None
+        return fine.index[cross[0]], cross[1]
+
+    def _fine_bars(self, bar_time: pd.Timestamp) -> pd.DataFrame:
+        """Barres fines comprises dans la barre large (chargées par jour)"""
+        self.drilldowns += 1
+        bar_end = bar_time + pd.Timedelta(milliseconds=self.interval_ms)
+        fine = self.data_feed.get_historical_data(
+            self.symbol,
+            bar_time.to_pydatetime(),
+            (bar_end + timedelta(days=1)).to_pydatetime(),
+            self.fine_interval
+        )
+
+        timestamps = fine.index.asi8
+        lo = timestamps.searchsorted(bar_time.value, side='left')
+        hi = timestamps.searchsorted(bar_end.value, side='left')
+        return fine.iloc[lo:hi]
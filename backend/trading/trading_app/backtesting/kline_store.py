@@ -0,0 +1,300 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou entre processus
+    fcntl = None
+
+
+# Colonnes renvoyées par l'API klines de Binance
+KLINE_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_volume', 'trades_count',
+    'taker_buy_volume', 'taker_buy_quote_volume', 'ignored'
+]
+
+# Colonnes persistées et leur type
+STORED_COLUMNS = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_volume': np.float64,
+    'trades_count': np.int64,
+    'taker_buy_volume': np.float64,
+    'taker_buy_quote_volume': np.float64
+}
+
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 3_600_000,
+    '2h': 2 * 3_600_000,
+    '4h': 4 * 3_600_000,
+    '6h': 6 * 3_600_000,
+    '8h': 8 * 3_600_000,
+    '12h': 12 * 3_600_000,
+    '1d': 86_400_000,
+    '3d': 3 * 86_400_000,
+    '1w': 7 * 86_400_000
+}
+
+# Intervalles calendaires, de durée variable: hors stockage et cache de plages
+CALENDAR_INTERVALS = {'1M'}
+
+Range = Tuple[int, int]
+
+
+def interval_to_ms(interval: str) -> int:
+    """Durée d'un intervalle de bougie en millisecondes"""
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Intervalle non supporté: {interval}")
+    return INTERVAL_MS[interval]
+
+
+def merge_ranges(ranges: Sequence[Range]) -> List[Range]:
+    """Fusionne des intervalles semi-ouverts [début, fin) qui se chevauchent ou se touchent"""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_ranges(start: int, end: int, covered: Sequence[Range]) -> List[Range]:
+    """Retourne les portions de [start, end) absentes des intervalles couverts"""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def klines_to_arrays(klines: List[List]) -> Dict[str, np.ndarray]:
+    """Convertit la réponse brute de l'API en colonnes NumPy typées"""
+    if len(klines) == 0:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in STORED_COLUMNS.items()}
+
+    raw = np.asarray(klines, dtype=object)
+    return {
+        name: raw[:, KLINE_COLUMNS.index(name)].astype(np.float64).astype(dtype)
+        for name, dtype in STORED_COLUMNS.items()
+    }
+
+
+def arrays_to_frame(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Construit le DataFrame indexé par horodatage utilisé par les backtests"""
+    df = pd.DataFrame({
+        name: values for name, values in arrays.items() if name != 'timestamp'
+    })
+    df.index = pd.to_datetime(arrays['timestamp'], unit='ms')
+    df.index.name = 'timestamp'
+    return df
+
+
+class KlineStore:
+    """
+    Stockage colonnaire des bougies sur disque.
+
+    Les données sont partitionnées par symbole, intervalle et mois, une
+    colonne par fichier ``.npy`` lu en mémoire mappée::
+
+        <root>/<SYMBOL>/<interval>/<YYYY-MM>/<colonne>.npy
+        <root>/<SYMBOL>/<interval>/coverage.json
+
+    ``coverage.json`` liste les plages [début, fin) en millisecondes déjà
+    téléchargées, ce qui permet de ne récupérer que les plages manquantes.
+
+    Les écritures d'un même (symbole, intervalle) sont sérialisées par un
+    verrou de fichier, entre workers comme entre threads. ``<YYYY-MM>`` est
+    un lien vers un répertoire de version complet, remplacé d'un bloc: un
+    lecteur ne voit jamais des colonnes de longueurs différentes.
+    """
+
+    def __init__(self, root: str):
+        self.root = str(root)
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def _coverage_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self._series_dir(symbol, interval), 'coverage.json')
+
+    @contextmanager
+    def _lock(self, symbol: str, interval: str):
+        """Verrou exclusif des écritures d'un (symbole, intervalle)"""
+        directory = self._series_dir(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, '.lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def coverage(self, symbol: str, interval: str) -> List[Range]:
+        """Plages déjà présentes sur disque"""
+        path = self._coverage_path(symbol, interval)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [tuple(r) for r in json.load(f)]
+
+    def missing_ranges(self, symbol: str, interval: str,
+                       start_ms: int, end_ms: int) -> List[Range]:
+        """Plages de [start_ms, end_ms) à télécharger"""
+        return subtract_ranges(start_ms, end_ms, self.coverage(symbol, interval))
+
+    def read(self, symbol: str, interval: str,
+             start_ms: int, end_ms: int) -> Dict[str, np.ndarray]:
+        """Lit les bougies dont l'ouverture est dans [start_ms, end_ms)"""
+        chunks = {name: [] for name in STORED_COLUMNS}
+
+        for month in self._months(start_ms, end_ms):
+            partition = self._load_partition(symbol, interval, month, mmap=True)
+            if partition is None:
+                continue
+            timestamps = partition['timestamp']
+            lo = np.searchsorted(timestamps, start_ms, side='left')
+            hi = np.searchsorted(timestamps, end_ms, side='left')
+            for name in STORED_COLUMNS:
+                chunks[name].append(partition[name][lo:hi])
+
+        return {
+            name: (np.concatenate(parts) if parts else np.empty(0, dtype=STORED_COLUMNS[name]))
+            for name, parts in chunks.items()
+        }
+
+    def write(self, symbol: str, interval: str,
+              arrays: Dict[str, np.ndarray], covered: Range):
+        """Fusionne des bougies dans les partitions et enregistre la plage couverte"""
+        with self._lock(symbol, interval):
+            timestamps = arrays['timestamp']
+            if len(timestamps):
+                months = self._month_keys(timestamps)
+                for month in np.unique(months):
+                    mask = months == month
+                    self._merge_partition(
+                        symbol, interval, str(month),
+                        {name: values[mask] for name, values in arrays.items()}
+                    )
+
+            coverage = merge_ranges(self.coverage(symbol, interval) + [tuple(covered)])
+            self._atomic_write(
+                self._coverage_path(symbol, interval),
+                lambda f: f.write(json.dumps(coverage).encode())
+            )
+
+    def _merge_partition(self, symbol: str, interval: str, month: str,
+                         arrays: Dict[str, np.ndarray]):
+        existing = self._load_partition(symbol, interval, month, mmap=False)
+        if existing is not None:
+            # Les nouvelles bougies remplacent les anciennes de même horodatage
+            arrays = {
+                name: np.concatenate([existing[name], arrays[name]])
+                for name in STORED_COLUMNS
+            }
+        timestamps = arrays['timestamp']
+        _, first = np.unique(timestamps[::-1], return_index=True)
+        order = len(timestamps) - 1 - first
+
+        # Toutes les colonnes sont écrites dans une nouvelle version, publiée ensuite
+        series_dir = self._series_dir(symbol, interval)
+        version = tempfile.mkdtemp(dir=series_dir, prefix=f'.{month}.')
+        try:
+            for name, dtype in STORED_COLUMNS.items():
+                values = np.ascontiguousarray(arrays[name][order], dtype=dtype)
+                np.save(os.path.join(version, f'{name}.npy'), values)
+            self._publish(series_dir, month, version)
+        except BaseException:
+            shutil.rmtree(version, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def _publish(series_dir: str, month: str, version: str):
+        """Fait pointer ``<month>`` sur ``version`` (remplacement atomique du lien)"""
+        path = os.path.join(series_dir, month)
+        link = f'{version}.link'
+        os.symlink(os.path.basename(version), link)
+
+        previous = None
+        if os.path.islink(path):
+            previous = os.path.realpath(path)
+        elif os.path.isdir(path):
+            # Partition d'un ancien format (répertoire réel)
+            previous = f'{version}.old'
+            os.rename(path, previous)
+        os.replace(link, path)
+
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def _load_partition(self, symbol: str, interval: str, month: str,
+                        mmap: bool) -> Optional[Dict[str, np.ndarray]]:
+        directory = os.path.join(self._series_dir(symbol, interval), month)
+        for attempt in range(3):
+            if not os.path.isdir(directory):
+                return None
+            # Lien résolu une fois: toutes les colonnes viennent de la même version
+            version = os.path.realpath(directory)
+            try:
+                return {
+                    name: np.load(os.path.join(version, f'{name}.npy'),
+                                  mmap_mode='r' if mmap else None)
+                    for name in STORED_COLUMNS
+                }
+            except FileNotFoundError:
+                # Version remplacée puis supprimée pendant la lecture
+                if attempt == 2:
+                    raise
+
+    @staticmethod
+    def _month_keys(timestamps: np.ndarray) -> np.ndarray:
+        return timestamps.astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+
+    @staticmethod
+    def _months(start_ms: int, end_ms: int) -> List[str]:
+        first = np.datetime64(int(start_ms), 'ms').astype('datetime64[M]')
+        last = np.datetime64(int(max(end_ms - 1, start_ms)), 'ms').astype('datetime64[M]')
+        return [str(month) for month in np.arange(first, last + 1)]
+
+    @staticmethod
+    def _atomic_write(path: str, writer):
+        """Écrit via un fichier temporaire pour ne jamais exposer un fichier partiel"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                writer(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,151 @@
+from typing import Dict
+
+import numpy as np
+
+
+class RunningVariance:
+    """Moyenne et variance en ligne (Welford), fusion par lots (Chan)"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def update_batch(self, values: np.ndarray):
+        """Intègre un lot de valeurs en une seule passe vectorielle"""
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def std(self) -> float:
+        """Écart-type d'échantillon (ddof=1), comme pandas"""
+        if self.count < 2:
+            return float('nan')
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+class OnlineMetrics:
+    """
+    Accumulateur des métriques de backtest, mis à jour à chaque barre et à
+    chaque trade.
+
+    Produit à tout moment le même dictionnaire que
+    ``BacktestResult.calculate_metrics`` sans conserver la courbe d'équité
+    ni parcourir les trades.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.02, periods: int = 252):
+        self.risk_free_rate = risk_free_rate
+        self.periods = periods
+
+        self.bars = 0
+        self.first_equity = None
+        self.last_equity = None
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+
+        self.returns = RunningVariance()
+        self.downside = RunningVariance()
+
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.total_pnl = 0.0
+
+    def update_equity(self, equity: float):
+        """Intègre la valeur du portefeuille d'une nouvelle barre"""
+        if self.last_equity is None:
+            self.first_equity = equity
+        else:
+            ret = equity / self.last_equity - 1
+            self.returns.update(ret)
+            excess = ret - self.risk_free_rate / self.periods
+            if excess < 0:
+                self.downside.update(excess)
+
+        self.peak = max(self.peak, equity)
+        self.max_drawdown = min(self.max_drawdown, (equity - self.peak) / self.peak)
+        self.last_equity = equity
+        self.bars += 1
+
+    def update_equity_batch(self, equity: np.ndarray):
+        """Intègre une suite de valeurs d'équité (mode vectorisé)"""
+        equity = np.asarray(equity, dtype=float)
+        if len(equity) == 0:
+            return
+
+        previous = equity[:-1] if self.last_equity is None else np.concatenate(([self.last_equity], equity[:-1]))
+        current = equity[1:] if self.last_equity is None else equity
+        returns = current / previous - 1
+        excess = returns - self.risk_free_rate / self.periods
+
+        self.returns.update_batch(returns)
+        self.downside.update_batch(excess[excess < 0])
+
+        peaks = np.maximum.accumulate(np.maximum(equity, self.peak))
+        self.max_drawdown = min(self.max_drawdown, float(((equity - peaks) / peaks).min()))
+        self.peak = float(peaks[-1])
+
+        if self.first_equity is None:
+            self.first_equity = float(equity[0])
+        self.last_equity = float(equity[-1])
+        self.bars += len(equity)
+
+    def add_trade(self, pnl: float):
+        """Intègre le PnL d'un trade clôturé"""
+        self.total_trades += 1
+        self.total_pnl += pnl
+        if pnl > 0:
+            self.winning_trades += 1
+
+    def sharpe_ratio(self) -> float:
+        if self.returns.count < 2:
+            return 0
+        excess_mean = self.returns.mean - self.risk_free_rate / self.periods
+        return float(excess_mean / self.returns.std() * np.sqrt(self.periods))
+
+    def sortino_ratio(self) -> float:
+        if self.downside.count < 2:
+            return 0
+        excess_mean = self.returns.mean - self.risk_free_rate / self.periods
+        return float(excess_mean / self.downside.std() * np.sqrt(self.periods))
+
+    def risk_adjusted_return(self) -> float:
+        if self.bars < 2:
+            return 0
+        total_return = self.last_equity / self.first_equity - 1
+        if self.max_drawdown == 0:
+            return float(total_return)
+        return float(total_return / abs(self.max_drawdown))
+
+    def metrics(self) -> Dict:
+        """Métriques courantes (vide tant qu'aucun trade n'est clôturé)"""
+        if not self.total_trades:
+            return {}
+
+        return {
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'win_rate': self.winning_trades / self.total_trades,
+            'total_pnl': self.total_pnl,
+            'avg_pnl': self.total_pnl / self.total_trades,
+            'max_drawdown': float(self.max_drawdown) if self.bars else 0,
+            'sharpe_ratio': self.sharpe_ratio(),
+            'sortino_ratio': self.sortino_ratio(),
+            'risk_adjusted_return': self.risk_adjusted_return()
+        }
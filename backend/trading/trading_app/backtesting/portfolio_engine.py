@@ -0,0 +1,223 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from binance.client import Client
+
+from .backtest_engine import BacktestResult
+from .data_feed import HistoricalDataFeed
+
+PANEL_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+SignalFunction = Callable[[Dict[str, pd.DataFrame]], Tuple[pd.DataFrame, pd.DataFrame]]
+
+
+def build_panel(frames: Dict[str, pd.DataFrame],
+                fields: List[str] = PANEL_FIELDS) -> Dict[str, pd.DataFrame]:
+    """
+    Aligne les bougies de plusieurs symboles sur un index temporel commun.
+
+    Retourne un dictionnaire champ -> matrice (temps x symbole); les barres
+    absentes d'un symbole (avant sa cotation, trous) valent NaN.
+    """
+    index = frames[next(iter(frames))].index
+    for df in frames.values():
+        index = index.union(df.index)
+
+    return {
+        field: pd.DataFrame(
+            {symbol: df[field].reindex(index) for symbol, df in frames.items()},
+            index=index
+        )
+        for field in fields
+    }
+
+
+def strategy_signals(strategy) -> SignalFunction:
+    """
+    ``SignalFunction`` appliquant ``strategy.generate_signals`` aux barres
+    cotées de chaque symbole du panel (la taille de position renvoyée est
+    ignorée: l'allocation relève du moteur de portefeuille)
+    """
+    def signal_fn(panel: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        close = panel['close']
+        entries = np.zeros(close.shape, dtype=bool)
+        exits = np.zeros(close.shape, dtype=bool)
+        for j, symbol in enumerate(close.columns):
+            quoted = close[symbol].notna().to_numpy()
+            frame = pd.DataFrame(
+                {field: matrix[symbol].to_numpy()[quoted] for field, matrix in panel.items()},
+                index=close.index[quoted]
+            )
+            symbol_entries, symbol_exits = strategy.generate_signals(frame)[:2]
+            entries[quoted, j] = symbol_entries
+            exits[quoted, j] = symbol_exits
+        return (pd.DataFrame(entries, index=close.index, columns=close.columns),
+                pd.DataFrame(exits, index=close.index, columns=close.columns))
+    return signal_fn
+
+
+class PortfolioBacktestResult(BacktestResult):
+    def __init__(self):
+        super().__init__()
+        self.symbols: List[str] = []
+
+    @property
+    def symbol_trades(self) -> Dict[str, List[Dict]]:
+        """Trades regroupés par symbole"""
+        return {symbol: self.trades.for_symbol(symbol) for symbol in self.symbols}
+
+
+class PortfolioBacktestEngine:
+    """
+    Backtest multi-symboles avec un capital commun.
+
+    Tous les symboles partagent un index temporel; à chaque barre, les
+    sorties puis les entrées sont évaluées pour l'ensemble des symboles par
+    opérations vectorielles. L'allocation de chaque entrée suit un poids par
+    symbole appliqué à l'équité courante, dans la limite du cash disponible.
+    """
+
+    def __init__(
+            self,
+            data_feed: HistoricalDataFeed,
+            initial_capital: float = 10000.0,
+            commission: float = 0.001,
+            allocation: Union[str, Dict[str, float]] = 'equal',
+            capital_fraction: float = 0.95
+    ):
+        self.data_feed = data_feed
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.allocation = allocation
+        self.capital_fraction = capital_fraction
+
+    def run(
+            self,
+            symbols: List[str],
+            signal_fn: SignalFunction,
+            start_time: datetime,
+            end_time: datetime,
+            interval: str = Client.KLINE_INTERVAL_1HOUR,
+            **kwargs
+    ) -> PortfolioBacktestResult:
+        """
+        Exécute le backtest: ``signal_fn(panel)`` reçoit les matrices de prix
+        et retourne les matrices booléennes (entrées, sorties)
+        """
+        frames = {
+            symbol: self.data_feed.get_historical_data(symbol, start_time, end_time, interval)
+            for symbol in symbols
+        }
+        panel = build_panel(frames)
+        entries, exits = signal_fn(panel)
+        return self.run_on_panel(panel, entries, exits, **kwargs)
+
+    def run_on_panel(
+            self,
+            panel: Dict[str, pd.DataFrame],
+            entries: pd.DataFrame,
+            exits: pd.DataFrame,
+            stop_loss_pct: Optional[float] = None,
+            take_profit_pct: Optional[float] = None
+    ) -> PortfolioBacktestResult:
+        """Simule le portefeuille sur des matrices de prix et de signaux alignées"""
+        close_frame = panel['close']
+        symbols = list(close_frame.columns)
+        index = close_frame.index
+
+        close = close_frame.to_numpy(dtype=float)
+        valuation = close_frame.ffill().to_numpy(dtype=float)
+        tradable = ~np.isnan(close)
+        entries = entries.reindex(index=index, columns=symbols).fillna(False).to_numpy(dtype=bool)
+        exits = exits.reindex(index=index, columns=symbols).fillna(False).to_numpy(dtype=bool)
+        weights = self._weights(symbols)
+
+        n_bars, n_symbols = close.shape
+        quantity = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        entry_commission = np.zeros(n_symbols)
+        entry_bar = np.full(n_symbols, -1)
+        cash = self.initial_capital
+        equity_history = np.empty(n_bars)
+
+        result = PortfolioBacktestResult()
+        result.symbols = symbols
+
+        for t in range(n_bars):
+            held = quantity > 0
+            prices = close[t]
+
+            # Valorisation avant exécution des signaux de la barre
+            equity = cash + np.sum(np.where(held, quantity * valuation[t], 0.0))
+            equity_history[t] = equity
+
+            # Sorties
+            exit_mask = held & tradable[t] & exits[t]
+            if stop_loss_pct is not None or take_profit_pct is not None:
+                with np.errstate(invalid='ignore'):
+                    change_pct = (prices - entry_price) / np.where(held, entry_price, 1.0) * 100
+                if stop_loss_pct is not None:
+                    exit_mask |= held & tradable[t] & (change_pct <= -stop_loss_pct)
+                if take_profit_pct is not None:
+                    exit_mask |= held & tradable[t] & (change_pct >= take_profit_pct)
+
+            if exit_mask.any():
+                exit_value = quantity[exit_mask] * prices[exit_mask]
+                exit_commission = exit_value * self.commission
+                cash += float(np.sum(exit_value - exit_commission))
+                pnl = (
+                        exit_value -
+                        quantity[exit_mask] * entry_price[exit_mask] -
+                        entry_commission[exit_mask] -
+                        exit_commission
+                )
+
+                for k, j in enumerate(np.flatnonzero(exit_mask)):
+                    result.trades.record(
+                        index[entry_bar[j]],
+                        index[t],
+                        symbols[j],
+                        entry_price[j],
+                        prices[j],
+                        quantity[j],
+                        pnl[k],
+                        pnl[k] / (quantity[j] * entry_price[j])
+                    )
+
+                quantity[exit_mask] = 0.0
+                held = quantity > 0
+
+            # Entrées, dimensionnées sur l'équité et bornées par le cash
+            entry_mask = ~held & tradable[t] & entries[t] & (weights > 0)
+            if entry_mask.any():
+                target = weights[entry_mask] * equity * self.capital_fraction
+                cost = target * (1 + self.commission)
+                total_cost = float(np.sum(cost))
+                if total_cost > cash:
+                    target *= max(cash, 0.0) / total_cost
+
+                quantity[entry_mask] = target / prices[entry_mask]
+                entry_price[entry_mask] = prices[entry_mask]
+                entry_commission[entry_mask] = target * self.commission
+                entry_bar[entry_mask] = t
+                cash -= float(np.sum(target + target * self.commission))
+
+        result.equity_curve = pd.Series(equity_history, index=index, name='equity')
+        result.calculate_metrics()
+
+        return result
+
+    def _weights(self, symbols: List[str]) -> np.ndarray:
+        """Poids d'allocation par symbole (fraction de l'équité)"""
+        if self.allocation == 'equal':
+            return np.full(len(symbols), 1.0 / len(symbols))
+
+        if isinstance(self.allocation, dict):
+            weights = np.array([self.allocation.get(symbol, 0.0) for symbol in symbols])
+            if weights.sum() > 1 + 1e-9:
+                raise ValueError("La somme des poids d'allocation dépasse 1")
+            return weights
+
+        raise ValueError(f"Règle d'allocation inconnue: {self.allocation}")
@@ -0,0 +1,97 @@
+import bisect
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from .kline_store import Range, subtract_ranges
+
+
+class CachedSegment:
+    """Plage continue [start_ms, end_ms) de bougies en mémoire"""
+
+    __slots__ = ('start_ms', 'end_ms', 'data', 'timestamps')
+
+    def __init__(self, start_ms: int, end_ms: int, data: pd.DataFrame):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.data = data
+        self.timestamps = data.index.asi8 // 10 ** 6
+
+    def slice(self, start_ms: int, end_ms: int) -> pd.DataFrame:
+        """Sous-fenêtre sans copie (tranche positionnelle)"""
+        lo = self.timestamps.searchsorted(start_ms, side='left')
+        hi = self.timestamps.searchsorted(end_ms, side='left')
+        return self.data.iloc[lo:hi]
+
+
+class KlineRangeCache:
+    """
+    Cache en mémoire des bougies indexé par plages temporelles.
+
+    Pour chaque (symbole, intervalle), les segments couverts sont conservés
+    triés et disjoints. Une requête entièrement couverte est servie par une
+    tranche du segment; une requête partiellement couverte ne télécharge que
+    les trous, puis fusionne les segments qui se touchent.
+    """
+
+    def __init__(self):
+        self.segments: Dict[Tuple[str, str], List[CachedSegment]] = {}
+
+    def get(self, symbol: str, interval: str, start_ms: int, end_ms: int,
+            fetch: Callable[[int, int], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Retourne les bougies de [start_ms, end_ms); ``fetch(start, end)``
+        est appelé uniquement pour les plages absentes du cache
+        """
+        segments = self.segments.setdefault((symbol, interval), [])
+
+        segment = self._find_covering(segments, start_ms, end_ms)
+        if segment is not None:
+            return segment.slice(start_ms, end_ms)
+
+        covered = [(s.start_ms, s.end_ms) for s in segments]
+        for gap_start, gap_end in subtract_ranges(start_ms, end_ms, covered):
+            self._insert(segments, CachedSegment(gap_start, gap_end, fetch(gap_start, gap_end)))
+
+        return self._find_covering(segments, start_ms, end_ms).slice(start_ms, end_ms)
+
+    def covered_ranges(self, symbol: str, interval: str) -> List[Range]:
+        return [(s.start_ms, s.end_ms) for s in self.segments.get((symbol, interval), [])]
+
+    def clear(self):
+        self.segments.clear()
+
+    @staticmethod
+    def _find_covering(segments: List[CachedSegment], start_ms: int, end_ms: int):
+        starts = [s.start_ms for s in segments]
+        position = bisect.bisect_right(starts, start_ms) - 1
+        if position >= 0 and segments[position].end_ms >= end_ms:
+            return segments[position]
+        return None
+
+    @staticmethod
+    def _insert(segments: List[CachedSegment], new: CachedSegment):
+        """Insère un segment et fusionne ses voisins adjacents ou chevauchants"""
+        starts = [s.start_ms for s in segments]
+        position = bisect.bisect_left(starts, new.start_ms)
+
+        first = position
+        while first > 0 and segments[first - 1].end_ms >= new.start_ms:
+            first -= 1
+        last = position
+        while last < len(segments) and segments[last].start_ms <= new.end_ms:
+            last += 1
+
+        merged = segments[first:last] + [new]
+        if len(merged) == 1:
+            segments.insert(position, new)
+            return
+
+        merged.sort(key=lambda s: s.start_ms)
+        data = pd.concat([s.data for s in merged])
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        segments[first:last] = [CachedSegment(
+            min(s.start_ms for s in merged),
+            max(s.end_ms for s in merged),
+            data
+        )]
@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .kline_store import INTERVAL_MS, STORED_COLUMNS, interval_to_ms
+
+# Les semaines Binance commencent le lundi; l'époque Unix est un jeudi
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+SUM_COLUMNS = ['volume', 'quote_volume', 'trades_count', 'taker_buy_volume', 'taker_buy_quote_volume']
+
+
+def bucket_start(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    """Début (ms) de la bougie ``interval`` contenant chaque horodatage"""
+    step = interval_to_ms(interval)
+    offset = WEEK_OFFSET_MS if interval == '1w' else 0
+    return (timestamps - offset) // step * step + offset
+
+
+def source_intervals(interval: str) -> List[str]:
+    """Intervalles plus fins dont ``interval`` est un multiple, du plus fin au plus large"""
+    target = interval_to_ms(interval)
+    candidates = [
+        name for name, ms in INTERVAL_MS.items()
+        if ms < target and target % ms == 0 and (interval != '1w' or ms <= INTERVAL_MS['1d'])
+    ]
+    return sorted(candidates, key=INTERVAL_MS.get)
+
+
+def resample_arrays(arrays: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """
+    Agrège des bougies triées en bougies ``interval``: ouverture de la
+    première, plus haut/plus bas, clôture de la dernière, volumes et nombre
+    de trades cumulés
+    """
+    timestamps = arrays['timestamp']
+    if len(timestamps) == 0:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in STORED_COLUMNS.items()}
+
+    buckets = bucket_start(timestamps, interval)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(timestamps)])) - 1
+
+    resampled = {
+        'timestamp': buckets[starts],
+        'open': arrays['open'][starts],
+        'high': np.maximum.reduceat(arrays['high'], starts),
+        'low': np.minimum.reduceat(arrays['low'], starts),
+        'close': arrays['close'][ends],
+        'close_time': buckets[starts] + interval_to_ms(interval) - 1
+    }
+    for name in SUM_COLUMNS:
+        resampled[name] = np.add.reduceat(arrays[name], starts)
+
+    return {name: resampled[name].astype(dtype, copy=False) for name, dtype in STORED_COLUMNS.items()}
+
+
+class ResampledBars:
+    """Bougies dérivées d'un intervalle, et bougies sources de la dernière"""
+
+    __slots__ = ('arrays', 'pending')
+
+    def __init__(self, arrays: Dict[str, np.ndarray], pending: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.pending = pending
+
+
+class BarResampler:
+    """
+    Construit et maintient des intervalles larges à partir de bougies fines.
+
+    Les tableaux dérivés sont mis en cache par (symbole, intervalle). À
+    l'arrivée de nouvelles bougies fines, seule la dernière bougie dérivée
+    (éventuellement partielle) est recalculée à partir de ses bougies
+    sources; les bougies suivantes sont ajoutées.
+
+    Les tableaux renvoyés sont des instantanés en lecture seule: une mise à
+    jour construit de nouveaux tableaux et ne modifie jamais ceux déjà
+    remis (cache d'indicateurs, DataFrames de ``TechnicalAnalysis``).
+    """
+
+    def __init__(self, source_interval: str = '1m'):
+        self.source_interval = source_interval
+        self.bars: Dict[Tuple[str, str], ResampledBars] = {}
+
+    def resample(self, symbol: str, interval: str,
+                 arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Construit (et met en cache) l'intervalle ``interval`` depuis les bougies sources"""
+        derived = self._read_only(resample_arrays(arrays, interval))
+        self.bars[(symbol, interval)] = ResampledBars(derived, self._last_bucket(arrays, interval))
+        return derived
+
+    def get(self, symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+        bars = self.bars.get((symbol, interval))
+        return bars.arrays if bars is not None else None
+
+    def update(self, symbol: str, arrays: Dict[str, np.ndarray]):
+        """
+        Intègre de nouvelles bougies sources (ou la révision de la dernière)
+        dans tous les intervalles dérivés du symbole
+        """
+        for (cached_symbol, interval), bars in self.bars.items():
+            if cached_symbol != symbol:
+                continue
+
+            pending = bars.pending
+            if len(pending['timestamp']):
+                first_bucket = bucket_start(pending['timestamp'][:1], interval)[0]
+                keep = arrays['timestamp'] >= first_bucket
+                combined = self._merge_sources(pending, {k: v[keep] for k, v in arrays.items()})
+            else:
+                combined = arrays
+
+            derived = resample_arrays(combined, interval)
+            if len(derived['timestamp']) == 0:
+                continue
+
+            current = bars.arrays
+            n = len(current['timestamp'])
+            replace_from = n
+            if n and current['timestamp'][-1] == derived['timestamp'][0]:
+                replace_from = n - 1
+
+            # Nouveaux tableaux, y compris pour la seule révision de la bougie
+            # partielle: ceux déjà remis restent inchangés
+            bars.arrays = self._read_only({
+                name: np.concatenate((values[:replace_from], derived[name]))
+                for name, values in current.items()
+            })
+            bars.pending = self._last_bucket(combined, interval)
+
+    @staticmethod
+    def _read_only(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        for values in arrays.values():
+            values.flags.writeable = False
+        return arrays
+
+    @staticmethod
+    def _last_bucket(arrays: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+        """Bougies sources de la dernière bougie dérivée"""
+        timestamps = arrays['timestamp']
+        if len(timestamps) == 0:
+            return {name: values.copy() for name, values in arrays.items()}
+        last = bucket_start(timestamps[-1:], interval)[0]
+        start = timestamps.searchsorted(last, side='left')
+        return {name: np.array(values[start:]) for name, values in arrays.items()}
+
+    @staticmethod
+    def _merge_sources(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Concatène des bougies sources; une bougie révisée remplace l'ancienne"""
+        timestamps = np.concatenate((old['timestamp'], new['timestamp']))
+        # Dernière occurrence de chaque horodatage, dans l'ordre chronologique
+        _, last = np.unique(timestamps[::-1], return_index=True)
+        order = len(timestamps) - 1 - last
+        return {
+            name: np.concatenate((old[name], new[name]))[order]
+            for name in old
+        }
@@ -0,0 +1,189 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import weakref
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtest_engine import BacktestResult
+from .trade_ledger import TradeLedger
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _canonical(value):
+    """Forme JSON stable d'une valeur de paramètre"""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def canonical_params(params: Dict) -> str:
+    """Dictionnaire de paramètres sérialisé de façon déterministe"""
+    return json.dumps(_canonical(params or {}), sort_keys=True, default=str)
+
+
+class BacktestResultCache:
+    """
+    Cache des résultats de backtest adressé par contenu.
+
+    La clé combine la classe de stratégie, les paramètres canonisés, les
+    réglages du moteur et une empreinte des tableaux OHLCV. Deux niveaux:
+    un LRU en mémoire et, si ``directory`` est fourni, des fichiers sur
+    disque évincés du plus ancien accès au plus récent au-delà de
+    ``max_disk_bytes``.
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 max_entries: int = 256,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints: Dict[int, tuple] = {}
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def fingerprint(self, data: pd.DataFrame) -> str:
+        """Empreinte des horodatages et des colonnes OHLCV (mémorisée par DataFrame)"""
+        cached = self._fingerprints.get(id(data))
+        if cached is not None and cached[0]() is data:
+            return cached[1]
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(data.index.asi8).tobytes())
+        for name in FINGERPRINT_FIELDS:
+            if name in data:
+                digest.update(np.ascontiguousarray(data[name].to_numpy(dtype=np.float64)).tobytes())
+        fingerprint = digest.hexdigest()
+
+        try:
+            self._fingerprints[id(data)] = (weakref.ref(data), fingerprint)
+        except TypeError:
+            pass
+        return fingerprint
+
+    def key(self, strategy_class, params: Dict, engine_settings: Dict, data: pd.DataFrame) -> str:
+        payload = json.dumps({
+            'strategy': f'{strategy_class.__module__}.{strategy_class.__qualname__}',
+            'params': canonical_params(params),
+            'engine': _canonical(engine_settings),
+            'data': self.fingerprint(data)
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[BacktestResult]:
+        """Résultat mémorisé (nouvel objet à chaque appel) ou None"""
+        payload = self.memory.get(key)
+        if payload is not None:
+            self.memory.move_to_end(key)
+        else:
+            payload = self._read_disk(key)
+            if payload is not None:
+                self._remember(key, payload)
+
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._restore(payload)
+
+    def put(self, key: str, result: BacktestResult):
+        payload = {
+            'metrics': dict(result.metrics),
+            'trades': result.trades.array.copy(),
+            'symbols': list(result.trades.symbols),
+            'tz': result.trades.tz,
+            'equity_curve': result.equity_curve.copy() if result.equity_curve is not None else None,
+            'final_state': copy.deepcopy(result.final_state)
+        }
+        self._remember(key, payload)
+        if self.directory is not None:
+            self._write_disk(key, payload)
+
+    def clear(self):
+        self.memory.clear()
+
+    def _remember(self, key: str, payload: Dict):
+        self.memory[key] = payload
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    @staticmethod
+    def _restore(payload: Dict) -> BacktestResult:
+        result = BacktestResult()
+        result.metrics = dict(payload['metrics'])
+        result.trades = TradeLedger.from_array(payload['trades'], payload['symbols'], payload['tz'])
+        if payload['equity_curve'] is not None:
+            result.equity_curve = payload['equity_curve'].copy()
+        result.final_state = copy.deepcopy(payload['final_state'])
+        return result
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrée de cache illisible {path}: {e}")
+            return None
+        # Horodatage d'accès utilisé par l'éviction
+        os.utime(path)
+        return payload
+
+    def _write_disk(self, key: str, payload: Dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Supprime les entrées les moins récemment utilisées au-delà du budget"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
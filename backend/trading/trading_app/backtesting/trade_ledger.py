@@ -0,0 +1,171 @@
+from collections.abc import Sequence
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPE = np.dtype([
+    ('entry_time', 'i8'),
+    ('exit_time', 'i8'),
+    ('symbol_id', 'i4'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('quantity', 'f8'),
+    ('pnl', 'f8'),
+    ('return', 'f8')
+])
+
+FLOAT_FIELDS = ['entry_price', 'exit_price', 'quantity', 'pnl', 'return']
+
+
+class TradeLedger(Sequence):
+    """
+    Journal des trades stocké dans un tableau structuré NumPy extensible.
+
+    Chaque trade occupe 60 octets (horodatages en ns, identifiant de
+    symbole, prix, quantité, PnL, rendement). L'accès par index ou par
+    itération restitue les dictionnaires historiques de
+    ``BacktestResult.trades``.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.empty(capacity, dtype=TRADE_DTYPE)
+        self._size = 0
+        self.symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self.tz = None
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, symbols: List[str], tz=None) -> 'TradeLedger':
+        """Reconstruit un journal à partir de ses enregistrements"""
+        ledger = cls(capacity=max(len(array), 1))
+        ledger._data[:len(array)] = array
+        ledger._size = len(array)
+        ledger.symbols = list(symbols)
+        ledger._symbol_ids = {symbol: i for i, symbol in enumerate(ledger.symbols)}
+        ledger.tz = tz
+        return ledger
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._as_dict(row) for row in self.array[item]]
+        if item < 0:
+            item += self._size
+        if not 0 <= item < self._size:
+            raise IndexError('trade index out of range')
+        return self._as_dict(self._data[item])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TradeLedger, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    @property
+    def array(self) -> np.ndarray:
+        """Vue sur les trades enregistrés (sans copie)"""
+        return self._data[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.array[name]
+
+    def symbol_id(self, symbol: str) -> int:
+        if symbol not in self._symbol_ids:
+            self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self._symbol_ids[symbol]
+
+    def append(self, trade: Dict):
+        """Ajoute un trade au format dictionnaire"""
+        self.record(
+            trade['entry_time'], trade['exit_time'], trade['symbol'],
+            *(trade[name] for name in FLOAT_FIELDS)
+        )
+
+    def record(self, entry_time, exit_time, symbol: str, entry_price: float,
+               exit_price: float, quantity: float, pnl: float, trade_return: float):
+        """Ajoute un trade sans construire de dictionnaire"""
+        entry_time = pd.Timestamp(entry_time)
+        if self.tz is None:
+            self.tz = entry_time.tz
+
+        self._reserve(1)
+        self._data[self._size] = (
+            entry_time.value, pd.Timestamp(exit_time).value, self.symbol_id(symbol),
+            entry_price, exit_price, quantity, pnl, trade_return
+        )
+        self._size += 1
+
+    def extend_columns(self, symbol: str, entry_time: np.ndarray, exit_time: np.ndarray,
+                       tz=None, **columns: np.ndarray):
+        """Ajoute un lot de trades d'un même symbole à partir de colonnes"""
+        count = len(entry_time)
+        if count == 0:
+            return
+        if self.tz is None:
+            self.tz = tz
+
+        self._reserve(count)
+        block = self._data[self._size:self._size + count]
+        block['entry_time'] = entry_time
+        block['exit_time'] = exit_time
+        block['symbol_id'] = self.symbol_id(symbol)
+        for name in FLOAT_FIELDS:
+            block[name] = columns[name]
+        self._size += count
+
+    def for_symbol(self, symbol: str) -> List[Dict]:
+        """Trades d'un symbole, au format dictionnaire"""
+        if symbol not in self._symbol_ids:
+            return []
+        rows = self.array[self.array['symbol_id'] == self._symbol_ids[symbol]]
+        return [self._as_dict(row) for row in rows]
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Un trade par ligne; le symbole est une colonne catégorielle"""
+        array = self.array
+        frame = pd.DataFrame({
+            'entry_time': self._to_datetime(array['entry_time']),
+            'exit_time': self._to_datetime(array['exit_time']),
+            'symbol': pd.Categorical.from_codes(array['symbol_id'], categories=self.symbols),
+        })
+        for name in FLOAT_FIELDS:
+            frame[name] = array[name]
+        return frame
+
+    def to_parquet(self, path: str, **kwargs):
+        """Export Parquet (nécessite pyarrow ou fastparquet)"""
+        self.to_pandas().to_parquet(path, index=False, **kwargs)
+
+    def _reserve(self, count: int):
+        """Agrandit le tableau par doublement de capacité"""
+        required = self._size + count
+        if required <= len(self._data):
+            return
+        capacity = max(required, 2 * len(self._data))
+        data = np.empty(capacity, dtype=TRADE_DTYPE)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    def _to_datetime(self, values: np.ndarray) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(values.view('datetime64[ns]'))
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+
+    def _timestamp(self, value: int) -> pd.Timestamp:
+        if self.tz is not None:
+            return pd.Timestamp(value, tz='UTC').tz_convert(self.tz)
+        return pd.Timestamp(value)
+
+    def _as_dict(self, row) -> Dict:
+        return {
+            'entry_time': self._timestamp(int(row['entry_time'])),
+            'exit_time': self._timestamp(int(row['exit_time'])),
+            'symbol': self.symbols[row['symbol_id']],
+            'entry_price': float(row['entry_price']),
+            'exit_price': float(row['exit_price']),
+            'quantity': float(row['quantity']),
+            'pnl': float(row['pnl']),
+            'return': float(row['return'])
+        }
@@ -0,0 +1,115 @@
+"""
+Benchmark: latence de la boucle d'événements, client REST bloquant vs
+client asynchrone.
+
+Une fausse API Binance locale (serveur HTTP dans un thread) répond avec
+une latence fixe. Plusieurs tâches asyncio (comme les boucles de
+``LiveTradingSystem``) interrogent le prix en continu, pendant qu'une
+tâche témoin mesure le retard de ses réveils: avec le client bloquant,
+chaque requête fige toute la boucle. Exécution depuis ``backend/trading``::
+
+    python -m trading_app.benchmarks.bench_event_loop_latency
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from binance.spot import Spot as BinanceClient
+
+from ..services.async_binance_service import AsyncBinanceService
+from ..services.binance_service import BinanceService
+
+
+def make_handler(latency: float):
+    class FakeTickerHandler(BaseHTTPRequestHandler):
+        # Connexions keep-alive, en-têtes et corps envoyés sans attente
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps({'symbol': 'BTCUSDT', 'price': '42000.50'}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeTickerHandler
+
+
+async def heartbeat(lags: list, interval: float, stop: asyncio.Event):
+    """Mesure le retard de réveil d'une tâche qui dort ``interval`` secondes"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+
+
+async def run_scenario(get_price, tasks: int, calls: int, interval: float):
+    """``tasks`` boucles de ``calls`` requêtes de prix; renvoie (retards, durée)"""
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, interval, stop))
+
+    async def poll():
+        for _ in range(calls):
+            await get_price('BTCUSDT')
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(poll() for _ in range(tasks)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await monitor
+    return np.array(lags), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--tasks', type=int, default=4)
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.005)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}'
+
+    blocking = BinanceService()
+    blocking.client = BinanceClient(base_url=url)
+
+    async def blocking_price(symbol):
+        # Appel synchrone dans une coroutine, comme l'ancien exécuteur
+        return blocking.get_symbol_price(symbol)
+
+    async def run_all():
+        results = {'Bloquant': await run_scenario(blocking_price, args.tasks, args.calls, args.interval)}
+        async with AsyncBinanceService(base_url=url, pool_size=args.tasks) as service:
+            results['Asynchrone'] = await run_scenario(
+                service.get_symbol_price, args.tasks, args.calls, args.interval
+            )
+        return results
+
+    results = asyncio.run(run_all())
+    server.shutdown()
+
+    requests = args.tasks * args.calls
+    print(f"{requests} requêtes ({args.tasks} tâches), latence serveur {args.latency * 1000:.0f} ms, "
+          f"témoin toutes les {args.interval * 1000:.0f} ms")
+    for name, (lags, elapsed) in results.items():
+        print(f"  {name:<10} retard moyen {lags.mean() * 1000:7.1f} ms  "
+              f"p99 {np.percentile(lags, 99) * 1000:7.1f} ms  max {lags.max() * 1000:7.1f} ms  "
+              f"durée {elapsed:.2f} s ({requests / elapsed:,.0f} req/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: indicateurs calculés séparément vs graphe de séries partagé.
+
+Les cinq indicateurs par défaut de ``CompositeAnalysis`` sont calculés sur
+100 000 barres synthétiques, chacun avec ses propres séries
+intermédiaires, puis via un seul graphe de dépendances. Un second jeu
+(plusieurs paramétrages des mêmes indicateurs) montre le cas où les
+séries communes sont nombreuses. Exécution depuis ``backend/trading``::
+
+    python -m trading_app.benchmarks.bench_indicator_graph
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ..indicators.composite_analysis import CompositeAnalysis
+from ..indicators.graph import SeriesGraph
+from ..indicators.momentum import MACD, RSI
+from ..indicators.trend import ADX
+from ..indicators.volatility import BollingerBands
+from ..indicators.volume import OBV
+
+
+def make_bars(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    return pd.DataFrame({
+        'open': close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.uniform(10, 100, n)
+    }, index=pd.date_range('2020-01-01', periods=n, freq='min', name='timestamp'))
+
+
+def best_of(repeat: int, *fns) -> list:
+    """Meilleur temps de chaque fonction, exécutions alternées"""
+    timings = [[] for _ in fns]
+    for _ in range(repeat):
+        for fn, fn_timings in zip(fns, timings):
+            t0 = time.perf_counter()
+            fn()
+            fn_timings.append(time.perf_counter() - t0)
+    return [min(fn_timings) for fn_timings in timings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bars', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    data = make_bars(args.bars)
+    suites = {
+        'Composite par défaut': {
+            'RSI': RSI(),
+            'MACD': MACD(),
+            'BollingerBands': BollingerBands(),
+            'ADX': ADX(),
+            'OBV': OBV()
+        },
+        'Variantes de paramètres': {
+            'RSI': RSI(),
+            'RSI_strict': RSI(oversold=20, overbought=80),
+            'MACD': MACD(),
+            'MACD_fast': MACD(signal_period=5),
+            'BollingerBands': BollingerBands(),
+            'BollingerBands_3': BollingerBands(num_std=3),
+            'ADX': ADX(),
+            'OBV': OBV(),
+            'OBV_slow': OBV(smooth_period=50)
+        }
+    }
+
+    print(f"Barres: {args.bars:,}")
+    for title, indicators in suites.items():
+        analyzer = CompositeAnalysis(indicators)
+
+        def separate():
+            evaluations = 0
+            for indicator in indicators.values():
+                graph = SeriesGraph(data)
+                indicator.calculate_series(data, graph)
+                evaluations += graph.evaluations
+            return evaluations
+
+        separate_time, shared_time = best_of(
+            args.repeat, separate, lambda: analyzer.analyze_series(data)
+        )
+
+        print(f"{title} ({len(indicators)} indicateurs)")
+        print(f"  Séries intermédiaires: {separate()} séparées, "
+              f"{analyzer.build_graph(data).evaluations} dans le graphe")
+        print(f"  Séparément : {separate_time * 1000:.1f} ms")
+        print(f"  Graphe     : {shared_time * 1000:.1f} ms")
+        print(f"  Accélération: x{separate_time / shared_time:.2f}")
+
+if __name__ == '__main__':
+    main()
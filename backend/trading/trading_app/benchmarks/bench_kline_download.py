@@ -0,0 +1,113 @@
+"""
+Benchmark: téléchargement paginé séquentiel vs concurrent des bougies.
+
+Un faux serveur HTTP local imite ``/api/v3/klines`` avec une latence fixe
+par requête. Exécution depuis ``backend/trading``::
+
+    python -m trading_app.benchmarks.bench_kline_download
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from binance.spot import Spot as BinanceClient
+
+from ..backtesting.kline_store import interval_to_ms
+from ..services.binance_service import BinanceService
+from ..services.rate_limiter import RequestWeightLimiter
+
+
+def make_handler(latency: float):
+    class FakeKlinesHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            step = interval_to_ms(params['interval'])
+            start = int(params['startTime'])
+            end = int(params['endTime'])
+            limit = int(params.get('limit', 500))
+
+            time.sleep(latency)
+            klines = [
+                [t, '100.0', '101.0', '99.0', '100.5', '10.0', t + step - 1,
+                 '1005.0', 42, '5.0', '502.5', '0']
+                for t in range(start, end + 1, step)
+            ][:limit]
+
+            body = json.dumps(klines).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeKlinesHandler
+
+
+def run_sequential(service: BinanceService, symbol: str, interval: str,
+                   start: int, end: int) -> int:
+    """Pagination séquentielle: une requête à la fois"""
+    rows = 0
+    page_span = interval_to_ms(interval) * BinanceService.KLINES_LIMIT
+    for page_start in range(start, end + 1, page_span):
+        rows += len(service.get_klines(
+            symbol, interval,
+            start_time=page_start,
+            end_time=min(page_start + page_span - 1, end),
+            limit=BinanceService.KLINES_LIMIT
+        ))
+    return rows
+
+
+def run_concurrent(service: BinanceService, symbol: str, interval: str,
+                   start: int, end: int, workers: int) -> int:
+    limiter = RequestWeightLimiter(max_weight=100_000)
+    return sum(
+        len(chunk) for chunk in service.get_klines_range(
+            symbol, interval, start, end,
+            max_workers=workers, weight_limiter=limiter
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    service = BinanceService()
+    service.client = BinanceClient(base_url=f'http://127.0.0.1:{server.server_port}')
+
+    start = 1_704_067_200_000  # 2024-01-01 UTC
+    end = start + args.days * 86_400_000 - 1
+
+    t0 = time.perf_counter()
+    sequential_rows = run_sequential(service, 'BTCUSDT', '1m', start, end)
+    sequential = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    concurrent_rows = run_concurrent(service, 'BTCUSDT', '1m', start, end, args.workers)
+    concurrent = time.perf_counter() - t0
+
+    server.shutdown()
+
+    print(f"Bougies 1m: {sequential_rows} ({args.days} jours, latence {args.latency * 1000:.0f} ms)")
+    print(f"Séquentiel : {sequential:.2f} s ({sequential_rows / sequential:,.0f} bougies/s)")
+    print(f"Concurrent : {concurrent:.2f} s ({concurrent_rows / concurrent:,.0f} bougies/s, "
+          f"{args.workers} workers)")
+    print(f"Accélération: x{sequential / concurrent:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: filtres de lissage NumPy (``indicators.smoothing``) vs pandas.
+
+Chaque filtre (EMA, moyenne de Wilder, moyenne et écart-type glissants)
+est mesuré contre son équivalent ``ewm``/``rolling`` sur un historique
+court (cas d'une stratégie qui recalcule ses indicateurs à chaque barre)
+et sur un historique long, puis les trois EMA de MACD et les deux
+moyennes de RSI sont mesurées en bloc. Exécution depuis
+``backend/trading``::
+
+    python -m trading_app.benchmarks.bench_smoothing_kernels
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ..indicators import smoothing
+from .bench_indicator_graph import best_of, make_bars
+
+
+def macd_pandas(close: pd.Series):
+    macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    return macd_line - macd_line.ewm(span=9, adjust=False).mean()
+
+
+def macd_kernels(close: np.ndarray):
+    macd_line = smoothing.ema(close, 12) - smoothing.ema(close, 26)
+    return macd_line - smoothing.ema(macd_line, 9)
+
+
+def rsi_pandas(close: pd.Series):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def rsi_kernels(close: np.ndarray):
+    delta = np.diff(close, prepend=np.nan)
+    gain = smoothing.sma(np.where(delta > 0, delta, 0.0), 14)
+    loss = smoothing.sma(np.where(delta < 0, -delta, 0.0), 14)
+    return 100 - 100 / (1 + gain / loss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--short', type=int, default=500)
+    parser.add_argument('--long', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    for bars in (args.short, args.long):
+        close_series = make_bars(bars)['close']
+        close = close_series.to_numpy()
+        # Appels par mesure: assez pour dépasser la résolution de l'horloge
+        calls = max(1, 200_000 // bars)
+
+        cases = {
+            'EMA(12)': (lambda: smoothing.ema(close, 12),
+                        lambda: close_series.ewm(span=12, adjust=False).mean()),
+            'Wilder(14)': (lambda: smoothing.wilder(close, 14),
+                           lambda: close_series.ewm(alpha=1 / 14, adjust=False).mean()),
+            'SMA(20)': (lambda: smoothing.sma(close, 20),
+                        lambda: close_series.rolling(20).mean()),
+            'Écart-type(20)': (lambda: smoothing.rolling_std(close, 20),
+                               lambda: close_series.rolling(20).std()),
+            'MACD (3 EMA)': (lambda: macd_kernels(close), lambda: macd_pandas(close_series)),
+            'RSI (2 SMA)': (lambda: rsi_kernels(close), lambda: rsi_pandas(close_series))
+        }
+
+        print(f"Barres: {bars:,} ({calls} appels par mesure)")
+        for name, (kernel, reference) in cases.items():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                deviation = np.nanmax(np.abs(kernel() - reference().to_numpy()))
+                kernel_time, pandas_time = best_of(
+                    args.repeat,
+                    lambda: [kernel() for _ in range(calls)],
+                    lambda: [reference() for _ in range(calls)]
+                )
+            print(f"  {name:<15} noyau {kernel_time / calls * 1e6:8.1f} µs  "
+                  f"pandas {pandas_time / calls * 1e6:8.1f} µs  "
+                  f"x{pandas_time / kernel_time:.2f}  (écart max {deviation:.1e})")
+
+
+if __name__ == '__main__':
+    main()
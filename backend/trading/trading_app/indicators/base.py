@@ -6,6 +6,14 @@ from typing import Union, Dict, List
 from dataclasses import dataclass
 
 
+# Codes numériques des signaux pour les séries complètes
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_NEUTRAL = 0
+SIGNAL_CODES = {'buy': SIGNAL_BUY, 'sell': SIGNAL_SELL, 'neutral': SIGNAL_NEUTRAL}
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+
 @dataclass
 class IndicatorResult:
     value: float
@@ -14,6 +22,66 @@ class IndicatorResult:
     additional_data: Dict = None
 
 
+@dataclass
+class IndicatorSeries:
+    """Valeurs, signaux et forces d'un indicateur sur tout l'historique"""
+    index: pd.Index
+    value: np.ndarray
+    signal: np.ndarray  # codes SIGNAL_BUY / SIGNAL_SELL / SIGNAL_NEUTRAL
+    strength: np.ndarray
+    additional_data: Dict[str, np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def at(self, position: int = -1) -> IndicatorResult:
+        """Résultat ponctuel équivalent à ``calculate`` sur l'historique tronqué"""
+        return IndicatorResult(
+            value=float(self.value[position]),
+            signal=SIGNAL_NAMES[int(self.signal[position])],
+            strength=float(self.strength[position]),
+            additional_data={
+                name: values[position]
+                for name, values in (self.additional_data or {}).items()
+            }
+        )
+
+    def column(self, position: int) -> 'IndicatorSeries':
+        """Séries d'un symbole lorsque les tableaux sont des matrices (temps x symbole)"""
+        return IndicatorSeries(
+            index=self.index,
+            value=self.value[:, position],
+            signal=self.signal[:, position],
+            strength=self.strength[:, position],
+            additional_data={
+                name: values[:, position]
+                for name, values in (self.additional_data or {}).items()
+            }
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Convertit les séries en DataFrame aligné sur l'index des données"""
+        columns = {
+            'value': self.value,
+            'signal': self.signal,
+            'strength': self.strength
+        }
+        columns.update(self.additional_data or {})
+        return pd.DataFrame(columns, index=self.index)
+
+
+def cap_strength(strength):
+    """Équivalent vectoriel de ``min(1.0, strength)`` (NaN donne 1.0)"""
+    return np.where(strength < 1.0, strength, 1.0)
+
+
+def signal_codes(buy, sell) -> np.ndarray:
+    """Construit les codes de signal à partir des conditions d'achat/vente"""
+    return np.where(
+        buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, SIGNAL_NEUTRAL)
+    ).astype(np.int8)
+
+
 class BaseIndicator(ABC):
     def __init__(self):
         self.name = self.__class__.__name__
@@ -23,6 +91,17 @@ class BaseIndicator(ABC):
         """Calcule la valeur de l'indicateur"""
         pass
 
+    def calculate_series(self, data: pd.DataFrame, graph=None) -> IndicatorSeries:
+        """
+        Calcule l'indicateur sur tout l'historique en une seule passe; les
+        séries intermédiaires sont lues dans ``graph`` (``SeriesGraph``)
+        """
+        raise NotImplementedError
+
+    def dependencies(self) -> List[tuple]:
+        """Nœuds du graphe de séries utilisés par ``calculate_series``"""
+        return []
+
     @abstractmethod
     def get_signal(self, current_value: float, previous_values: List[float]) -> str:
         """Détermine le signal de trading basé sur l'indicateur"""
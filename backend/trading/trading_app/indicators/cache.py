@@ -0,0 +1,218 @@
+import hashlib
+import weakref
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import smoothing
+from .base import BaseIndicator, IndicatorSeries
+from .kernels import GRID_KERNELS
+
+
+def close_sma(data: pd.DataFrame, period: int, column: str = 'close') -> pd.Series:
+    return pd.Series(smoothing.sma(data[column].to_numpy(dtype=float), period), index=data.index)
+
+
+def close_ema(data: pd.DataFrame, span: int, adjust: bool = False, column: str = 'close') -> pd.Series:
+    values = smoothing.ema(data[column].to_numpy(dtype=float), span, adjust=adjust)
+    return pd.Series(values, index=data.index)
+
+
+def close_std(data: pd.DataFrame, period: int, column: str = 'close') -> pd.Series:
+    return pd.Series(smoothing.rolling_std(data[column].to_numpy(dtype=float), period), index=data.index)
+
+
+def sma_rsi(data: pd.DataFrame, period: int = 14) -> pd.Series:
+    """RSI à moyennes simples (TechnicalAnalysis, FeatureEngineering)"""
+    delta = np.diff(data['close'].to_numpy(dtype=float), prepend=np.nan)
+    gain = smoothing.sma(np.where(delta > 0, delta, 0.0), period)
+    loss = smoothing.sma(np.where(delta < 0, -delta, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain / loss
+        return pd.Series(100 - (100 / (1 + rs)), index=data.index)
+
+
+def macd_line(data: pd.DataFrame, fast: int = 12, slow: int = 26) -> pd.Series:
+    """Écart des EMA, calculé en float64 (les EMA sont proches: pas de float32 ici)"""
+    return close_ema(data, fast) - close_ema(data, slow)
+
+
+def macd_signal(data: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.Series:
+    macd = macd_line(data, fast, slow)
+    return pd.Series(smoothing.ema(macd.to_numpy(), signal), index=data.index)
+
+
+# Calculs partagés, identifiés par leur nom
+FUNCTIONS: Dict[str, Callable] = {
+    'sma': close_sma,
+    'ema': close_ema,
+    'std': close_std,
+    'rsi': sma_rsi,
+    'macd': macd_line,
+    'macd_signal': macd_signal
+}
+
+
+# Colonnes lues par les calculs mis en cache
+VERSION_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Empreintes mémorisées par DataFrame: id -> (référence faible, empreinte)
+_digests: Dict[int, Tuple[weakref.ref, str]] = {}
+
+
+def _digest(data: pd.DataFrame, columns: List[str]) -> str:
+    """Empreinte des horodatages et des colonnes (calculée une fois par DataFrame)"""
+    key = id(data)
+    cached = _digests.get(key)
+    if cached is not None and cached[0]() is data:
+        return cached[1]
+
+    stamps = data['timestamp'] if 'timestamp' in data.columns else data.index
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_array(np.asarray(stamps)).tobytes())
+    for name in columns:
+        digest.update(np.ascontiguousarray(data[name].to_numpy(dtype=np.float64)).tobytes())
+    value = digest.hexdigest()
+
+    try:
+        _digests[key] = (weakref.ref(data, lambda _, key=key: _digests.pop(key, None)), value)
+    except TypeError:
+        pass
+    return value
+
+
+def data_version(data: pd.DataFrame) -> Tuple:
+    """
+    Jeton identifiant le contenu d'un historique: empreinte de toutes les
+    barres, et dernière barre relue à chaque appel pour qu'une bougie en
+    cours révisée en place invalide aussi le cache
+    """
+    if len(data) == 0:
+        return (0,)
+    columns = [name for name in VERSION_COLUMNS if name in data.columns]
+    last = tuple(float(data[name].iloc[-1]) for name in columns)
+    return len(data), _digest(data, columns), last
+
+
+def _read_only(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, IndicatorSeries):
+        for array in (value.value, value.signal, value.strength, *(value.additional_data or {}).values()):
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+    return value
+
+
+class IndicatorCache:
+    """
+    Cache des indicateurs partagé par les stratégies d'un même run.
+
+    Un emplacement par (symbole, intervalle) contient les séries calculées
+    sur la version courante des données, indexées par nom d'indicateur et
+    paramètres; il est vidé lorsque les données changent. Les tableaux
+    distribués sont en lecture seule.
+    """
+
+    def __init__(self):
+        self.slots: Dict[Tuple[str, str], Dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, interval: str, data: pd.DataFrame,
+            key: Hashable, compute: Callable[[], object]):
+        """Valeur mémorisée pour ``key`` sur ces données, calculée au premier appel"""
+        values = self._values(symbol, interval, data)
+        if key in values:
+            self.hits += 1
+            return values[key]
+
+        self.misses += 1
+        value = compute()
+        if isinstance(value, pd.Series):
+            value = value.to_numpy(dtype=float, copy=True)
+        values[key] = _read_only(value)
+        return values[key]
+
+    def _values(self, symbol: str, interval: str, data: pd.DataFrame) -> Dict:
+        """Valeurs de l'emplacement (symbole, intervalle), vidé si les données ont changé"""
+        version = data_version(data)
+        slot = self.slots.get((symbol, interval))
+        if slot is None or slot['version'] != version:
+            slot = {'version': version, 'values': {}}
+            self.slots[(symbol, interval)] = slot
+        return slot['values']
+
+    def series(self, symbol: str, interval: str, data: pd.DataFrame,
+               name: str, **params) -> np.ndarray:
+        """Série d'un calcul partagé de ``FUNCTIONS`` (tableau en lecture seule)"""
+        key = (name, tuple(sorted(params.items())))
+        return self.get(symbol, interval, data, key, lambda: FUNCTIONS[name](data, **params))
+
+    def preload(self, symbol: str, interval: str, data: pd.DataFrame,
+                name: str, combinations: List[Dict]) -> np.ndarray:
+        """
+        Calcule ``name`` pour toute une grille de paramètres en une passe
+        (noyau de ``GRID_KERNELS``) et mémorise chaque colonne sous la clé
+        qu'utiliserait ``series``; renvoie la matrice (barres x combinaisons)
+        """
+        if not combinations:
+            return np.empty((len(data), 0))
+        kernel, accepted = GRID_KERNELS.get(name, (None, set()))
+        if kernel is not None and all(set(params) <= accepted for params in combinations):
+            matrix = kernel(data, combinations)
+        else:
+            matrix = np.column_stack([
+                FUNCTIONS[name](data, **params).to_numpy(dtype=float)
+                for params in combinations
+            ])
+
+        # Les colonnes mémorisées sont des vues de la matrice, en lecture
+        # seule; le préchargement ne compte ni succès ni échec
+        matrix.flags.writeable = False
+        values = self._values(symbol, interval, data)
+        for params, column in zip(combinations, matrix.T):
+            values[(name, tuple(sorted(params.items())))] = column
+        return matrix
+
+    def indicator(self, symbol: str, interval: str, data: pd.DataFrame,
+                  indicator: BaseIndicator, full_history: bool = False, graph=None):
+        """Résultat de ``calculate`` (ou ``calculate_series``) d'un indicateur"""
+        if full_history:
+            # Séries float32 et float64 d'un même indicateur sont distinctes
+            dtype = getattr(graph, 'dtype', None)
+            precision = np.dtype(dtype).name if dtype is not None else None
+            key = ('series', precision) + indicator_key(indicator)
+            return self.get(symbol, interval, data, key, lambda: indicator.calculate_series(data, graph))
+        key = ('last',) + indicator_key(indicator)
+        return self.get(symbol, interval, data, key, lambda: indicator.calculate(data))
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def clear(self):
+        self.slots.clear()
+
+
+def indicator_key(indicator: BaseIndicator) -> Tuple:
+    """Identifiant d'un indicateur: classe et paramètres"""
+    params = tuple(sorted(
+        (name, value) for name, value in vars(indicator).items()
+        if isinstance(value, (int, float, str, bool))
+    ))
+    return (type(indicator).__name__, params)
+
+
+def frame_slot(data: pd.DataFrame) -> Optional[Tuple[str, str]]:
+    """(symbole, intervalle) attachés au DataFrame par le flux de données"""
+    symbol = data.attrs.get('symbol')
+    interval = data.attrs.get('interval')
+    if symbol is None or interval is None:
+        return None
+    return symbol, interval
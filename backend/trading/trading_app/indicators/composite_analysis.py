@@ -6,43 +6,107 @@ import numpy as np
 from typing import Union, Dict, List
 from dataclasses import dataclass
 
-from .base import BaseIndicator, IndicatorResult
+from .base import (BaseIndicator, IndicatorResult, IndicatorSeries,
+                   SIGNAL_CODES, signal_codes)
+from .cache import IndicatorCache, frame_slot
+from .graph import SeriesGraph
 
 
 class CompositeAnalysis:
-    def __init__(self, indicators: Dict[str, BaseIndicator]):
+    # Poids des indicateurs
+    WEIGHTS = {
+        'RSI': 0.2,
+        'MACD': 0.25,
+        'BollingerBands': 0.2,
+        'ADX': 0.2,
+        'OBV': 0.15
+    }
+
+    def __init__(self, indicators: Dict[str, BaseIndicator],
+                 indicator_cache: IndicatorCache = None,
+                 dtype: np.dtype = None):
         self.indicators = indicators
+        self.indicator_cache = indicator_cache
+        # Précision des séries complètes (ex. np.float32 pour réduire la mémoire)
+        self.dtype = dtype
 
     def analyze(self, data: pd.DataFrame) -> Dict[str, IndicatorResult]:
         results = {}
         for name, indicator in self.indicators.items():
-            results[name] = indicator.calculate(data)
+            results[name] = self._calculate(indicator, data, full_history=False)
         return results
 
+    def analyze_series(self, data: pd.DataFrame) -> Dict[str, IndicatorSeries]:
+        """
+        Calcule chaque indicateur sur tout l'historique. Les séries
+        intermédiaires communes (diff, EMA, true range...) sont évaluées une
+        seule fois dans un graphe de dépendances partagé.
+        """
+        graph = self.build_graph(data)
+        return {
+            name: self._calculate(indicator, data, full_history=True, graph=graph)
+            for name, indicator in self.indicators.items()
+        }
+
+    def build_graph(self, data: pd.DataFrame) -> SeriesGraph:
+        """Graphe des séries requises par les indicateurs configurés, évalué"""
+        graph = SeriesGraph(data, self.dtype)
+        graph.evaluate(
+            node
+            for indicator in self.indicators.values()
+            for node in indicator.dependencies()
+        )
+        return graph
+
+    def _calculate(self, indicator: BaseIndicator, data: pd.DataFrame,
+                   full_history: bool, graph: SeriesGraph = None):
+        """Calcul d'un indicateur, partagé via le cache si les données sont identifiées"""
+        slot = frame_slot(data)
+        if self.indicator_cache is None or slot is None:
+            return indicator.calculate_series(data, graph) if full_history else indicator.calculate(data)
+        return self.indicator_cache.indicator(*slot, data, indicator, full_history, graph)
+
+    def get_combined_signal_series(self,
+                                   series: Dict[str, IndicatorSeries]) -> Dict[str, np.ndarray]:
+        """Équivalent vectoriel de ``get_combined_signal`` sur chaque barre"""
+        weighted_signal = 0.0
+        total_strength = 0.0
+
+        for name, indicator_series in series.items():
+            if name not in self.WEIGHTS:
+                continue
+
+            weight = self.WEIGHTS[name]
+            weighted_signal = weighted_signal + (
+                indicator_series.signal * indicator_series.strength * weight
+            )
+            total_strength = total_strength + indicator_series.strength * weight
+
+        total_strength = np.asarray(total_strength, dtype=float)
+        no_strength = total_strength == 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized_signal = np.where(
+                no_strength, 0.0, weighted_signal / total_strength
+            )
+
+        return {
+            'signal': signal_codes(normalized_signal > 0.3, normalized_signal < -0.3),
+            'strength': np.abs(normalized_signal),
+            'confidence': np.where(no_strength, 0.0, total_strength)
+        }
+
     def get_combined_signal(self, results: Dict[str, IndicatorResult]) -> Dict:
         total_strength = 0
         weighted_signal = 0
 
-        # Poids des indicateurs
-        weights = {
-            'RSI': 0.2,
-            'MACD': 0.25,
-            'BollingerBands': 0.2,
-            'ADX': 0.2,
-            'OBV': 0.15
-        }
-
         for name, result in results.items():
-            if name not in weights:
+            if name not in self.WEIGHTS:
                 continue
 
-            signal_value = {
-                'buy': 1,
-                'sell': -1,
-                'neutral': 0
-            }[result.signal]
+            signal_value = SIGNAL_CODES[result.signal]
 
-            weight = weights[name]
+            weight = self.WEIGHTS[name]
             weighted_signal += signal_value * result.strength * weight
             total_strength += result.strength * weight
 
@@ -0,0 +1,233 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import smoothing
+
+# Un nœud est un tuple (opération, *arguments); les arguments qui sont
+# eux-mêmes des nœuds sont ses dépendances.
+Node = Tuple
+
+
+def column(name: str) -> Node:
+    return ('column', name)
+
+
+CLOSE = column('close')
+HIGH = column('high')
+LOW = column('low')
+VOLUME = column('volume')
+
+
+def shift(source: Node, periods: int = 1) -> Node:
+    return ('shift', source, periods)
+
+
+def diff(source: Node) -> Node:
+    return ('diff', source)
+
+
+def sub(left: Node, right: Node) -> Node:
+    return ('sub', left, right)
+
+
+def ema(source: Node, span: int) -> Node:
+    return ('ema', source, span)
+
+
+def rolling_mean(source: Node, window: int) -> Node:
+    return ('rolling_mean', source, window)
+
+
+def rolling_std(source: Node, window: int) -> Node:
+    return ('rolling_std', source, window)
+
+
+def wilder(source: Node, period: int, exact: bool = False) -> Node:
+    return ('wilder', source, period, exact)
+
+
+def smoothed(source: Node, period: int, method: str = 'sma') -> Node:
+    """Moyenne de ``source`` selon ``method`` (clé de ``smoothing.SMOOTHINGS``)"""
+    if method == 'sma':
+        return rolling_mean(source, period)
+    return wilder(source, period, exact=method == 'wilder_exact')
+
+
+def expanding_mean(source: Node) -> Node:
+    return ('expanding_mean', source)
+
+
+def expanding_std(source: Node) -> Node:
+    return ('expanding_std', source)
+
+
+def known(source: Node, reference: Node) -> Node:
+    """``source`` là où ``reference`` est connue, NaN ailleurs"""
+    return ('known', source, reference)
+
+
+def gain(source: Node) -> Node:
+    return ('gain', source)
+
+
+def loss(source: Node) -> Node:
+    return ('loss', source)
+
+
+TYPICAL_PRICE = ('typical_price',)
+TRUE_RANGE = ('true_range',)
+PLUS_DM = ('plus_dm',)
+MINUS_DM = ('minus_dm',)
+OBV_LINE = ('obv',)
+
+
+def dependencies(node: Node) -> List[Node]:
+    """Nœuds dont dépend directement ``node``"""
+    if node in IMPLICIT_DEPENDENCIES:
+        return IMPLICIT_DEPENDENCIES[node]
+    return [arg for arg in node[1:] if isinstance(arg, tuple)]
+
+
+IMPLICIT_DEPENDENCIES: Dict[Node, List[Node]] = {
+    TYPICAL_PRICE: [HIGH, LOW, CLOSE],
+    TRUE_RANGE: [HIGH, LOW, shift(CLOSE)],
+    PLUS_DM: [diff(HIGH), ('down_move',)],
+    MINUS_DM: [diff(HIGH), ('down_move',)],
+    ('down_move',): [shift(LOW), LOW],
+    OBV_LINE: [diff(CLOSE), VOLUME],
+}
+
+
+class SeriesGraph:
+    """
+    Graphe des séries intermédiaires partagées par les indicateurs.
+
+    Chaque nœud (prix typique, true range, diff, EMA(n), moyenne/écart-type
+    glissants...) est évalué une seule fois sur les données, puis servi à
+    tous les indicateurs qui en dépendent. Avec ``dtype`` (ex. float32),
+    chaque nœud est converti dès son évaluation: les séries conservées, et
+    les calculs qui en découlent, sont dans cette précision.
+    """
+
+    # Opération de chaque type de nœud (``OPERATIONS``, définies plus bas)
+    operations: Dict[str, Callable]
+
+    def __init__(self, data: pd.DataFrame, dtype: Optional[np.dtype] = None):
+        self.data = data
+        self.dtype = dtype
+        self.values: Dict[Node, pd.Series] = {}
+        self.evaluations = 0
+
+    @staticmethod
+    def plan(nodes: Iterable[Node]) -> List[Node]:
+        """Ordre topologique des nœuds demandés et de leurs dépendances"""
+        order: List[Node] = []
+        seen = set()
+
+        def visit(node: Node):
+            if node in seen:
+                return
+            seen.add(node)
+            for dependency in dependencies(node):
+                visit(dependency)
+            order.append(node)
+
+        for node in nodes:
+            visit(node)
+        return order
+
+    def evaluate(self, nodes: Iterable[Node]):
+        """
+        Évalue, dans l'ordre des dépendances, tous les nœuds requis. Les
+        séries purement intermédiaires sont libérées dès leur dernier usage.
+        """
+        requested = set(nodes)
+        order = self.plan(requested)
+        consumers: Dict[Node, int] = {}
+        for node in order:
+            for dependency in dependencies(node):
+                consumers[dependency] = consumers.get(dependency, 0) + 1
+
+        for node in order:
+            self.get(node)
+            for dependency in dependencies(node):
+                consumers[dependency] -= 1
+                if consumers[dependency] == 0 and dependency not in requested:
+                    self.values.pop(dependency, None)
+
+    def get(self, node: Node) -> pd.Series:
+        if node not in self.values:
+            value = self.operations[node[0]](self, *node[1:])
+            if self.dtype is not None:
+                value = value.astype(self.dtype, copy=False)
+            self.values[node] = value
+            self.evaluations += 1
+        return self.values[node]
+
+
+def _true_range(graph: SeriesGraph) -> pd.Series:
+    high = graph.get(HIGH)
+    low = graph.get(LOW)
+    previous_close = graph.get(shift(CLOSE))
+    tr1 = high - low
+    tr2 = abs(high - previous_close)
+    tr3 = abs(low - previous_close)
+    return np.fmax(np.fmax(tr1, tr2), tr3)
+
+
+def _plus_dm(graph: SeriesGraph) -> pd.Series:
+    up_move = graph.get(diff(HIGH))
+    down_move = graph.get(('down_move',))
+    return up_move.where((up_move > down_move) & (up_move > 0), 0)
+
+
+def _minus_dm(graph: SeriesGraph) -> pd.Series:
+    up_move = graph.get(diff(HIGH))
+    down_move = graph.get(('down_move',))
+    return down_move.where((down_move > up_move) & (down_move > 0), 0)
+
+
+def _loss(graph: SeriesGraph, source: Node) -> pd.Series:
+    delta = graph.get(source)
+    return -delta.where(delta < 0, 0)
+
+
+def _kernel(function: Callable) -> Callable:
+    """Opération appliquant un filtre de ``smoothing`` au tableau d'un nœud"""
+    def operation(graph: SeriesGraph, source: Node, *params) -> pd.Series:
+        series = graph.get(source)
+        return pd.Series(function(series.to_numpy(), *params), index=series.index)
+    return operation
+
+
+def _obv(graph: SeriesGraph) -> pd.Series:
+    flow = (np.sign(graph.get(diff(CLOSE))) * graph.get(VOLUME)).fillna(0)
+    # Cumul en float64 quelle que soit la précision du graphe
+    return flow.astype(float, copy=False).cumsum()
+
+
+OPERATIONS: Dict[str, Callable] = {
+    'column': lambda graph, name: graph.data[name],
+    'shift': lambda graph, source, periods: graph.get(source).shift(periods),
+    'diff': lambda graph, source: graph.get(source).diff(),
+    'sub': lambda graph, left, right: graph.get(left) - graph.get(right),
+    'ema': _kernel(smoothing.ema),
+    'wilder': _kernel(smoothing.wilder),
+    'rolling_mean': _kernel(smoothing.sma),
+    'rolling_std': _kernel(smoothing.rolling_std),
+    'expanding_mean': lambda graph, source: graph.get(source).expanding().mean(),
+    'expanding_std': lambda graph, source: graph.get(source).expanding().std(),
+    'known': lambda graph, source, reference: graph.get(source).where(graph.get(reference).notna()),
+    'gain': lambda graph, source: graph.get(source).where(graph.get(source) > 0, 0),
+    'loss': _loss,
+    'typical_price': lambda graph: (graph.get(HIGH) + graph.get(LOW) + graph.get(CLOSE)) / 3,
+    'true_range': _true_range,
+    'down_move': lambda graph: graph.get(shift(LOW)) - graph.get(LOW),
+    'plus_dm': _plus_dm,
+    'minus_dm': _minus_dm,
+    'obv': _obv,
+}
+
+SeriesGraph.operations = OPERATIONS
@@ -0,0 +1,279 @@
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Les noyaux prennent un vecteur de paramètres et renvoient une matrice
+# (barres x paramètres); les fenêtres glissantes partagent une seule somme
+# cumulée. Ce sont aussi les seules implémentations des filtres à un
+# paramètre de ``smoothing``. Fenêtres glissantes: une fenêtre contenant un
+# NaN donne NaN, comme ``rolling``; la récurrence exponentielle suppose une
+# entrée sans NaN.
+
+
+def _centered_series(x: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray], float]:
+    """
+    Série centrée (NaN -> 0), nombre cumulé de NaN (None si aucun) et
+    centre. Le centrage limite l'erreur d'arrondi des sommes cumulées.
+    """
+    valid = ~np.isnan(x)
+    if valid.all():
+        offset = x.mean() if len(x) else 0.0
+        return x - offset, None, offset
+    offset = x[valid].mean() if valid.any() else 0.0
+    missing = np.concatenate(([0], np.cumsum(~valid)))
+    return np.where(valid, x - offset, 0.0), missing, offset
+
+
+def rolling_means(values, windows: Sequence[int]) -> np.ndarray:
+    """Moyennes glissantes pour plusieurs fenêtres à partir d'une seule somme cumulée"""
+    x = np.asarray(values, dtype=float)
+    centered, missing, offset = _centered_series(x)
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+
+    out = np.full((len(x), len(windows)), np.nan)
+    for i, window in enumerate(windows):
+        window = int(window)
+        if 0 < window <= len(x):
+            column = (csum[window:] - csum[:-window]) / window + offset
+            if missing is not None:
+                column[missing[window:] != missing[:-window]] = np.nan
+            out[window - 1:, i] = column
+    return out
+
+
+def rolling_stds(values, windows: Sequence[int], ddof: int = 1) -> np.ndarray:
+    """Écarts-types glissants pour plusieurs fenêtres (sommes cumulées de x et x²)"""
+    x = np.asarray(values, dtype=float)
+    centered, missing, _ = _centered_series(x)
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+    out = np.full((len(x), len(windows)), np.nan)
+    for i, window in enumerate(windows):
+        window = int(window)
+        if ddof < window <= len(x):
+            total = csum[window:] - csum[:-window]
+            total_sq = csum_sq[window:] - csum_sq[:-window]
+            variance = (total_sq - total * total / window) / (window - ddof)
+            column = np.sqrt(np.maximum(variance, 0.0))
+            if missing is not None:
+                column[missing[window:] != missing[:-window]] = np.nan
+            out[window - 1:, i] = column
+    return out
+
+
+def recurrence(x: np.ndarray, alpha: float, start: float) -> np.ndarray:
+    """
+    y[t] = alpha*x[t] + (1-alpha)*y[t-1], avec y[-1] = start (x sans NaN).
+
+    Résolue par blocs: dans un bloc, y est une somme cumulée pondérée par
+    les puissances de (1-alpha); seule la fin de bloc est propagée au bloc
+    suivant.
+    """
+    n = len(x)
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return x.astype(float)
+    if n == 0:
+        return np.empty(0)
+
+    # Longueur de bloc telle que (1-alpha)^-bloc reste représentable
+    block = int(min(n, max(1, 600 // -np.log(decay))))
+    n_blocks = -(-n // block)
+    steps = np.arange(block)
+
+    out = np.zeros(n_blocks * block)
+    out[:n] = x
+    terms = out.reshape(n_blocks, block)
+    terms *= decay ** -steps
+
+    # Valeur d'entrée de chaque bloc
+    ends = alpha * decay ** (block - 1) * terms.sum(axis=1)
+    carry = decay ** block
+    starts = np.empty(n_blocks)
+    previous = start
+    for b in range(n_blocks):
+        starts[b] = previous
+        previous = ends[b] + carry * previous
+
+    terms[:, 0] += decay * starts / alpha
+    np.cumsum(terms, axis=1, out=terms)
+    terms *= alpha * decay ** steps
+    return out[:n]
+
+
+def emas(values, spans: Sequence[float]) -> np.ndarray:
+    """
+    EMA (``adjust=False``) pour plusieurs spans. ``values`` est une série,
+    ou une matrice (barres x len(spans)) dont chaque colonne est lissée par
+    son propre span. Chaque colonne est une ``recurrence`` amorcée sur sa
+    première valeur.
+    """
+    spans = np.asarray(spans, dtype=float)
+    x = np.asarray(values, dtype=float)
+    # Calcul en (paramètres, barres): chaque colonne du résultat est contiguë
+    out = np.empty((len(spans), len(x)))
+    for i, span in enumerate(spans):
+        column = x if x.ndim == 1 else x[:, i]
+        if len(column):
+            out[i] = recurrence(column, 2.0 / (span + 1.0), column[0])
+    return out.T
+
+
+def sma_rsis(close, periods: Sequence[int]) -> np.ndarray:
+    """RSI à moyennes simples (``cache.sma_rsi``) pour plusieurs périodes"""
+    close = np.asarray(close, dtype=float)
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = rolling_means(gain, periods) / rolling_means(loss, periods)
+        return 100 - (100 / (1 + rs))
+
+
+def macd_signals(close, combinations: Sequence[Tuple[int, int, int]]) -> np.ndarray:
+    """Lignes de signal MACD pour plusieurs triplets (rapide, lente, signal)"""
+    close = np.asarray(close, dtype=float)
+    spans = sorted({span for fast, slow, _ in combinations for span in (fast, slow)})
+    averages = emas(close, spans)
+    column = {span: i for i, span in enumerate(spans)}
+
+    fast = [column[combination[0]] for combination in combinations]
+    slow = [column[combination[1]] for combination in combinations]
+    lines = averages[:, fast] - averages[:, slow]
+    return emas(lines, [combination[2] for combination in combinations])
+
+
+def bollinger_bands(prices, periods: Sequence[int],
+                    num_stds: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Bandes de Bollinger pour chaque couple (période, nombre d'écarts-types):
+    matrices (barres x len(periods) x len(num_stds)), bande centrale
+    (barres x len(periods))
+    """
+    middle = rolling_means(prices, periods)
+    width = rolling_stds(prices, periods)[:, :, None] * np.asarray(num_stds, dtype=float)
+    return {
+        'middle': middle,
+        'upper': middle[:, :, None] + width,
+        'lower': middle[:, :, None] - width
+    }
+
+
+# Noyaux de panel: matrices (temps x symbole) dont les barres absentes
+# valent NaN. Une fenêtre contenant un NaN donne NaN, comme pandas. Les
+# historiques d'un univers étant courts, les fenêtres glissantes sont
+# sommées directement (coût proportionnel à la fenêtre, sans annulation).
+
+
+def _centered(matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Matrice centrée par colonne (NaN -> 0), masque des valeurs et centres"""
+    x = np.asarray(matrix, dtype=float)
+    valid = ~np.isnan(x)
+    count = valid.sum(axis=0)
+    offset = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(count, 1)
+    return np.where(valid, x - offset, 0.0), valid, offset
+
+
+def _window_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Somme de chaque fenêtre complète, par décalages successifs de la matrice"""
+    total = x[:len(x) - window + 1].copy()
+    for k in range(1, window):
+        total += x[k:len(x) - window + 1 + k]
+    return total
+
+
+def panel_rolling_mean(matrix, window: int) -> np.ndarray:
+    x = np.asarray(matrix, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if window <= len(x):
+        out[window - 1:] = _window_sum(x, window) / window
+    return out
+
+
+def panel_rolling_std(matrix, window: int, ddof: int = 1) -> np.ndarray:
+    x = np.asarray(matrix, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if ddof < window <= len(x):
+        # Deux passes: moyenne de la fenêtre, puis somme des écarts au carré
+        mean = _window_sum(x, window) / window
+        squares = np.zeros_like(mean)
+        for k in range(window):
+            deviation = x[k:len(x) - window + 1 + k] - mean
+            squares += deviation * deviation
+        out[window - 1:] = np.sqrt(squares / (window - ddof))
+    return out
+
+
+def panel_expanding_mean(matrix) -> np.ndarray:
+    """Moyenne des valeurs connues à chaque barre (NaN ignorés)"""
+    centered, valid, offset = _centered(matrix)
+    count = np.cumsum(valid, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count >= 1, np.cumsum(centered, axis=0) / count + offset, np.nan)
+
+
+def panel_expanding_std(matrix, ddof: int = 1) -> np.ndarray:
+    centered, valid, _ = _centered(matrix)
+    count = np.cumsum(valid, axis=0)
+    total = np.cumsum(centered, axis=0, dtype=np.longdouble)
+    total_sq = np.cumsum(centered * centered, axis=0, dtype=np.longdouble)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (total_sq - total * total / count) / (count - ddof)
+        std = np.sqrt(np.maximum(variance, 0.0).astype(float))
+    return np.where(count > ddof, std, np.nan)
+
+
+def panel_ema(matrix, span: float) -> np.ndarray:
+    """
+    EMA (``adjust=False``) de chaque colonne, démarrant à sa première
+    valeur connue; un trou en cours d'historique reprend la dernière valeur
+    """
+    x = np.asarray(matrix, dtype=float)
+    valid = ~np.isnan(x)
+    started = np.maximum.accumulate(valid, axis=0)
+
+    # Remplissage: dernière valeur connue, première valeur avant le début
+    rows = np.where(valid, np.arange(len(x))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    first = np.argmax(valid, axis=0)
+    rows = np.where(started, rows, first)
+    filled = np.take_along_axis(x, rows, axis=0)
+    filled[:, ~valid.any(axis=0)] = 0.0
+
+    out = emas(filled, np.full(x.shape[1], span))
+    return np.where(started, out, np.nan)
+
+
+def _grid_sma(data: pd.DataFrame, combos: List[Dict]) -> np.ndarray:
+    return rolling_means(data['close'].to_numpy(), [c['period'] for c in combos])
+
+
+def _grid_ema(data: pd.DataFrame, combos: List[Dict]) -> np.ndarray:
+    return emas(data['close'].to_numpy(), [c['span'] for c in combos])
+
+
+def _grid_std(data: pd.DataFrame, combos: List[Dict]) -> np.ndarray:
+    return rolling_stds(data['close'].to_numpy(), [c['period'] for c in combos])
+
+
+def _grid_rsi(data: pd.DataFrame, combos: List[Dict]) -> np.ndarray:
+    return sma_rsis(data['close'].to_numpy(), [c.get('period', 14) for c in combos])
+
+
+def _grid_macd_signal(data: pd.DataFrame, combos: List[Dict]) -> np.ndarray:
+    return macd_signals(data['close'].to_numpy(), [
+        (c.get('fast', 12), c.get('slow', 26), c.get('signal', 9)) for c in combos
+    ])
+
+
+# Noyaux des calculs partagés de ``cache.FUNCTIONS`` et paramètres acceptés
+GRID_KERNELS: Dict[str, Tuple[Callable[[pd.DataFrame, List[Dict]], np.ndarray], Set[str]]] = {
+    'sma': (_grid_sma, {'period'}),
+    'ema': (_grid_ema, {'span'}),
+    'std': (_grid_std, {'period'}),
+    'rsi': (_grid_rsi, {'period'}),
+    'macd_signal': (_grid_macd_signal, {'fast', 'slow', 'signal'})
+}
@@ -5,41 +5,90 @@ import numpy as np
 from typing import Union, Dict, List
 from dataclasses import dataclass
 
-from .base import BaseIndicator, IndicatorResult
+from .base import (BaseIndicator, IndicatorResult, IndicatorSeries,
+                   cap_strength, signal_codes)
+from .graph import (CLOSE, SeriesGraph, diff, ema, expanding_mean, gain, known,
+                    loss, shift, smoothed, sub)
+from .smoothing import SMOOTHINGS, ema as ema_values, smooth
 
 
 class RSI(BaseIndicator):
+    """
+    ``smoothing`` choisit la moyenne des gains et pertes: 'sma' (moyenne
+    simple, par défaut), 'wilder' (RMA amorcée sur la première valeur) ou
+    'wilder_exact' (RMA amorcée par la moyenne simple de ``period`` barres)
+    """
+
     def __init__(self, period: int = 14, oversold: float = 30,
-                 overbought: float = 70):
+                 overbought: float = 70, smoothing: str = 'sma'):
         super().__init__()
+        if smoothing not in SMOOTHINGS:
+            raise ValueError(f"Lissage inconnu: {smoothing}")
         self.period = period
         self.oversold = oversold
         self.overbought = overbought
+        self.smoothing = smoothing
 
     def calculate(self, data: pd.DataFrame) -> IndicatorResult:
-        close_delta = data['close'].diff()
+        close = data['close'].to_numpy(dtype=float)
+        close_delta = np.diff(close, prepend=np.nan)
 
         # Calcul des gains et pertes
-        gain = (close_delta.where(close_delta > 0, 0)).rolling(
-            window=self.period
-        ).mean()
-        loss = (-close_delta.where(close_delta < 0, 0)).rolling(
-            window=self.period
-        ).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
+        gain = np.where(close_delta > 0, close_delta, 0.0)
+        loss = np.where(close_delta < 0, -close_delta, 0.0)
+        if self.smoothing != 'sma':
+            # Lissage récursif: démarre à la première variation connue
+            gain[np.isnan(close_delta)] = np.nan
+            loss[np.isnan(close_delta)] = np.nan
+        gain = smooth(gain, self.period, self.smoothing)
+        loss = smooth(loss, self.period, self.smoothing)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
+            rsi = 100 - (100 / (1 + rs))
+        current_rsi = rsi[-1]
 
         # Détermination du signal et de la force
-        signal = self.get_signal(current_rsi, rsi.iloc[-5:].tolist())
+        signal = self.get_signal(current_rsi, rsi[-5:].tolist())
         strength = self._calculate_signal_strength(current_rsi)
 
         return IndicatorResult(
             value=current_rsi,
             signal=signal,
             strength=strength,
-            additional_data={'rsi_values': rsi.tail(10).tolist()}
+            additional_data={'rsi_values': rsi[-10:].tolist()}
+        )
+
+    def dependencies(self) -> List[tuple]:
+        close_delta = diff(CLOSE)
+        gains, losses = gain(close_delta), loss(close_delta)
+        if self.smoothing != 'sma':
+            gains, losses = known(gains, close_delta), known(losses, close_delta)
+        return [
+            smoothed(gains, self.period, self.smoothing),
+            smoothed(losses, self.period, self.smoothing)
+        ]
+
+    def calculate_series(self, data: pd.DataFrame, graph: SeriesGraph = None) -> IndicatorSeries:
+        if graph is None:
+            graph = SeriesGraph(data)
+        avg_gain, avg_loss = (graph.get(node) for node in self.dependencies())
+
+        rs = avg_gain / avg_loss
+        rsi = (100 - (100 / (1 + rs))).to_numpy()
+
+        strength = np.where(
+            rsi <= self.oversold,
+            cap_strength((self.oversold - rsi) / 10),
+            np.where(rsi >= self.overbought,
+                     cap_strength((rsi - self.overbought) / 10), 0.0)
+        )
+
+        return IndicatorSeries(
+            index=data.index,
+            value=rsi,
+            signal=signal_codes(rsi < self.oversold, rsi > self.overbought),
+            strength=strength
         )
 
     def get_signal(self, current_value: float,
@@ -68,16 +117,17 @@ class MACD(BaseIndicator):
 
     def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         # Calcul des moyennes mobiles exponentielles
-        fast_ema = data['close'].ewm(span=self.fast_period, adjust=False).mean()
-        slow_ema = data['close'].ewm(span=self.slow_period, adjust=False).mean()
+        close = data['close'].to_numpy(dtype=float)
+        fast_ema = ema_values(close, self.fast_period)
+        slow_ema = ema_values(close, self.slow_period)
 
         # Calcul du MACD et de sa ligne de signal
         macd_line = fast_ema - slow_ema
-        signal_line = macd_line.ewm(span=self.signal_period, adjust=False).mean()
+        signal_line = ema_values(macd_line, self.signal_period)
         histogram = macd_line - signal_line
 
-        current_hist = histogram.iloc[-1]
-        signal = self.get_signal(current_hist, histogram.iloc[-5:].tolist())
+        current_hist = histogram[-1]
+        signal = self.get_signal(current_hist, histogram[-5:].tolist())
         strength = self._calculate_signal_strength(current_hist, histogram)
 
         return IndicatorResult(
@@ -85,12 +135,49 @@ class MACD(BaseIndicator):
             signal=signal,
             strength=strength,
             additional_data={
-                'macd_line': macd_line.iloc[-1],
-                'signal_line': signal_line.iloc[-1],
+                'macd_line': macd_line[-1],
+                'signal_line': signal_line[-1],
                 'histogram': current_hist
             }
         )
 
+    def dependencies(self) -> List[tuple]:
+        macd_line = sub(ema(CLOSE, self.fast_period), ema(CLOSE, self.slow_period))
+        signal_line = ema(macd_line, self.signal_period)
+        histogram = sub(macd_line, signal_line)
+        return [macd_line, signal_line, histogram, shift(histogram), expanding_mean(histogram)]
+
+    def calculate_series(self, data: pd.DataFrame, graph: SeriesGraph = None) -> IndicatorSeries:
+        if graph is None:
+            graph = SeriesGraph(data)
+        macd_line, signal_line, histogram, previous, avg_hist = (
+            graph.get(node) for node in self.dependencies()
+        )
+
+        # Croisements de l'histogramme avec la barre précédente
+        hist = histogram.to_numpy()
+        previous = previous.to_numpy()
+
+        # La force se rapporte à la moyenne de l'histogramme connue à chaque barre
+        avg_hist = np.abs(avg_hist.to_numpy())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            strength = cap_strength(np.abs(hist) / (2 * avg_hist))
+
+        return IndicatorSeries(
+            index=data.index,
+            value=hist,
+            signal=signal_codes(
+                (previous < 0) & (hist > 0),
+                (previous > 0) & (hist < 0)
+            ),
+            strength=strength,
+            additional_data={
+                'macd_line': macd_line.to_numpy(),
+                'signal_line': signal_line.to_numpy(),
+                'histogram': hist
+            }
+        )
+
     def get_signal(self, current_value: float,
                    previous_values: List[float]) -> str:
         if len(previous_values) < 2:
@@ -104,6 +191,6 @@ class MACD(BaseIndicator):
         return 'neutral'
 
     def _calculate_signal_strength(self, current_hist: float,
-                                   histogram: pd.Series) -> float:
-        avg_hist = abs(histogram.mean())
+                                   histogram: np.ndarray) -> float:
+        avg_hist = abs(np.nanmean(histogram))
         return min(1.0, abs(current_hist) / (2 * avg_hist))
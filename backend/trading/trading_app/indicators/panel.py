@@ -0,0 +1,130 @@
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .base import BaseIndicator, IndicatorResult, IndicatorSeries
+from .composite_analysis import CompositeAnalysis
+from .graph import OPERATIONS, SeriesGraph
+from .kernels import (panel_ema, panel_expanding_mean, panel_expanding_std,
+                      panel_rolling_mean, panel_rolling_std)
+from .smoothing import smooth
+
+
+def panel_frame(panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Panel champ -> matrice (temps x symbole), tel que renvoyé par
+    ``build_panel``, en un DataFrame à colonnes (champ, symbole)
+    """
+    return pd.concat(panel, axis=1)
+
+
+def _matrix(kernel: Callable) -> Callable:
+    """Opération de graphe appliquant un noyau de panel à la matrice source"""
+    def operation(graph: 'PanelGraph', source, *args):
+        frame = graph.get(source)
+        return pd.DataFrame(kernel(frame.to_numpy(), *args),
+                            index=frame.index, columns=frame.columns)
+    return operation
+
+
+def _listed(operation: Callable) -> Callable:
+    """Masque le résultat avant la première cotation de chaque symbole"""
+    def masked(graph: 'PanelGraph', *args):
+        frame = operation(graph, *args)
+        return pd.DataFrame(np.where(graph.listed, frame.to_numpy(), np.nan),
+                            index=frame.index, columns=frame.columns)
+    return masked
+
+
+def _panel_wilder(matrix: np.ndarray, period: int, exact: bool) -> np.ndarray:
+    return smooth(matrix, period, 'wilder_exact' if exact else 'wilder')
+
+
+class PanelGraph(SeriesGraph):
+    """
+    Graphe de séries évalué sur des matrices (temps x symbole).
+
+    Les fenêtres glissantes, EMA et moyennes cumulées passent par les
+    noyaux NumPy de ``kernels`` (une opération pour tous les symboles), la
+    moyenne de Wilder par ``smoothing.smooth`` colonne par colonne; les
+    barres antérieures à la cotation d'un symbole restent NaN dans chaque
+    nœud, de sorte que chaque colonne reproduit le calcul sur l'historique
+    propre du symbole.
+    """
+
+    operations = {
+        name: operation if name == 'column' else _listed(operation)
+        for name, operation in dict(
+            OPERATIONS,
+            ema=_matrix(panel_ema),
+            wilder=_matrix(_panel_wilder),
+            rolling_mean=_matrix(panel_rolling_mean),
+            rolling_std=_matrix(panel_rolling_std),
+            expanding_mean=_matrix(panel_expanding_mean),
+            expanding_std=_matrix(panel_expanding_std)
+        ).items()
+    }
+
+    def __init__(self, data: pd.DataFrame, dtype: Optional[np.dtype] = None):
+        super().__init__(data, dtype)
+        self.listed = data['close'].notna().cummax().to_numpy()
+
+
+class PanelAnalysis:
+    """
+    Indicateurs calculés pour tout un univers de symboles à la fois, à
+    partir d'un panel champ -> matrice (temps x symbole) (``build_panel``).
+    Chaque ``IndicatorSeries`` obtenue contient des tableaux 2D; ``dtype``
+    comme pour ``CompositeAnalysis``.
+    """
+
+    def __init__(self, indicators: Dict[str, BaseIndicator],
+                 dtype: Optional[np.dtype] = None):
+        self.composite = CompositeAnalysis(indicators, dtype=dtype)
+
+    @property
+    def indicators(self) -> Dict[str, BaseIndicator]:
+        return self.composite.indicators
+
+    def analyze_series(self, panel: Dict[str, pd.DataFrame]) -> Dict[str, IndicatorSeries]:
+        """Séries (temps x symbole) de chaque indicateur, sur un graphe partagé"""
+        data = panel_frame(panel)
+        graph = PanelGraph(data, self.composite.dtype)
+        graph.evaluate(
+            node
+            for indicator in self.indicators.values()
+            for node in indicator.dependencies()
+        )
+        return {
+            name: indicator.calculate_series(data, graph)
+            for name, indicator in self.indicators.items()
+        }
+
+    def analyze(self, panel: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, IndicatorResult]]:
+        """
+        Résultat de chaque indicateur à la dernière barre cotée de chaque
+        symbole: symbole -> nom de l'indicateur -> ``IndicatorResult``
+        """
+        series = self.analyze_series(panel)
+        symbols = list(panel['close'].columns)
+        last = self._last_positions(panel['close'])
+
+        results: Dict[str, Dict[str, IndicatorResult]] = {symbol: {} for symbol in symbols}
+        for name, indicator_series in series.items():
+            for j, symbol in enumerate(symbols):
+                results[symbol][name] = indicator_series.column(j).at(last[j])
+        return results
+
+    def signal_matrix(self, panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Signal combiné (codes SIGNAL_BUY / SIGNAL_SELL / SIGNAL_NEUTRAL) par barre et symbole"""
+        close = panel['close']
+        combined = self.composite.get_combined_signal_series(self.analyze_series(panel))
+        signal = np.where(close.notna().to_numpy(), combined['signal'], 0).astype(np.int8)
+        return pd.DataFrame(signal, index=close.index, columns=close.columns)
+
+    @staticmethod
+    def _last_positions(close: pd.DataFrame) -> List[int]:
+        """Position de la dernière barre cotée de chaque symbole"""
+        quoted = close.notna().to_numpy()
+        return list(len(close) - 1 - np.argmax(quoted[::-1], axis=0))
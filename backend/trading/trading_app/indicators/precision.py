@@ -0,0 +1,55 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .base import BaseIndicator
+from .composite_analysis import CompositeAnalysis
+
+
+def max_deviation(reference: np.ndarray, compact: np.ndarray) -> float:
+    """Écart absolu maximal; inf si une valeur n'est NaN que d'un côté"""
+    reference = np.asarray(reference, dtype=float)
+    compact = np.asarray(compact, dtype=float)
+    if (np.isnan(reference) != np.isnan(compact)).any():
+        return float('inf')
+    both = ~np.isnan(reference)
+    if not both.any():
+        return 0.0
+    return float(np.max(np.abs(reference[both] - compact[both])))
+
+
+def precision_report(data: pd.DataFrame, indicators: Dict[str, BaseIndicator],
+                     dtype: np.dtype = np.float32) -> pd.DataFrame:
+    """
+    Écart de chaque indicateur calculé en ``dtype`` par rapport au calcul
+    float64 sur les mêmes données: valeur, force, et barres dont le signal
+    diffère. La ligne ``combined`` porte sur le signal combiné.
+    """
+    reference_analysis = CompositeAnalysis(indicators)
+    compact_analysis = CompositeAnalysis(indicators, dtype=dtype)
+    reference = reference_analysis.analyze_series(data)
+    compact = compact_analysis.analyze_series(data)
+
+    rows = {}
+    for name, series in reference.items():
+        mismatches = int(np.count_nonzero(series.signal != compact[name].signal))
+        rows[name] = {
+            'dtype': np.dtype(compact[name].value.dtype).name,
+            'max_value_deviation': max_deviation(series.value, compact[name].value),
+            'max_strength_deviation': max_deviation(series.strength, compact[name].strength),
+            'signal_mismatches': mismatches,
+            'signal_mismatch_rate': mismatches / len(series)
+        }
+
+    combined = reference_analysis.get_combined_signal_series(reference)
+    compact_combined = compact_analysis.get_combined_signal_series(compact)
+    mismatches = int(np.count_nonzero(combined['signal'] != compact_combined['signal']))
+    rows['combined'] = {
+        'dtype': np.dtype(compact_combined['strength'].dtype).name,
+        'max_value_deviation': np.nan,
+        'max_strength_deviation': max_deviation(combined['strength'], compact_combined['strength']),
+        'signal_mismatches': mismatches,
+        'signal_mismatch_rate': mismatches / len(data)
+    }
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,106 @@
+from typing import Callable, Dict
+
+import numpy as np
+
+from .kernels import recurrence, rolling_means, rolling_stds
+
+# Filtres de lissage sur tableaux NumPy (une série), sans passer par
+# pandas: le coût fixe d'un appel ``rolling``/``ewm`` domine sur les
+# historiques courts des stratégies. Les calculs sont ceux des noyaux
+# multi-paramètres de ``kernels``, sur une seule colonne.
+#
+# Fenêtres glissantes: une fenêtre contenant un NaN donne NaN, comme
+# ``rolling``. Filtres récursifs: les NaN de tête restent NaN, un NaN en
+# cours de série est ignoré et la moyenne garde sa valeur précédente
+# (``ewm(..., ignore_na=True)``).
+
+
+def _over_valid(values, filter_: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Applique ``filter_`` aux seules valeurs connues; NaN en tête, report ensuite"""
+    x = np.asarray(values, dtype=float)
+    valid = ~np.isnan(x)
+    if valid.all():
+        return filter_(x)
+
+    out = np.full(len(x), np.nan)
+    out[valid] = filter_(x[valid])
+    # Report de la dernière valeur sur les NaN en cours de série
+    rows = np.where(valid, np.arange(len(x)), -1)
+    np.maximum.accumulate(rows, out=rows)
+    started = rows >= 0
+    out[started] = out[rows[started]]
+    return out
+
+
+def ema(values, span: float = None, alpha: float = None, adjust: bool = False) -> np.ndarray:
+    """
+    Moyenne mobile exponentielle, équivalente à
+    ``ewm(span=..., adjust=...).mean()`` (ou ``alpha=...``)
+    """
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+
+    def filter_(x: np.ndarray) -> np.ndarray:
+        if len(x) == 0:
+            return np.empty(0)
+        if not adjust:
+            return recurrence(x, alpha, x[0])
+        # adjust=True: somme pondérée divisée par la somme des poids
+        weights = 1.0 - (1.0 - alpha) ** np.arange(1, len(x) + 1)
+        return recurrence(x, alpha, 0.0) / weights
+
+    return _over_valid(values, filter_)
+
+
+def wilder(values, period: int, exact: bool = False) -> np.ndarray:
+    """
+    Moyenne de Wilder (RMA, alpha = 1/period). Par défaut amorcée sur la
+    première valeur, comme ``ewm(alpha=1/period, adjust=False)``; avec
+    ``exact``, amorcée par la moyenne simple des ``period`` premières
+    valeurs (définition de Wilder), NaN avant.
+    """
+    if not exact:
+        return ema(values, alpha=1.0 / period)
+
+    def filter_(x: np.ndarray) -> np.ndarray:
+        out = np.full(len(x), np.nan)
+        if period <= len(x):
+            seed = x[:period].mean()
+            out[period - 1] = seed
+            out[period:] = recurrence(x[period:], 1.0 / period, seed)
+        return out
+
+    return _over_valid(values, filter_)
+
+
+def sma(values, window: int) -> np.ndarray:
+    """Moyenne glissante par somme cumulée (``rolling(window).mean()``)"""
+    return rolling_means(values, [window])[:, 0]
+
+
+def rolling_std(values, window: int, ddof: int = 1) -> np.ndarray:
+    """Écart-type glissant par sommes courantes de x et x² (``rolling(window).std()``)"""
+    return rolling_stds(values, [window], ddof)[:, 0]
+
+
+# Lissages des moyennes de RSI/ADX, par nom
+SMOOTHINGS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    'sma': sma,
+    'wilder': wilder,
+    'wilder_exact': lambda values, period: wilder(values, period, exact=True)
+}
+
+
+def smooth(values, period: int, method: str = 'sma') -> np.ndarray:
+    """
+    Lissage ``method`` (clé de ``SMOOTHINGS``) sur ``period`` barres; une
+    matrice (barres x séries) est lissée colonne par colonne
+    """
+    x = np.asarray(values, dtype=float)
+    function = SMOOTHINGS[method]
+    if x.ndim == 1:
+        return function(x, period)
+    out = np.empty(x.shape)
+    for i, column in enumerate(x.T):
+        out[:, i] = function(column, period)
+    return out
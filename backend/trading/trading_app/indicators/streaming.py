@@ -0,0 +1,517 @@
+
+from collections import deque
+from typing import Dict, Optional
+import math
+
+import numpy as np
+import pandas as pd
+
+from .base import IndicatorResult
+from .momentum import MACD, RSI
+from .trend import ADX
+from .volatility import BollingerBands
+from .volume import OBV
+
+
+class RecentValues:
+    """
+    Dernières valeurs (deque borné). ``checkpoint``/``rollback`` annulent
+    en O(1) au plus un ajout: seule la case évincée est mémorisée.
+    """
+
+    __slots__ = ('values', 'pushes')
+
+    def __init__(self, size: int):
+        self.values = deque(maxlen=size)
+        self.pushes = 0
+
+    def append(self, value: float):
+        self.values.append(value)
+        self.pushes += 1
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def checkpoint(self) -> tuple:
+        full = bool(self.values) and len(self.values) == self.values.maxlen
+        return self.pushes, full, self.values[0] if full else None
+
+    def rollback(self, checkpoint: tuple):
+        pushes, full, head = checkpoint
+        if self.pushes != pushes and self.values.maxlen:
+            self.values.pop()
+            if full:
+                self.values.appendleft(head)
+        self.pushes = pushes
+
+
+class RollingWindow(RecentValues):
+    """Fenêtre glissante de taille fixe avec sommes courantes (O(1) par valeur)"""
+
+    __slots__ = ('size', 'total', 'total_sq', 'nan_count', 'shift')
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.size = size
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self.shift = None
+
+    def push(self, value: float):
+        if len(self.values) == self.size:
+            self._remove(self.values[0])
+        self.append(value)
+
+        if math.isnan(value):
+            self.nan_count += 1
+            return
+
+        # Décalage pour limiter l'annulation numérique dans la variance
+        if self.shift is None:
+            self.shift = value
+        centered = value - self.shift
+        self.total += centered
+        self.total_sq += centered * centered
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            self.nan_count -= 1
+            return
+        centered = value - self.shift
+        self.total -= centered
+        self.total_sq -= centered * centered
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.size and self.nan_count == 0
+
+    def mean(self) -> float:
+        if not self.ready:
+            return float('nan')
+        return self.shift + self.total / self.size
+
+    def std(self) -> float:
+        """Écart-type échantillon (ddof=1), comme ``rolling().std()``"""
+        if not self.ready or self.size < 2:
+            return float('nan')
+        variance = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def checkpoint(self) -> tuple:
+        return super().checkpoint(), self.total, self.total_sq, self.nan_count, self.shift
+
+    def rollback(self, checkpoint: tuple):
+        ring, self.total, self.total_sq, self.nan_count, self.shift = checkpoint
+        super().rollback(ring)
+
+
+class WilderAverage:
+    """
+    Moyenne de Wilder (alpha = 1/period) en O(1) par valeur, comme
+    ``smoothing.wilder``: NaN de tête ignorés, amorce sur la première valeur
+    (ou, avec ``exact``, moyenne simple des ``period`` premières), NaN en
+    cours de série sans effet
+    """
+
+    __slots__ = ('period', 'exact', 'count', 'total', 'value')
+
+    def __init__(self, period: int, exact: bool = False):
+        self.period = period
+        self.exact = exact
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def push(self, value: float):
+        if math.isnan(value):
+            return
+        self.count += 1
+        if self.exact and self.count <= self.period:
+            self.total += value
+            if self.count == self.period:
+                self.value = self.total / self.period
+        elif self.value is None:
+            self.value = value
+        else:
+            alpha = 1.0 / self.period
+            self.value = alpha * value + (1 - alpha) * self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def mean(self) -> float:
+        return float('nan') if self.value is None else self.value
+
+    def checkpoint(self) -> tuple:
+        return self.count, self.total, self.value
+
+    def rollback(self, checkpoint: tuple):
+        self.count, self.total, self.value = checkpoint
+
+
+def moving_average(period: int, smoothing: str = 'sma'):
+    """Moyenne incrémentale du lissage ``smoothing`` de RSI/ADX"""
+    if smoothing == 'sma':
+        return RollingWindow(period)
+    return WilderAverage(period, exact=smoothing == 'wilder_exact')
+
+
+class RunningMoments:
+    """Moyenne et variance cumulées par l'algorithme de Welford"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def std(self) -> float:
+        if self.count < 2:
+            return float('nan')
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def checkpoint(self) -> tuple:
+        return self.count, self.mean, self.m2
+
+    def rollback(self, checkpoint: tuple):
+        self.count, self.mean, self.m2 = checkpoint
+
+
+def _cap(value: float) -> float:
+    return min(1.0, value)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    """Division avec la sémantique flottante de pandas (inf / nan plutôt qu'exception)"""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return float('nan')
+        return math.copysign(float('inf'), numerator)
+    return numerator / denominator
+
+
+class StreamingIndicator:
+    """
+    Version incrémentale d'un indicateur: chaque nouvelle barre, ou révision
+    de la barre en cours (même horodatage), coûte O(1).
+
+    ``warmup`` initialise l'état sur un historique, ``update`` applique une
+    barre et retourne le même ``IndicatorResult`` que ``calculate`` sur
+    l'historique complet.
+    """
+
+    def reset(self):
+        self._state = self._initial_state()
+        self._committed = None
+        self._last_timestamp = None
+
+    def warmup(self, data: pd.DataFrame) -> Optional[IndicatorResult]:
+        """Reconstruit l'état à partir d'un historique de bougies"""
+        self.reset()
+        result = None
+        for timestamp, bar in zip(data.index, data.to_dict('records')):
+            result = self.update(bar, timestamp)
+        return result
+
+    def update(self, bar: Dict, timestamp=None) -> IndicatorResult:
+        """Applique une nouvelle barre ou révise la barre en cours"""
+        if timestamp is None:
+            timestamp = bar.get('timestamp')
+
+        if timestamp is not None and timestamp == self._last_timestamp:
+            # Révision: on repart de l'état précédant la barre en cours
+            self._rollback(self._committed)
+        else:
+            self._committed = self._checkpoint()
+            self._last_timestamp = timestamp
+
+        return self._apply(self._state, bar)
+
+    def _checkpoint(self) -> Dict:
+        """
+        Point de reprise en O(1): scalaires de l'état et, pour les fenêtres,
+        sommes courantes et case évincée (``_apply`` ajoute au plus une valeur)
+        """
+        return {
+            key: value.checkpoint() if hasattr(value, 'checkpoint') else value
+            for key, value in self._state.items()
+        }
+
+    def _rollback(self, checkpoint: Dict):
+        for key, saved in checkpoint.items():
+            value = self._state[key]
+            if hasattr(value, 'rollback'):
+                value.rollback(saved)
+            else:
+                self._state[key] = saved
+
+    def _initial_state(self) -> Dict:
+        raise NotImplementedError
+
+    def _apply(self, state: Dict, bar: Dict) -> IndicatorResult:
+        raise NotImplementedError
+
+
+class StreamingRSI(StreamingIndicator, RSI):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset()
+
+    def _initial_state(self) -> Dict:
+        return {
+            'prev_close': None,
+            'gains': moving_average(self.period, self.smoothing),
+            'losses': moving_average(self.period, self.smoothing),
+            'recent': RecentValues(10)
+        }
+
+    def _apply(self, state: Dict, bar: Dict) -> IndicatorResult:
+        close = float(bar['close'])
+        delta = float('nan') if state['prev_close'] is None else close - state['prev_close']
+        state['prev_close'] = close
+
+        if math.isnan(delta) and self.smoothing != 'sma':
+            # Lissage récursif: démarre à la première variation connue
+            gain = loss = delta
+        else:
+            gain, loss = (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+        state['gains'].push(gain)
+        state['losses'].push(loss)
+
+        rs = _ratio(state['gains'].mean(), state['losses'].mean())
+        rsi = 100 - (100 / (1 + rs))
+        state['recent'].append(rsi)
+
+        return IndicatorResult(
+            value=rsi,
+            signal=self.get_signal(rsi, []),
+            strength=self._calculate_signal_strength(rsi),
+            additional_data={'rsi_values': list(state['recent'])}
+        )
+
+
+class StreamingMACD(StreamingIndicator, MACD):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset()
+
+    def _initial_state(self) -> Dict:
+        return {
+            'fast_ema': None,
+            'slow_ema': None,
+            'signal_ema': None,
+            'prev_hist': None,
+            'hist_sum': 0.0,
+            'hist_count': 0
+        }
+
+    @staticmethod
+    def _ema(previous: Optional[float], value: float, span: int) -> float:
+        if previous is None:
+            return value
+        alpha = 2 / (span + 1)
+        return (1 - alpha) * previous + alpha * value
+
+    def _apply(self, state: Dict, bar: Dict) -> IndicatorResult:
+        close = float(bar['close'])
+        state['fast_ema'] = self._ema(state['fast_ema'], close, self.fast_period)
+        state['slow_ema'] = self._ema(state['slow_ema'], close, self.slow_period)
+        macd_line = state['fast_ema'] - state['slow_ema']
+        state['signal_ema'] = self._ema(state['signal_ema'], macd_line, self.signal_period)
+        histogram = macd_line - state['signal_ema']
+
+        previous = state['prev_hist']
+        signal = self.get_signal(
+            histogram, [] if previous is None else [previous, histogram]
+        )
+        state['prev_hist'] = histogram
+
+        state['hist_sum'] += histogram
+        state['hist_count'] += 1
+        avg_hist = abs(state['hist_sum'] / state['hist_count'])
+
+        return IndicatorResult(
+            value=histogram,
+            signal=signal,
+            strength=_cap(_ratio(abs(histogram), 2 * avg_hist)),
+            additional_data={
+                'macd_line': macd_line,
+                'signal_line': state['signal_ema'],
+                'histogram': histogram
+            }
+        )
+
+
+class StreamingBollingerBands(StreamingIndicator, BollingerBands):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset()
+
+    def _initial_state(self) -> Dict:
+        return {'typical': RollingWindow(self.period)}
+
+    def _apply(self, state: Dict, bar: Dict) -> IndicatorResult:
+        close = float(bar['close'])
+        state['typical'].push((float(bar['high']) + float(bar['low']) + close) / 3)
+
+        middle = state['typical'].mean()
+        std_dev = state['typical'].std()
+        upper = middle + std_dev * self.num_std
+        lower = middle - std_dev * self.num_std
+
+        return IndicatorResult(
+            value=middle,
+            signal=self.get_signal(close, [upper, middle, lower]),
+            strength=self._calculate_signal_strength(close, upper, lower),
+            additional_data={
+                'upper': upper,
+                'lower': lower,
+                'bandwidth': _ratio(upper - lower, middle)
+            }
+        )
+
+
+class StreamingADX(StreamingIndicator, ADX):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset()
+
+    def _initial_state(self) -> Dict:
+        return {
+            'prev_high': None,
+            'prev_low': None,
+            'prev_close': None,
+            'tr': moving_average(self.period, self.smoothing),
+            'plus_dm': moving_average(self.period, self.smoothing),
+            'minus_dm': moving_average(self.period, self.smoothing),
+            'dx': moving_average(self.period, self.smoothing)
+        }
+
+    def _apply(self, state: Dict, bar: Dict) -> IndicatorResult:
+        high = float(bar['high'])
+        low = float(bar['low'])
+        close = float(bar['close'])
+
+        # True Range et mouvements directionnels
+        true_range = high - low
+        plus_dm = minus_dm = 0.0
+        if state['prev_close'] is not None:
+            true_range = max(
+                true_range,
+                abs(high - state['prev_close']),
+                abs(low - state['prev_close'])
+            )
+            up_move = high - state['prev_high']
+            down_move = state['prev_low'] - low
+            if up_move > down_move and up_move > 0:
+                plus_dm = up_move
+            if down_move > up_move and down_move > 0:
+                minus_dm = down_move
+        elif self.smoothing != 'sma':
+            # Lissage récursif: démarre à la première barre ayant une précédente
+            true_range = plus_dm = minus_dm = float('nan')
+
+        state['prev_high'], state['prev_low'], state['prev_close'] = high, low, close
+        state['tr'].push(true_range)
+        state['plus_dm'].push(plus_dm)
+        state['minus_dm'].push(minus_dm)
+
+        atr = state['tr'].mean()
+        plus_di = _ratio(100 * state['plus_dm'].mean(), atr)
+        minus_di = _ratio(100 * state['minus_dm'].mean(), atr)
+        dx = _ratio(100 * abs(plus_di - minus_di), plus_di + minus_di)
+
+        if state['tr'].ready:
+            state['dx'].push(dx)
+        adx = state['dx'].mean()
+
+        return IndicatorResult(
+            value=adx,
+            signal=self.get_signal(adx, [plus_di, minus_di]),
+            strength=self._calculate_signal_strength(adx),
+            additional_data={
+                'plus_di': plus_di,
+                'minus_di': minus_di
+            }
+        )
+
+
+class StreamingOBV(StreamingIndicator, OBV):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset()
+
+    def _initial_state(self) -> Dict:
+        return {
+            'prev_close': None,
+            'obv': 0.0,
+            'prev_obv': None,
+            'obv_ma': RollingWindow(self.smooth_period),
+            'moments': RunningMoments(),
+            'recent_close': RecentValues(self.divergence_window),
+            'recent_obv': RecentValues(self.divergence_window)
+        }
+
+    @staticmethod
+    def _mean_pct_change(values: RecentValues) -> float:
+        series = np.fromiter(values, dtype=float, count=len(values))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes = series[1:] / series[:-1] - 1
+        changes = changes[~np.isnan(changes)]
+        return float(changes.mean()) if len(changes) else float('nan')
+
+    def _apply(self, state: Dict, bar: Dict) -> IndicatorResult:
+        close = float(bar['close'])
+        volume = float(bar['volume'])
+
+        if state['prev_close'] is not None:
+            state['obv'] += float(np.sign(close - state['prev_close'])) * volume
+        state['prev_close'] = close
+        current_obv = state['obv']
+
+        state['obv_ma'].push(current_obv)
+        state['moments'].push(current_obv)
+        state['recent_close'].append(close)
+        state['recent_obv'].append(current_obv)
+
+        previous = state['prev_obv']
+        state['prev_obv'] = current_obv
+        current_ma = state['obv_ma'].mean()
+
+        if previous is None:
+            signal = 'neutral'
+        else:
+            signal = self.get_signal(current_obv, [previous, current_ma])
+
+        distance = abs(current_obv - state['moments'].mean)
+        price_trend = self._mean_pct_change(state['recent_close'])
+        obv_trend = self._mean_pct_change(state['recent_obv'])
+
+        if price_trend > 0 and obv_trend < 0:
+            divergence = 'bearish'
+        elif price_trend < 0 and obv_trend > 0:
+            divergence = 'bullish'
+        else:
+            divergence = 'none'
+
+        return IndicatorResult(
+            value=current_obv,
+            signal=signal,
+            strength=_cap(_ratio(distance, 2 * state['moments'].std())),
+            additional_data={
+                'obv_ma': current_ma,
+                'divergence': divergence
+            }
+        )
@@ -5,48 +5,64 @@ import numpy as np
 from typing import Union, Dict, List
 from dataclasses import dataclass
 
-from .base import BaseIndicator, IndicatorResult
+from .base import (BaseIndicator, IndicatorResult, IndicatorSeries,
+                   cap_strength, signal_codes)
+from .graph import (CLOSE, HIGH, MINUS_DM, PLUS_DM, TRUE_RANGE, SeriesGraph,
+                    diff, known, shift, smoothed)
+from .smoothing import SMOOTHINGS, smooth
 
 
 class ADX(BaseIndicator):
-    def __init__(self, period: int = 14, threshold: int = 25):
+    """
+    ``smoothing`` choisit la moyenne du true range, des mouvements
+    directionnels et du DX: 'sma' (par défaut), 'wilder' ou 'wilder_exact'
+    (voir ``RSI``)
+    """
+
+    def __init__(self, period: int = 14, threshold: int = 25, smoothing: str = 'sma'):
         super().__init__()
+        if smoothing not in SMOOTHINGS:
+            raise ValueError(f"Lissage inconnu: {smoothing}")
         self.period = period
         self.threshold = threshold
+        self.smoothing = smoothing
 
     def calculate(self, data: pd.DataFrame) -> IndicatorResult:
-        high = data['high']
-        low = data['low']
-        close = data['close']
+        high = data['high'].to_numpy(dtype=float)
+        low = data['low'].to_numpy(dtype=float)
+        close = data['close'].to_numpy(dtype=float)
+        previous_close = np.concatenate(([np.nan], close[:-1]))
 
         # True Range
         tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=self.period).mean()
+        tr2 = abs(high - previous_close)
+        tr3 = abs(low - previous_close)
+        tr = np.fmax(np.fmax(tr1, tr2), tr3)
 
         # Directional Movement
-        up_move = high - high.shift(1)
-        down_move = low.shift(1) - low
-
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-
-        plus_di = 100 * pd.Series(plus_dm).rolling(
-            window=self.period
-        ).mean() / atr
-        minus_di = 100 * pd.Series(minus_dm).rolling(
-            window=self.period
-        ).mean() / atr
-
-        # ADX
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.rolling(window=self.period).mean()
-
-        current_adx = adx.iloc[-1]
-        current_plus_di = plus_di.iloc[-1]
-        current_minus_di = minus_di.iloc[-1]
+        up_move = np.diff(high, prepend=np.nan)
+        down_move = -np.diff(low, prepend=np.nan)
+
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+        if self.smoothing != 'sma':
+            # Lissage récursif: démarre à la première barre ayant une précédente
+            tr[np.isnan(previous_close)] = np.nan
+            plus_dm[np.isnan(up_move)] = np.nan
+            minus_dm[np.isnan(up_move)] = np.nan
+        atr = smooth(tr, self.period, self.smoothing)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * smooth(plus_dm, self.period, self.smoothing) / atr
+            minus_di = 100 * smooth(minus_dm, self.period, self.smoothing) / atr
+
+            # ADX
+            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = smooth(dx, self.period, self.smoothing)
+
+        current_adx = adx[-1]
+        current_plus_di = plus_di[-1]
+        current_minus_di = minus_di[-1]
 
         signal = self.get_signal(
             current_adx,
@@ -63,6 +79,47 @@ class ADX(BaseIndicator):
             }
         )
 
+    def dependencies(self) -> List[tuple]:
+        sources = [TRUE_RANGE, PLUS_DM, MINUS_DM]
+        if self.smoothing != 'sma':
+            sources = [known(TRUE_RANGE, shift(CLOSE)), known(PLUS_DM, diff(HIGH)),
+                       known(MINUS_DM, diff(HIGH))]
+        return [smoothed(source, self.period, self.smoothing) for source in sources]
+
+    def calculate_series(self, data: pd.DataFrame, graph: SeriesGraph = None) -> IndicatorSeries:
+        if graph is None:
+            graph = SeriesGraph(data)
+
+        # True Range et Directional Movement, alignés sur l'index des données
+        atr, plus_dm_mean, minus_dm_mean = (graph.get(node) for node in self.dependencies())
+
+        plus_di = 100 * plus_dm_mean / atr
+        minus_di = 100 * minus_dm_mean / atr
+
+        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = smooth(dx.to_numpy(), self.period, self.smoothing).astype(atr.to_numpy().dtype, copy=False)
+        plus_di = plus_di.to_numpy()
+        minus_di = minus_di.to_numpy()
+
+        trending = adx > self.threshold
+        strength = np.where(
+            trending, cap_strength((adx - self.threshold) / 30), 0.0
+        )
+
+        return IndicatorSeries(
+            index=data.index,
+            value=adx,
+            signal=signal_codes(
+                trending & (plus_di > minus_di),
+                trending & (minus_di > plus_di)
+            ),
+            strength=strength,
+            additional_data={
+                'plus_di': plus_di,
+                'minus_di': minus_di
+            }
+        )
+
     def get_signal(self, adx: float, di_values: List[float]) -> str:
         plus_di, minus_di = di_values
 
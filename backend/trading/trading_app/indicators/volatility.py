@@ -5,7 +5,10 @@ import numpy as np
 from typing import Union, Dict, List
 from dataclasses import dataclass
 
-from .base import BaseIndicator, IndicatorResult
+from .base import (BaseIndicator, IndicatorResult, IndicatorSeries,
+                   cap_strength, signal_codes)
+from .graph import CLOSE, TYPICAL_PRICE, SeriesGraph, rolling_mean, rolling_std
+from . import smoothing
 
 
 class BollingerBands(BaseIndicator):
@@ -15,35 +18,75 @@ class BollingerBands(BaseIndicator):
         self.num_std = num_std
 
     def calculate(self, data: pd.DataFrame) -> IndicatorResult:
-        typical_price = (data['high'] + data['low'] + data['close']) / 3
+        typical_price = ((data['high'] + data['low'] + data['close']) / 3).to_numpy(dtype=float)
 
         # Calcul des bandes
-        middle_band = typical_price.rolling(window=self.period).mean()
-        std_dev = typical_price.rolling(window=self.period).std()
+        middle_band = smoothing.sma(typical_price, self.period)
+        std_dev = smoothing.rolling_std(typical_price, self.period)
         upper_band = middle_band + (std_dev * self.num_std)
         lower_band = middle_band - (std_dev * self.num_std)
 
         current_price = data['close'].iloc[-1]
         signal = self.get_signal(
             current_price,
-            [upper_band.iloc[-1], middle_band.iloc[-1], lower_band.iloc[-1]]
+            [upper_band[-1], middle_band[-1], lower_band[-1]]
         )
 
         # Calcul de la volatilité relative
         bandwidth = (upper_band - lower_band) / middle_band
 
         return IndicatorResult(
-            value=middle_band.iloc[-1],
+            value=middle_band[-1],
             signal=signal,
             strength=self._calculate_signal_strength(
                 current_price,
-                upper_band.iloc[-1],
-                lower_band.iloc[-1]
+                upper_band[-1],
+                lower_band[-1]
             ),
             additional_data={
-                'upper': upper_band.iloc[-1],
-                'lower': lower_band.iloc[-1],
-                'bandwidth': bandwidth.iloc[-1]
+                'upper': upper_band[-1],
+                'lower': lower_band[-1],
+                'bandwidth': bandwidth[-1]
+            }
+        )
+
+    def dependencies(self) -> List[tuple]:
+        return [
+            rolling_mean(TYPICAL_PRICE, self.period),
+            rolling_std(TYPICAL_PRICE, self.period),
+            CLOSE
+        ]
+
+    def calculate_series(self, data: pd.DataFrame, graph: SeriesGraph = None) -> IndicatorSeries:
+        if graph is None:
+            graph = SeriesGraph(data)
+        middle_band, std_dev, close = (graph.get(node) for node in self.dependencies())
+        upper_band = (middle_band + (std_dev * self.num_std)).to_numpy()
+        lower_band = (middle_band - (std_dev * self.num_std)).to_numpy()
+        middle_band = middle_band.to_numpy()
+
+        price = close.to_numpy()
+        band_range = upper_band - lower_band
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            strength = np.where(
+                price > upper_band,
+                cap_strength((price - upper_band) / (band_range * 0.1)),
+                np.where(price < lower_band,
+                         cap_strength((lower_band - price) / (band_range * 0.1)),
+                         0.0)
+            )
+            bandwidth = band_range / middle_band
+
+        return IndicatorSeries(
+            index=data.index,
+            value=middle_band,
+            signal=signal_codes(price < lower_band, price > upper_band),
+            strength=strength,
+            additional_data={
+                'upper': upper_band,
+                'lower': lower_band,
+                'bandwidth': bandwidth
             }
         )
 
@@ -5,23 +5,80 @@ import numpy as np
 from typing import Union, Dict, List
 from dataclasses import dataclass
 
-from .base import BaseIndicator, IndicatorResult
+from .base import (BaseIndicator, IndicatorResult, IndicatorSeries,
+                   cap_strength, signal_codes)
+from .graph import (CLOSE, OBV_LINE, SeriesGraph, expanding_mean, expanding_std,
+                    rolling_mean, shift)
+from .smoothing import sma
+
+DIVERGENCE_BULLISH = 1
+DIVERGENCE_BEARISH = -1
+DIVERGENCE_NONE = 0
+DIVERGENCE_CODES = {'bullish': DIVERGENCE_BULLISH, 'bearish': DIVERGENCE_BEARISH,
+                    'none': DIVERGENCE_NONE}
+DIVERGENCE_NAMES = {code: name for name, code in DIVERGENCE_CODES.items()}
+
+
+def trend_signs(values, window: int) -> np.ndarray:
+    """
+    Signe de ``pct_change().mean()`` sur les ``window`` dernières barres, à
+    chaque barre (fenêtre tronquée en début d'historique); 0 si la moyenne
+    est nulle ou indéfinie. ``values`` est une série ou une matrice
+    (temps x symbole), traitée colonne par colonne.
+    """
+    x = np.asarray(values, dtype=float)
+    changes = np.full(x.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes[1:] = x[1:] / x[:-1] - 1
+
+    # Sommes glissantes des variations finies et décomptes (NaN ignorés,
+    # infinis propagés comme dans la moyenne pandas)
+    def window_sum(terms: np.ndarray) -> np.ndarray:
+        csum = np.concatenate((np.zeros((1,) + x.shape[1:]), np.cumsum(terms, axis=0)))
+        # Une fenêtre de ``window`` barres contient ``window - 1`` variations
+        start = np.maximum(np.arange(1, len(x) + 1) - max(window - 1, 0), 0)
+        return csum[1:] - csum[start]
+
+    total = window_sum(np.where(np.isfinite(changes), changes, 0.0))
+    count = window_sum(~np.isnan(changes))
+    rising = window_sum(changes == np.inf) > 0
+    falling = window_sum(changes == -np.inf) > 0
+
+    return np.where(
+        rising & falling, 0,
+        np.where(rising, 1, np.where(falling, -1, np.where(count > 0, np.sign(total), 0)))
+    ).astype(np.int8)
+
+
+def divergence_codes(close, obv, window: int = 5) -> np.ndarray:
+    """
+    Divergence prix/OBV à chaque barre (codes ``DIVERGENCE_CODES``): prix
+    en hausse et OBV en baisse sur la fenêtre -> baissière, l'inverse ->
+    haussière. Séries ou matrices (temps x symbole), en une passe.
+    """
+    price_trend = trend_signs(close, window)
+    obv_trend = trend_signs(obv, window)
+    return np.where(
+        (price_trend > 0) & (obv_trend < 0), DIVERGENCE_BEARISH,
+        np.where((price_trend < 0) & (obv_trend > 0), DIVERGENCE_BULLISH, DIVERGENCE_NONE)
+    ).astype(np.int8)
 
 
 class OBV(BaseIndicator):
-    def __init__(self, smooth_period: int = 20):
+    def __init__(self, smooth_period: int = 20, divergence_window: int = 5):
         super().__init__()
         self.smooth_period = smooth_period
+        self.divergence_window = divergence_window
 
     def calculate(self, data: pd.DataFrame) -> IndicatorResult:
         close = data['close']
         volume = data['volume']
 
         obv = (np.sign(close.diff()) * volume).fillna(0).cumsum()
-        obv_ma = obv.rolling(window=self.smooth_period).mean()
+        obv_ma = sma(obv.to_numpy(), self.smooth_period)
 
         current_obv = obv.iloc[-1]
-        current_ma = obv_ma.iloc[-1]
+        current_ma = obv_ma[-1]
 
         signal = self.get_signal(
             current_obv,
@@ -40,6 +97,47 @@ class OBV(BaseIndicator):
             }
         )
 
+    def dependencies(self) -> List[tuple]:
+        return [
+            OBV_LINE,
+            rolling_mean(OBV_LINE, self.smooth_period),
+            # Moyenne et écart-type de l'OBV connus à chaque barre
+            expanding_mean(OBV_LINE),
+            expanding_std(OBV_LINE),
+            shift(OBV_LINE)
+        ]
+
+    def calculate_series(self, data: pd.DataFrame, graph: SeriesGraph = None) -> IndicatorSeries:
+        if graph is None:
+            graph = SeriesGraph(data)
+        obv, obv_ma, obv_mean, obv_std, previous = (
+            graph.get(node).to_numpy() for node in self.dependencies()
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            strength = cap_strength(np.abs(obv - obv_mean) / (2 * obv_std))
+
+        return IndicatorSeries(
+            index=data.index,
+            value=obv,
+            signal=signal_codes(
+                (obv > previous) & (obv > obv_ma),
+                (obv < previous) & (obv < obv_ma)
+            ),
+            strength=strength,
+            additional_data={'obv_ma': obv_ma}
+        )
+
+    def divergence_series(self, data: pd.DataFrame, graph: SeriesGraph = None) -> np.ndarray:
+        """
+        Codes de divergence (``DIVERGENCE_CODES``) sur tout l'historique; sur
+        un panel (``PanelGraph``), matrice (temps x symbole)
+        """
+        if graph is None:
+            graph = SeriesGraph(data)
+        return divergence_codes(graph.get(CLOSE).to_numpy(), graph.get(OBV_LINE).to_numpy(),
+                                self.divergence_window)
+
     def get_signal(self, current_obv: float,
                    reference_values: List[float]) -> str:
         prev_obv, obv_ma = reference_values
@@ -58,12 +156,8 @@ class OBV(BaseIndicator):
 
     def _check_divergence(self, price_data: pd.DataFrame,
                           obv: pd.Series) -> str:
-        # Vérification des divergences prix/volume
-        price_trend = price_data['close'].iloc[-5:].pct_change().mean()
-        obv_trend = obv.iloc[-5:].pct_change().mean()
-
-        if price_trend > 0 and obv_trend < 0:
-            return 'bearish'
-        elif price_trend < 0 and obv_trend > 0:
-            return 'bullish'
-        return 'none'
\ No newline at end of file
+        # Vérification des divergences prix/volume sur les dernières barres
+        window = self.divergence_window
+        codes = divergence_codes(price_data['close'].to_numpy()[-window:],
+                                 obv.to_numpy()[-window:], window)
+        return DIVERGENCE_NAMES[int(codes[-1])]
@@ -6,7 +6,6 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from binance.client import Client
-from binance.exceptions import BinanceAPIException
 from binance.websockets import BinanceSocketManager
 from dataclasses import dataclass
 import logging
@@ -14,6 +13,8 @@ import redis
 import queue
 from threading import Thread
 
+from ..services.async_binance_service import AsyncBinanceService, ExchangeAPIError
+
 
 @dataclass
 class TradeExecution:
@@ -35,6 +36,12 @@ class LiveTradingSystem:
             config['api_secret']
         )
         self.bsm = BinanceSocketManager(self.client)
+        # Appels REST attendus (await) sans bloquer la boucle d'événements
+        self.exchange = AsyncBinanceService(
+            config['api_key'],
+            config['api_secret'],
+            testnet=config.get('testnet', False)
+        )
         self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
         self.order_queue = queue.Queue()
         self.active_trades = {}
@@ -67,6 +74,7 @@ class LiveTradingSystem:
 
         # Fermeture des positions ouvertes
         await self._close_all_positions()
+        await self.exchange.close()
         logging.info("Système de trading arrêté")
 
     async def _process_market_data(self):
@@ -118,13 +126,13 @@ class LiveTradingSystem:
                 return
 
             # Placement de l'ordre principal
-            order = self.client.create_order(
+            order = await self.exchange.create_order(
                 symbol=trade_execution.symbol,
                 side=trade_execution.side,
                 type=trade_execution.type,
                 quantity=trade_execution.quantity,
                 price=trade_execution.price if trade_execution.type == 'LIMIT' else None,
-                timeInForce=trade_execution.time_in_force if trade_execution.type == 'LIMIT' else None
+                time_in_force=trade_execution.time_in_force if trade_execution.type == 'LIMIT' else None
             )
 
             # Placement des ordres stop loss et take profit
@@ -140,7 +148,7 @@ class LiveTradingSystem:
             # Notification de l'exécution
             await self._notify_execution(order)
 
-        except BinanceAPIException as e:
+        except ExchangeAPIError as e:
             logging.error(f"Erreur Binance lors de l'exécution: {str(e)}")
         except Exception as e:
             logging.error(f"Erreur lors de l'exécution: {str(e)}")
@@ -149,24 +157,30 @@ class LiveTradingSystem:
         """Surveille les positions ouvertes"""
         while self.running:
             try:
-                for symbol, trade in self.active_trades.items():
+                # Copie: les autres tâches ouvrent et ferment des positions
+                # pendant les appels à l'API
+                for symbol, trade in list(self.active_trades.items()):
                     current_price = float(
-                        self.client.get_symbol_ticker(symbol=symbol)['price']
+                        await self.exchange.get_symbol_price(symbol)
                     )
+                    if self.active_trades.get(symbol) is not trade:
+                        # Position fermée ou remplacée entre-temps
+                        continue
 
                     # Vérification des niveaux de stop loss et take profit
                     if self._check_stop_loss(trade, current_price):
                         await self._close_position(symbol, 'stop_loss')
                     elif self._check_take_profit(trade, current_price):
                         await self._close_position(symbol, 'take_profit')
-
-                    # Mise à jour des trailing stops
-                    await self._update_trailing_stops(trade, current_price)
+                    else:
+                        # Mise à jour des trailing stops
+                        await self._update_trailing_stops(trade, current_price)
 
                 await asyncio.sleep(1)
 
             except Exception as e:
                 logging.error(f"Erreur dans la surveillance: {str(e)}")
+                await asyncio.sleep(1)
 
     async def _risk_manager(self):
         """Gère les risques en temps réel"""
@@ -196,7 +210,7 @@ class LiveTradingSystem:
         for signal in signals:
             if self._validate_signal(signal):
                 # Calcul de la taille de la position
-                position_size = self._calculate_position_size(signal)
+                position_size = await self._calculate_position_size(signal)
 
                 # Création de l'ordre
                 trade_execution = TradeExecution(
@@ -228,12 +242,10 @@ class LiveTradingSystem:
 
         return True
 
-    def _calculate_position_size(self, signal: Dict) -> float:
+    async def _calculate_position_size(self, signal: Dict) -> float:
         """Calcule la taille de la position"""
         account_balance = float(
-            self.client.get_asset_balance(
-                asset='USDT'
-            )['free']
+            await self.exchange.get_account_balance('USDT')
         )
 
         # Position de base (% du capital)
@@ -270,7 +282,7 @@ class LiveTradingSystem:
 
         try:
             # Création de l'ordre de fermeture
-            close_order = self.client.create_order(
+            close_order = await self.exchange.create_order(
                 symbol=symbol,
                 side='SELL' if trade['side'] == 'BUY' else 'BUY',
                 type='MARKET',
@@ -0,0 +1,184 @@
+import json
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import websockets
+
+from ..backtesting.kline_store import STORED_COLUMNS, interval_to_ms, klines_to_arrays
+from ..backtesting.resampler import BarResampler
+
+logger = logging.getLogger(__name__)
+
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443/stream'
+
+# Champs d'une bougie d'événement websocket -> colonnes stockées
+EVENT_FIELDS = {
+    'timestamp': 't',
+    'open': 'o',
+    'high': 'h',
+    'low': 'l',
+    'close': 'c',
+    'volume': 'v',
+    'close_time': 'T',
+    'quote_volume': 'q',
+    'trades_count': 'n',
+    'taker_buy_volume': 'V',
+    'taker_buy_quote_volume': 'Q'
+}
+
+
+def event_to_arrays(kline: Dict) -> Dict[str, np.ndarray]:
+    """Bougie d'un événement kline (champ ``k``) en colonnes d'une ligne"""
+    return {
+        name: np.array([float(kline[field])]).astype(STORED_COLUMNS[name])
+        for name, field in EVENT_FIELDS.items()
+    }
+
+
+def stream_url(pairs: Iterable[Tuple[str, str]], base_url: str = BINANCE_STREAM_URL) -> str:
+    """URL du flux combiné des bougies de chaque (symbole, intervalle)"""
+    streams = '/'.join(f"{symbol.lower()}@kline_{interval}" for symbol, interval in pairs)
+    return f"{base_url}?streams={streams}"
+
+
+class KlineRing:
+    """
+    Les ``capacity`` dernières bougies d'un (symbole, intervalle) dans des
+    tableaux NumPy préalloués.
+
+    Le stockage fait deux fois la capacité: les bougies sont écrites à la
+    suite et, une fois le bout atteint, les plus récentes sont recopiées au
+    début (coût amorti constant). Les bougies courantes restent contiguës,
+    si bien que ``arrays`` renvoie des vues sans copie, valables jusqu'à la
+    mise à jour suivante.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("La capacité doit être positive")
+        self.capacity = capacity
+        self._storage = {
+            name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in STORED_COLUMNS.items()
+        }
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if len(self) == 0:
+            return None
+        return int(self._storage['timestamp'][self._end - 1])
+
+    def extend(self, arrays: Dict[str, np.ndarray]) -> int:
+        """
+        Ajoute des bougies triées; une bougie de même horodatage que la
+        dernière la remplace (bougie en cours), les plus anciennes sont
+        ignorées. Renvoie le nombre de bougies écrites.
+        """
+        last = self.last_timestamp
+        if last is not None:
+            keep = arrays['timestamp'] >= last
+            arrays = {name: values[keep] for name, values in arrays.items()}
+        if len(arrays['timestamp']) == 0:
+            return 0
+        if last is not None and arrays['timestamp'][0] == last:
+            self._end -= 1
+
+        arrays = {name: values[-self.capacity:] for name, values in arrays.items()}
+        count = len(arrays['timestamp'])
+        if self._end + count > len(self._storage['timestamp']):
+            self._compact(min(len(self), self.capacity - count))
+
+        for name, values in self._storage.items():
+            values[self._end:self._end + count] = arrays[name]
+        self._end += count
+        self._start = max(self._start, self._end - self.capacity)
+        return count
+
+    def arrays(self, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Vues en lecture seule des ``limit`` dernières bougies (toutes par défaut)"""
+        start = self._start if limit is None else max(self._start, self._end - limit)
+        views = {}
+        for name, values in self._storage.items():
+            view = values[start:self._end]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def _compact(self, keep: int):
+        """Recopie les ``keep`` dernières bougies au début du stockage"""
+        for values in self._storage.values():
+            values[:keep] = values[self._end - keep:self._end]
+        self._start, self._end = 0, keep
+
+
+class KlineBuffer:
+    """
+    Bougies récentes par (symbole, intervalle), amorcées une fois par REST
+    puis tenues à jour par les événements kline du websocket.
+
+    Avec un ``BarResampler``, les bougies de son intervalle source lui sont
+    transmises au fil de l'eau pour tenir à jour les intervalles dérivés.
+    """
+
+    def __init__(self, capacity: int = 1000, resampler: Optional[BarResampler] = None):
+        self.capacity = capacity
+        self.resampler = resampler
+        self.rings: Dict[Tuple[str, str], KlineRing] = {}
+
+    def seed(self, exchange_service, symbol: str, interval: str, limit: Optional[int] = None):
+        """Amorce le tampon par un seul appel ``get_klines``"""
+        klines = exchange_service.get_klines(symbol, interval, limit=limit or self.capacity)
+        self.add(symbol, interval, klines_to_arrays(klines))
+
+    def add(self, symbol: str, interval: str, arrays: Dict[str, np.ndarray]):
+        """Intègre des bougies triées (nouvelles ou révision de la dernière)"""
+        ring = self.rings.get((symbol, interval))
+        if ring is None:
+            ring = self.rings[(symbol, interval)] = KlineRing(self.capacity)
+
+        last = ring.last_timestamp
+        if (last is not None and len(arrays['timestamp'])
+                and arrays['timestamp'][0] > last + interval_to_ms(interval)):
+            logger.warning(f"Bougies manquantes pour {symbol} {interval} après {last}")
+
+        written = ring.extend(arrays)
+        if written and self.resampler is not None and interval == self.resampler.source_interval:
+            self.resampler.update(symbol, ring.arrays(written))
+
+    def derive(self, symbol: str, interval: str) -> Dict[str, np.ndarray]:
+        """Construit ``interval`` depuis les bougies sources du tampon (mis à jour ensuite)"""
+        arrays = self.get(symbol, self.resampler.source_interval)
+        if arrays is None:
+            raise ValueError(f"Aucune bougie {self.resampler.source_interval} pour {symbol}")
+        return self.resampler.resample(symbol, interval, arrays)
+
+    def get(self, symbol: str, interval: str,
+            limit: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Vues sans copie des dernières bougies, ou None si le couple n'est pas suivi"""
+        ring = self.rings.get((symbol, interval))
+        if ring is None or len(ring) == 0:
+            return None
+        return ring.arrays(limit)
+
+    def on_message(self, message):
+        """Intègre un message du websocket (flux simple ou combiné)"""
+        event = json.loads(message) if isinstance(message, (str, bytes)) else message
+        event = event.get('data', event)
+        if event.get('e') != 'kline':
+            return
+        kline = event['k']
+        self.add(kline['s'], kline['i'], event_to_arrays(kline))
+
+    async def listen(self, url: str):
+        """
+        Consomme le flux jusqu'à sa fermeture; après une reconnexion, un
+        nouvel appel à ``seed`` comble les bougies manquées
+        """
+        async with websockets.connect(url) as websocket:
+            async for message in websocket:
+                self.on_message(message)
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+import trading_app.models.trading_strategy
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading_app', '0002_exchangekey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tradingstrategy',
+            name='buy_rule',
+            field=models.TextField(blank=True, default='', validators=[trading_app.models.trading_strategy.validate_rule]),
+        ),
+        migrations.AddField(
+            model_name='tradingstrategy',
+            name='sell_rule',
+            field=models.TextField(blank=True, default='', validators=[trading_app.models.trading_strategy.validate_rule]),
+        ),
+        migrations.AddField(
+            model_name='tradingstrategy',
+            name='symbol',
+            field=models.CharField(default='BTCUSDT', max_length=20),
+        ),
+    ]
@@ -12,50 +12,92 @@ import lightgbm as lgb
 from datetime import datetime, timedelta
 import joblib
 
+from ..indicators.cache import FUNCTIONS, IndicatorCache, frame_slot
+
 
 class FeatureEngineering:
-    def __init__(self, lookback_periods: List[int] = [5, 10, 20, 50]):
+    def __init__(self, lookback_periods: List[int] = [5, 10, 20, 50],
+                 indicator_cache: IndicatorCache = None,
+                 dtype: np.dtype = np.float64):
         self.lookback_periods = lookback_periods
+        self.indicator_cache = indicator_cache
+        # np.float32: features deux fois plus compactes
+        self.dtype = dtype
         self.scaler = StandardScaler()
 
+    def _series(self, data: pd.DataFrame, name: str, out: np.ndarray, **params) -> np.ndarray:
+        """
+        Calcul partagé via le cache d'indicateurs si les données sont
+        identifiées, écrit dans ``out`` (colonne du bloc de features)
+        """
+        slot = frame_slot(data)
+        if self.indicator_cache is None or slot is None:
+            values = FUNCTIONS[name](data, **params).to_numpy()
+        else:
+            values = self.indicator_cache.series(*slot, data, name, **params)
+        out[:] = values
+        return out
+
     def create_features(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Crée les features pour le machine learning"""
-        df = data.copy()
+        """
+        Crée les features pour le machine learning.
+
+        Les colonnes flottantes d'origine et les features sont écrites dans
+        un seul bloc préalloué de ``dtype``, repris sans copie par le
+        DataFrame. Chaque indicateur est calculé en float64, une colonne à
+        la fois, avant d'être écrit dans le bloc: le MACD (écart de deux EMA
+        proches) perdrait sa précision s'il était calculé en float32.
+        """
+        float_columns = [name for name, values in data.items()
+                         if pd.api.types.is_float_dtype(values)]
+        feature_names = []
+        for period in self.lookback_periods:
+            feature_names += [f'sma_{period}', f'ema_{period}', f'volatility_{period}',
+                              f'roc_{period}', f'volume_sma_{period}']
+        feature_names += ['rsi', 'macd', 'macd_signal', 'bb_middle', 'bb_upper', 'bb_lower']
+
+        names = float_columns + feature_names
+        # Une ligne par colonne: chaque colonne est contiguë en mémoire
+        block = np.empty((len(names), len(data)), dtype=self.dtype)
+        features = dict(zip(names, block))
+        for name in float_columns:
+            features[name][:] = data[name].to_numpy()
 
         # Features techniques
         for period in self.lookback_periods:
             # Moyennes mobiles
-            df[f'sma_{period}'] = df['close'].rolling(period).mean()
-            df[f'ema_{period}'] = df['close'].ewm(span=period).mean()
+            self._series(data, 'sma', features[f'sma_{period}'], period=period)
+            self._series(data, 'ema', features[f'ema_{period}'], span=period, adjust=True)
 
             # Volatilité
-            df[f'volatility_{period}'] = df['close'].rolling(period).std()
+            self._series(data, 'std', features[f'volatility_{period}'], period=period)
 
             # Momentum
-            df[f'roc_{period}'] = df['close'].pct_change(period)
+            features[f'roc_{period}'][:] = data['close'].pct_change(period).to_numpy()
 
             # Volume
-            df[f'volume_sma_{period}'] = df['volume'].rolling(period).mean()
+            self._series(data, 'sma', features[f'volume_sma_{period}'], period=period, column='volume')
 
         # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+        self._series(data, 'rsi', features['rsi'], period=14)
 
         # MACD
-        exp1 = df['close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = exp1 - exp2
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+        self._series(data, 'macd', features['macd'], fast=12, slow=26)
+        self._series(data, 'macd_signal', features['macd_signal'], fast=12, slow=26, signal=9)
 
         # Bandes de Bollinger
-        df['bb_middle'] = df['close'].rolling(20).mean()
-        df['bb_upper'] = df['bb_middle'] + 2 * df['close'].rolling(20).std()
-        df['bb_lower'] = df['bb_middle'] - 2 * df['close'].rolling(20).std()
-
-        return df
+        self._series(data, 'sma', features['bb_middle'], period=20)
+        std_20 = self._series(data, 'std', features['bb_lower'], period=20)
+        np.multiply(std_20, 2, out=features['bb_upper'])
+        np.subtract(features['bb_middle'], features['bb_upper'], out=features['bb_lower'])
+        np.add(features['bb_middle'], features['bb_upper'], out=features['bb_upper'])
+
+        frame = pd.DataFrame(block.T, index=data.index, columns=names, copy=False)
+        # Colonnes non flottantes d'origine, à leur place
+        for position, (name, values) in enumerate(data.items()):
+            if name not in float_columns:
+                frame.insert(position, name, values.to_numpy())
+        return frame
 
     def prepare_ml_data(self,
                         data: pd.DataFrame,
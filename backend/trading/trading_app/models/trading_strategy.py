@@ -1,16 +1,31 @@
-
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.db import models
 
+from ..strategies.rules import RuleError, compile_rule
+
+
+def validate_rule(value: str):
+    """Vérifie qu'une règle se compile (langage de ``strategies.rules``)"""
+    try:
+        compile_rule(value)
+    except RuleError as e:
+        raise ValidationError(str(e))
+
 
 class TradingStrategy(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     is_active = models.BooleanField(default=False)
+    symbol = models.CharField(max_length=20, default='BTCUSDT')
 
     # Paramètres de la stratégie
     buy_threshold = models.DecimalField(max_digits=10, decimal_places=2)
     sell_threshold = models.DecimalField(max_digits=10, decimal_places=2)
     stop_loss = models.DecimalField(max_digits=10, decimal_places=2)
     take_profit = models.DecimalField(max_digits=10, decimal_places=2)
+
+    # Règles déclaratives, ex. "rsi(14) < 30 and macd_hist > 0 and sma(20) > sma(50)"
+    buy_rule = models.TextField(blank=True, default='', validators=[validate_rule])
+    sell_rule = models.TextField(blank=True, default='', validators=[validate_rule])
@@ -1,11 +1,13 @@
-from typing import Dict, List, Tuple, Callable
+from typing import Dict, List, Optional, Tuple, Callable
 import numpy as np
-from scipy.optimize import differential_evolution
 import pandas as pd
 from dataclasses import dataclass
-from concurrent.futures import ProcessPoolExecutor
 import itertools
 
+from ..backtesting.backtest_engine import BacktestEngine, BacktestResult
+from ..backtesting.result_cache import BacktestResultCache
+from ..indicators.cache import IndicatorCache, frame_slot
+
 
 @dataclass
 class OptimizationResult:
@@ -21,11 +23,27 @@ class StrategyOptimizer:
                  strategy_class,
                  parameter_ranges: Dict[str, Tuple[float, float]],
                  data: pd.DataFrame,
-                 initial_capital: float = 10000.0):
+                 initial_capital: float = 10000.0,
+                 commission: float = 0.001,
+                 symbol: str = 'BTCUSDT',
+                 result_cache: Optional[BacktestResultCache] = None,
+                 indicator_parameters: Optional[Dict[str, Tuple[str, str]]] = None,
+                 indicator_cache: Optional[IndicatorCache] = None):
         self.strategy_class = strategy_class
         self.parameter_ranges = parameter_ranges
         self.data = data
         self.initial_capital = initial_capital
+        self.commission = commission
+        self.symbol = symbol
+        # Partagé avec WalkForwardOptimizer: un même backtest n'est joué qu'une fois
+        self.result_cache = result_cache if result_cache is not None else BacktestResultCache()
+        # Paramètre optimisé -> (calcul partagé, argument), ex.
+        # {'rsi_period': ('rsi', 'period')}: la grille de ces indicateurs est
+        # précalculée en une passe et servie aux stratégies par le cache
+        self.indicator_parameters = indicator_parameters or {}
+        if indicator_cache is None and self.indicator_parameters:
+            indicator_cache = IndicatorCache()
+        self.indicator_cache = indicator_cache
         self.optimization_history = []
 
     def optimize(self,
@@ -37,12 +55,15 @@ class StrategyOptimizer:
 
         # Préparation des données
         train_data, val_data = self._split_data_train_val()
+        optimal_params = None
 
         # Configuration de l'optimisation
         bounds = [param_range for param_range in self.parameter_ranges.values()]
         param_names = list(self.parameter_ranges.keys())
 
         if method == 'differential_evolution':
+            from scipy.optimize import differential_evolution
+
             result = differential_evolution(
                 func=lambda x: -self._evaluate_parameters(
                     dict(zip(param_names, x)),
@@ -66,6 +87,9 @@ class StrategyOptimizer:
                 max_iterations
             )
 
+        else:
+            raise ValueError(f"Méthode d'optimisation inconnue: {method}")
+
         # Validation des résultats
         train_metrics = self._calculate_metrics(optimal_params, train_data)
         val_metrics = self._calculate_metrics(optimal_params, val_data)
@@ -83,25 +107,59 @@ class StrategyOptimizer:
             optimization_path=self.optimization_history
         )
 
+    def _split_data_train_val(self, train_ratio: float = 0.7) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Sépare les données en périodes d'entraînement et de validation (ordre chronologique)"""
+        split = int(len(self.data) * train_ratio)
+        return self.data.iloc[:split], self.data.iloc[split:]
+
     def _grid_search(self,
                      data: pd.DataFrame,
                      metric: str,
                      max_iterations: int) -> Dict[str, float]:
         """Effectue une recherche par grille des paramètres optimaux"""
         param_combinations = self._generate_parameter_grid(max_iterations)
+        data = self._preload_indicators(data, param_combinations)
 
-        with ProcessPoolExecutor() as executor:
-            results = list(executor.map(
-                lambda params: (
-                    params,
-                    self._evaluate_parameters(params, data, metric)
-                ),
-                param_combinations
-            ))
+        # Évaluation séquentielle: les matrices d'indicateurs précalculées
+        # vivent dans le cache de ce processus
+        results = [
+            (params, self._evaluate_parameters(params, data, metric))
+            for params in param_combinations
+        ]
 
         best_params, _ = max(results, key=lambda x: x[1])
         return best_params
 
+    def _preload_indicators(self, data: pd.DataFrame, grid: List[Dict]) -> pd.DataFrame:
+        """
+        Calcule en une passe la matrice de chaque indicateur balayé par la
+        grille; renvoie les données, identifiées pour le cache d'indicateurs
+        """
+        if not self.indicator_parameters:
+            return data
+
+        slot = frame_slot(data)
+        if slot is None:
+            # Identifie les données pour que les stratégies lisent le cache,
+            # sur une copie superficielle: le DataFrame de l'appelant est intact
+            slot = (self.symbol, 'optimization')
+            data = data.copy(deep=False)
+            data.attrs.update(symbol=slot[0], interval=slot[1])
+
+        combinations: Dict[str, Dict[Tuple, Dict]] = {}
+        for params in grid:
+            calls: Dict[str, Dict] = {}
+            for param, (name, argument) in self.indicator_parameters.items():
+                if param in params:
+                    # Les fenêtres et spans sont des entiers
+                    calls.setdefault(name, {})[argument] = int(round(params[param]))
+            for name, arguments in calls.items():
+                combinations.setdefault(name, {})[tuple(sorted(arguments.items()))] = arguments
+
+        for name, unique in combinations.items():
+            self.indicator_cache.preload(*slot, data, name, list(unique.values()))
+        return data
+
     def _generate_parameter_grid(self, max_points: int) -> List[Dict]:
         """Génère une grille de paramètres à tester"""
         points_per_dim = int(np.power(max_points, 1 / len(self.parameter_ranges)))
@@ -118,8 +176,6 @@ class StrategyOptimizer:
                              data: pd.DataFrame,
                              metric: str) -> float:
         """Évalue un ensemble de paramètres"""
-        strategy = self.strategy_class(parameters)
-        backtest_result = self._run_backtest(strategy, data)
         metrics = self._calculate_metrics(parameters, data)
 
         self.optimization_history.append({
@@ -133,21 +189,62 @@ class StrategyOptimizer:
                            parameters: Dict[str, float],
                            data: pd.DataFrame) -> Dict[str, float]:
         """Calcule les métriques de performance"""
-        strategy = self.strategy_class(parameters)
-        backtest_result = self._run_backtest(strategy, data)
+        backtest_result = self._run_backtest(parameters, data)
+        # Métriques du backtest (vides sans trade clôturé)
+        metrics = backtest_result.metrics
 
-        returns = self._calculate_returns(backtest_result)
+        total_return = metrics.get('total_pnl', 0.0) / self.initial_capital
+        max_drawdown = metrics.get('max_drawdown', 0.0)
 
         return {
-            'sharpe_ratio': self._calculate_sharpe_ratio(returns),
-            'max_drawdown': self._calculate_max_drawdown(returns),
-            'total_return': self._calculate_total_return(returns),
-            'win_rate': self._calculate_win_rate(backtest_result),
+            'sharpe_ratio': metrics.get('sharpe_ratio', 0.0),
+            'max_drawdown': max_drawdown,
+            'total_return': total_return,
+            'win_rate': metrics.get('win_rate', 0.0),
             'profit_factor': self._calculate_profit_factor(backtest_result),
-            'sortino_ratio': self._calculate_sortino_ratio(returns),
-            'calmar_ratio': self._calculate_calmar_ratio(returns)
+            'sortino_ratio': metrics.get('sortino_ratio', 0.0),
+            'calmar_ratio': total_return / abs(max_drawdown) if max_drawdown else total_return
         }
 
+    @staticmethod
+    def _calculate_profit_factor(backtest_result: BacktestResult) -> float:
+        """Somme des gains sur somme des pertes des trades clôturés"""
+        if not backtest_result.trades:
+            return 0.0
+        pnl = backtest_result.trades.column('pnl')
+        gains = float(pnl[pnl > 0].sum())
+        losses = float(-pnl[pnl < 0].sum())
+        if losses == 0:
+            return float('inf') if gains > 0 else 0.0
+        return gains / losses
+
+    def _run_backtest(self,
+                      parameters: Dict[str, float],
+                      data: pd.DataFrame) -> BacktestResult:
+        """Backtest d'un jeu de paramètres, mémorisé par le cache de résultats"""
+        engine = BacktestEngine(
+            None,
+            initial_capital=self.initial_capital,
+            commission=self.commission,
+            result_cache=self.result_cache
+        )
+        return engine.run_cached(
+            self.strategy_class,
+            parameters,
+            data,
+            self.symbol,
+            strategy_factory=self._strategy_factory(parameters)
+        )
+
+    def _strategy_factory(self, parameters: Dict[str, float]):
+        """
+        Construit la stratégie comme ``run_cached`` (sans service d'échange,
+        paramètres en configuration), reliée au cache d'indicateurs s'il existe
+        """
+        if self.indicator_cache is None:
+            return lambda: self.strategy_class(None, parameters)
+        return lambda: self.strategy_class(None, parameters, indicator_cache=self.indicator_cache)
+
     def _calculate_robustness_score(self,
                                     parameters: Dict[str, float],
                                     train_metrics: Dict[str, float],
@@ -156,7 +253,8 @@ class StrategyOptimizer:
         # Comparaison des performances entre training et validation
         metric_differences = []
         for metric in train_metrics:
-            if metric in val_metrics:
+            # Métrique non finie (ex. profit factor sans perte): non comparable
+            if metric in val_metrics and np.isfinite([train_metrics[metric], val_metrics[metric]]).all():
                 diff = abs(train_metrics[metric] - val_metrics[metric])
                 rel_diff = diff / abs(train_metrics[metric]) if train_metrics[metric] != 0 else float('inf')
                 metric_differences.append(rel_diff)
@@ -0,0 +1,283 @@
+# services/async_binance_service.py
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+from yarl import URL
+
+from .base_exchange_service import BaseExchangeService
+from .binance_service import BinanceService
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangeAPIError(Exception):
+    """Ошибка, возвращённая биржей: HTTP-статус, код и сообщение Binance"""
+
+    def __init__(self, status: int, code: Optional[int], message: str):
+        super().__init__(f"HTTP {status}, код {code}: {message}")
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class AsyncBinanceService(BaseExchangeService):
+    """
+    Асинхронный клиент Binance для кода на asyncio (LiveTradingSystem).
+
+    Запросы идут через одну aiohttp-сессию с пулом keep-alive соединений:
+    ожидание ответа биржи не блокирует цикл событий, а повторные запросы
+    не тратят время на новые TCP/TLS-соединения.
+    """
+    BASE_URL = BinanceService.BASE_URL
+    TESTNET_URL = BinanceService.TESTNET_URL
+    RECV_WINDOW = 5000
+    # Статусы, после которых чтение можно повторить
+    RETRY_STATUSES = {418, 429, 500, 502, 503, 504}
+    # Запрос отклонён лимитами и не исполнен: повтор безопасен и для ордера
+    REJECTED_STATUSES = {418, 429}
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 testnet: bool = False, base_url: Optional[str] = None,
+                 timeout: float = 10.0, max_retries: int = 3, backoff: float = 0.5,
+                 pool_size: int = 20, keepalive_timeout: float = 30.0):
+        """
+        Args:
+            api_key: API ключ
+            api_secret: API секрет
+            testnet: Использовать тестовую сеть
+            base_url: Адрес API (по умолчанию основной или тестовой сети)
+            timeout: Таймаут запроса в секундах
+            max_retries: Количество повторов после неудачной попытки
+            backoff: Начальная задержка между повторами (удваивается)
+            pool_size: Максимум одновременных соединений в пуле
+            keepalive_timeout: Время жизни простаивающего соединения
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url or (self.TESTNET_URL if testnet else self.BASE_URL)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> 'AsyncBinanceService':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Сессия создаётся при первом запросе, внутри работающего цикла событий"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            headers = {'X-MBX-APIKEY': self.api_key} if self.api_key else None
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, headers=headers
+            )
+        return self._session
+
+    async def close(self):
+        """Закрытие сессии и соединений пула"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    @staticmethod
+    def verify_credentials(api_key: str, api_secret: str, testnet: bool = False) -> Tuple[bool, str]:
+        """Проверка API ключей (разовая операция, через синхронный клиент)"""
+        return BinanceService.verify_credentials(api_key, api_secret, testnet)
+
+    def _signed_query(self, params: Dict) -> str:
+        """Строка запроса с timestamp, recvWindow и подписью HMAC-SHA256"""
+        if not self.api_secret:
+            raise ValueError("Для подписанного запроса требуется API секрет")
+        query = urlencode(dict(params, timestamp=int(time.time() * 1000), recvWindow=self.RECV_WINDOW))
+        signature = hmac.new(self.api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+        return f"{query}&signature={signature}"
+
+    async def _request(self, method: str, path: str, params: Optional[Dict] = None,
+                       signed: bool = False) -> Any:
+        """
+        HTTP-запрос с таймаутом и повторами (экспоненциальная задержка).
+        Ордеры (POST) повторяются, только если биржа их точно не приняла:
+        отказ по лимитам или ошибка установки соединения.
+        Returns:
+            Any: Ответ биржи (JSON)
+        """
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        idempotent = method != 'POST'
+        attempt = 0
+        while True:
+            # Подпись пересчитывается при каждой попытке (свежий timestamp)
+            query = self._signed_query(params) if signed else urlencode(params)
+            url = URL(f"{self.base_url}{path}" + (f"?{query}" if query else ''), encoded=True)
+            delay = 0.0
+            try:
+                async with self.session.request(method, url) as response:
+                    text = await response.text()
+                    if response.status < 400:
+                        return json.loads(text)
+                    try:
+                        payload = json.loads(text)
+                    except ValueError:
+                        payload = {'msg': text}
+                    error = ExchangeAPIError(response.status, payload.get('code'), payload.get('msg', ''))
+                    retry = response.status in (self.RETRY_STATUSES if idempotent else self.REJECTED_STATUSES)
+                    delay = float(response.headers.get('Retry-After', 0))
+            except aiohttp.ClientConnectorError as e:
+                # Соединение не установлено: запрос не был отправлен
+                error, retry = e, True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error, retry = e, idempotent
+
+            if not retry or attempt >= self.max_retries:
+                logger.error(f"Ошибка запроса {method} {path}: {error!r}")
+                raise error
+
+            delay = max(delay, self.backoff * 2 ** attempt)
+            attempt += 1
+            logger.warning(f"Повтор {attempt}/{self.max_retries} запроса {method} {path} "
+                           f"через {delay:.2f} с: {error!r}")
+            await asyncio.sleep(delay)
+
+    async def get_account_balance(self, asset: str) -> Decimal:
+        """
+        Получение баланса по конкретному активу
+        Args:
+            asset: Символ актива (например, 'BTC')
+        Returns:
+            Decimal: Доступный баланс
+        """
+        account = await self._request('GET', '/api/v3/account', signed=True)
+        asset_balance = next(
+            (b for b in account['balances'] if b['asset'] == asset),
+            None
+        )
+        if asset_balance is None:
+            return Decimal('0')
+        return Decimal(asset_balance['free'])
+
+    async def get_symbol_price(self, symbol: str) -> Decimal:
+        """
+        Получение текущей цены по символу
+        Args:
+            symbol: Торговая пара (например, 'BTCUSDT')
+        Returns:
+            Decimal: Текущая цена
+        """
+        ticker = await self._request('GET', '/api/v3/ticker/price', {'symbol': symbol})
+        return Decimal(ticker['price'])
+
+    async def get_exchange_info(self) -> Dict:
+        """Получение информации о бирже и торговых парах"""
+        return await self._request('GET', '/api/v3/exchangeInfo')
+
+    async def create_order(self, symbol: str, side: str, type: str,
+                           quantity: Optional[Decimal] = None,
+                           price: Optional[Decimal] = None,
+                           time_in_force: Optional[str] = None,
+                           **params) -> Dict:
+        """
+        Размещение ордера
+        Args:
+            symbol: Торговая пара
+            side: 'BUY' или 'SELL'
+            type: Тип ордера ('MARKET', 'LIMIT', ...)
+            quantity: Количество базового актива
+            price: Цена (для лимитного ордера)
+            time_in_force: Срок действия (для лимитного ордера)
+        Returns:
+            Dict: Информация об ордере
+        """
+        order = await self._request('POST', '/api/v3/order', dict(
+            params,
+            symbol=symbol,
+            side=side,
+            type=type,
+            quantity=self._format_number(quantity),
+            price=self._format_number(price),
+            timeInForce=time_in_force
+        ), signed=True)
+        logger.info(f"Создан ордер {side}: {order}")
+        return order
+
+    async def place_market_buy(self, symbol: str, quantity: Decimal,
+                               quote_order_qty: Optional[Decimal] = None) -> Dict:
+        """
+        Размещение рыночного ордера на покупку
+        Args:
+            symbol: Торговая пара
+            quantity: Количество базового актива
+            quote_order_qty: Количество котируемого актива (покупка на сумму)
+        Returns:
+            Dict: Информация об ордере
+        """
+        if quote_order_qty:
+            return await self.create_order(
+                symbol, 'BUY', 'MARKET', quoteOrderQty=self._format_number(quote_order_qty)
+            )
+        return await self.create_order(symbol, 'BUY', 'MARKET', quantity)
+
+    async def place_market_sell(self, symbol: str, quantity: Decimal) -> Dict:
+        """
+        Размещение рыночного ордера на продажу
+        Args:
+            symbol: Торговая пара
+            quantity: Количество базового актива
+        Returns:
+            Dict: Информация об ордере
+        """
+        return await self.create_order(symbol, 'SELL', 'MARKET', quantity)
+
+    async def get_order_status(self, symbol: str, order_id: int) -> Dict:
+        """Получение статуса ордера"""
+        return await self._request('GET', '/api/v3/order', {'symbol': symbol, 'orderId': order_id},
+                                   signed=True)
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict:
+        """Отмена ордера"""
+        return await self._request('DELETE', '/api/v3/order', {'symbol': symbol, 'orderId': order_id},
+                                   signed=True)
+
+    async def get_klines(self, symbol: str, interval: str,
+                         start_time: Optional[int] = None,
+                         end_time: Optional[int] = None,
+                         limit: Optional[int] = None) -> List[List[Any]]:
+        """
+        Получение исторических данных
+        Args:
+            symbol: Торговая пара
+            interval: Интервал ('1m', '5m', '1h', '1d' и т.д.)
+            start_time: Время начала в миллисекундах
+            end_time: Время окончания в миллисекундах
+            limit: Максимальное количество записей
+        Returns:
+            List[List]: Список свечей
+        """
+        return await self._request('GET', '/api/v3/klines', {
+            'symbol': symbol,
+            'interval': interval,
+            'startTime': start_time,
+            'endTime': end_time,
+            'limit': limit
+        })
+
+    @staticmethod
+    def _format_number(number) -> Optional[str]:
+        """Форматирование числа для API (None остаётся None)"""
+        if number is None:
+            return None
+        return BinanceService._format_number(Decimal(str(number)))
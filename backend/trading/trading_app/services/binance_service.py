@@ -2,33 +2,48 @@
 # services/binance_service.py
 from binance.spot import Spot as BinanceClient
 from binance.exceptions import BinanceAPIException
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 from decimal import Decimal
-from typing import Dict, Optional, Tuple, List, Any
+from typing import Dict, Optional, Tuple, List, Any, Iterator
+
+import numpy as np
+import pandas as pd
 
 from .base_exchange_service import BaseExchangeService
+from .rate_limiter import RequestWeightLimiter
+from ..backtesting.kline_store import CALENDAR_INTERVALS, arrays_to_frame, interval_to_ms, klines_to_arrays
 
 logger = logging.getLogger(__name__)
 
+# Бюджет веса запросов, общий для всех клиентов процесса (лимит Binance — на IP)
+SHARED_WEIGHT_LIMITER = RequestWeightLimiter()
+
 
 class BinanceService(BaseExchangeService):
     BASE_URL = 'https://api.binance.com'
     TESTNET_URL = 'https://testnet.binance.vision'
+    KLINES_LIMIT = 1000
+    KLINES_WEIGHT = 2
 
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: bool = False):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: bool = False,
+                 weight_limiter: Optional[RequestWeightLimiter] = None):
         """
         Инициализация клиента Binance
         Args:
             api_key: API ключ
             api_secret: API секрет
             testnet: Использовать тестовую сеть
+            weight_limiter: Бюджет веса запросов (по умолчанию общий для процесса)
         """
         self.client = BinanceClient(
             api_key=api_key,
             api_secret=api_secret,
             base_url=self.TESTNET_URL if testnet else self.BASE_URL
         )
+        self.weight_limiter = weight_limiter or SHARED_WEIGHT_LIMITER
 
     @staticmethod
     def verify_credentials(api_key: str, api_secret: str, testnet: bool = False) -> Tuple[bool, str]:
@@ -239,6 +254,70 @@ class BinanceService(BaseExchangeService):
             logger.error(f"Ошибка при получении исторических данных: {str(e)}")
             raise
 
+    def get_klines_range(self, symbol: str, interval: str,
+                         start_time: int, end_time: int,
+                         limit: int = KLINES_LIMIT,
+                         max_workers: int = 4,
+                         weight_limiter: Optional[RequestWeightLimiter] = None) -> Iterator[pd.DataFrame]:
+        """
+        Параллельная постраничная загрузка свечей за период
+        Args:
+            symbol: Торговая пара
+            interval: Интервал ('1m', '5m', '1h', '1d' и т.д.)
+            start_time: Время начала в миллисекундах
+            end_time: Время окончания в миллисекундах (включительно)
+            limit: Размер страницы (не больше 1000 для Binance)
+            max_workers: Количество параллельных запросов
+            weight_limiter: Бюджет веса запросов (по умолчанию бюджет сервиса)
+        Returns:
+            Iterator[pd.DataFrame]: Страницы свечей в хронологическом порядке
+        """
+        for arrays in self.get_kline_arrays_range(
+                symbol, interval, start_time, end_time, limit, max_workers, weight_limiter
+        ):
+            yield arrays_to_frame(arrays)
+
+    def get_kline_arrays_range(self, symbol: str, interval: str,
+                               start_time: int, end_time: int,
+                               limit: int = KLINES_LIMIT,
+                               max_workers: int = 4,
+                               weight_limiter: Optional[RequestWeightLimiter] = None
+                               ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        То же, что ``get_klines_range``, но страницы — столбцы NumPy
+        (все поля свечи, как в ``klines_to_arrays``)
+        """
+        limiter = weight_limiter or self.weight_limiter
+        if interval in CALENDAR_INTERVALS:
+            # Месяц разной длины; 1000 месячных свечей покрывают всю историю — одна страница
+            page_span = end_time - start_time + 1
+        else:
+            page_span = interval_to_ms(interval) * limit
+        pages = iter(range(start_time, end_time + 1, page_span))
+
+        def fetch_page(page_start: int) -> Dict[str, np.ndarray]:
+            limiter.acquire(self.KLINES_WEIGHT)
+            klines = self.get_klines(
+                symbol, interval,
+                start_time=page_start,
+                end_time=min(page_start + page_span - 1, end_time),
+                limit=limit
+            )
+            return klines_to_arrays(klines)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Ограниченное окно запросов: память не растёт с длиной периода
+            in_flight = deque(
+                executor.submit(fetch_page, page_start)
+                for _, page_start in zip(range(2 * max_workers), pages)
+            )
+            while in_flight:
+                chunk = in_flight.popleft().result()
+                next_page = next(pages, None)
+                if next_page is not None:
+                    in_flight.append(executor.submit(fetch_page, next_page))
+                yield chunk
+
     def get_ticker_24h(self, symbol: str) -> Dict:
         """
         Получение статистики за 24 часа
@@ -0,0 +1,48 @@
+
+# services/rate_limiter.py
+import threading
+import time
+from collections import deque
+
+
+class RequestWeightLimiter:
+    """
+    Ограничитель веса запросов (скользящее окно), потокобезопасный.
+    Binance ограничивает суммарный вес запросов за минуту с одного IP.
+    """
+
+    def __init__(self, max_weight: int = 1200, period: float = 60.0):
+        """
+        Args:
+            max_weight: Допустимый вес запросов за период
+            period: Длительность окна в секундах
+        """
+        self.max_weight = max_weight
+        self.period = period
+        self._requests = deque()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int = 1):
+        """Блокирует поток, пока запрос с указанным весом не уложится в бюджет"""
+        if weight > self.max_weight:
+            raise ValueError(f"Вес запроса {weight} превышает бюджет {self.max_weight}")
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._requests and now - self._requests[0][0] >= self.period:
+                    self._used -= self._requests.popleft()[1]
+
+                if self._used + weight <= self.max_weight:
+                    self._requests.append((now, weight))
+                    self._used += weight
+                    return
+
+                wait = self.period - (now - self._requests[0][0])
+            time.sleep(wait)
+
+    @property
+    def used_weight(self) -> int:
+        with self._lock:
+            return self._used
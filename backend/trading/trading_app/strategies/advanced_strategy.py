@@ -1,53 +1,73 @@
-
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from .base_strategy import BaseStrategy
+from .market_context import MarketContext
 from .technical_analysis import TechnicalAnalysis
+from ..indicators.cache import IndicatorCache
+from ..indicators.smoothing import sma
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class AdvancedStrategy(BaseStrategy):
-    def __init__(self, binance_service, config: Dict):
+    def __init__(self, binance_service, config: Dict,
+                 indicator_cache: Optional[IndicatorCache] = None):
         super().__init__(binance_service)
         self.config = config
-        self.ta = TechnicalAnalysis(binance_service)
+        self.ta = TechnicalAnalysis(binance_service, indicator_cache=indicator_cache)
 
         # Configuration des seuils
+        self.rsi_period = int(round(config.get('rsi_period', 14)))
         self.rsi_oversold = config.get('rsi_oversold', 30)
         self.rsi_overbought = config.get('rsi_overbought', 70)
         self.stop_loss_pct = config.get('stop_loss_pct', 5)
         self.take_profit_pct = config.get('take_profit_pct', 10)
         self.max_position_size = config.get('max_position_size', 0.1)
-
-    def should_buy(self, symbol: str, current_price: Decimal) -> bool:
+        self.quote_asset = config.get('quote_asset', 'USDT')
+
+    def generate_signals(self, ohlcv: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Signaux sur tout l'historique. Achat: RSI en survente, MACD positif,
+        volume croissant et tendance haussière; vente: RSI en surachat, MACD
+        négatif ou pattern de renversement. Le stop-loss et le take-profit
+        relèvent de ``should_sell`` ou du moteur de backtest.
+        """
+        rsi = self.ta.calculate_rsi(ohlcv, period=self.rsi_period, return_series=True).to_numpy()
+        macd = self.ta.calculate_macd(ohlcv, return_series=True)
+        histogram = (macd['macd_series'] - macd['signal_series']).to_numpy()
+
+        entries = (
+            (rsi < self.rsi_oversold)  # RSI en survente
+            & (histogram > 0)  # MACD positif
+            & self._check_volume_trend(ohlcv)  # Volume croissant
+            & self._check_market_trend(ohlcv)  # Tendance haussière
+        )
+        exits = (
+            (rsi > self.rsi_overbought)  # RSI en surachat
+            | (histogram < 0)  # MACD négatif
+            | self._check_reversal_pattern(ohlcv)  # Pattern de renversement
+        )
+        size = np.full(len(ohlcv), float(self.max_position_size))
+        return entries, exits, size
+
+    def should_buy(self, symbol: str, current_price: Decimal,
+                   context: Optional[MarketContext] = None) -> bool:
         try:
-            # Récupération des données historiques
-            hist_data = self.ta.get_historical_data(symbol, '1h')
-
-            # Calcul des indicateurs
-            rsi = self.ta.calculate_rsi(hist_data)
-            macd = self.ta.calculate_macd(hist_data)
-
-            # Logique d'achat combinant plusieurs indicateurs
-            buy_signals = [
-                rsi < self.rsi_oversold,  # RSI en survente
-                macd['histogram'] > 0,  # MACD positif
-                self._check_volume_trend(hist_data),  # Volume croissant
-                self._check_market_trend(hist_data)  # Tendance haussière
-            ]
-
-            return all(buy_signals)
+            # Signal d'achat de la dernière barre de l'historique
+            entries = self._latest_signals(symbol, context)[0]
+            return bool(entries[-1])
 
         except Exception as e:
             logger.error(f"Erreur dans l'analyse d'achat: {str(e)}")
             return False
 
-    def should_sell(self, symbol: str, current_price: Decimal, entry_price: Optional[Decimal] = None) -> bool:
+    def should_sell(self, symbol: str, current_price: Decimal, entry_price: Optional[Decimal] = None,
+                    context: Optional[MarketContext] = None) -> bool:
         try:
             if entry_price is None:
                 logger.error("Entry price is required for 'should_sell'.")
@@ -65,43 +85,50 @@ class AdvancedStrategy(BaseStrategy):
                 logger.info(f"Take-profit déclenché à {price_change_pct}%")
                 return True
 
-            # Analyse technique pour la sortie
-            hist_data = self.ta.get_historical_data(symbol, '1h')
-            rsi = self.ta.calculate_rsi(hist_data)
-            macd = self.ta.calculate_macd(hist_data)
-
-            sell_signals = [
-                rsi > self.rsi_overbought,  # RSI en surachat
-                macd['histogram'] < 0,  # MACD négatif
-                self._check_reversal_pattern(hist_data)  # Pattern de renversement
-            ]
-
-            return any(sell_signals)
+            # Analyse technique pour la sortie, sur la dernière barre
+            exits = self._latest_signals(symbol, context)[1]
+            return bool(exits[-1])
 
         except Exception as e:
             logger.error(f"Erreur dans l'analyse de vente: {str(e)}")
             return False
 
+    def _latest_signals(self, symbol: str, context: Optional[MarketContext]):
+        """
+        Signaux du contexte (calculés une fois par contexte, ou fournis par
+        le moteur de backtest); sans contexte, l'historique est récupéré
+        auprès de l'API
+        """
+        if context is None:
+            return self.generate_signals(self.ta.get_historical_data(symbol, '1h'))
+        return context.signals(self)
+
+    def calculate_position_size(self, symbol: str) -> Decimal:
+        """Quantité correspondant à ``max_position_size`` du solde en devise de cotation"""
+        balance = self.binance_service.get_account_balance(self.quote_asset)
+        price = self.binance_service.get_symbol_price(symbol)
+        return balance * Decimal(str(self.max_position_size)) / price
+
     @staticmethod
-    def _check_volume_trend(data: pd.DataFrame) -> bool:
-        """Vérifie si le volume est en augmentation"""
-        recent_volume = data['volume'].tail(5).mean()
-        previous_volume = data['volume'].tail(10).head(5).mean()
+    def _check_volume_trend(data: pd.DataFrame) -> np.ndarray:
+        """Volume des 5 dernières barres supérieur à celui des 5 précédentes, à chaque barre"""
+        recent_volume = sma(data['volume'].to_numpy(dtype=float), 5)
+        previous_volume = np.concatenate((np.full(5, np.nan), recent_volume[:-5]))[:len(recent_volume)]
         return recent_volume > previous_volume
 
-    @staticmethod
-    def _check_market_trend(data: pd.DataFrame) -> bool:
-        """Détermine la tendance du marché"""
-        sma_20 = data['close'].rolling(window=20).mean()
-        sma_50 = data['close'].rolling(window=50).mean()
-        return sma_20.iloc[-1] > sma_50.iloc[-1]
+    def _check_market_trend(self, data: pd.DataFrame) -> np.ndarray:
+        """Tendance du marché à chaque barre (SMA 20 au-dessus de la SMA 50)"""
+        sma_20 = self.ta.calculate_sma(data, 20).to_numpy()
+        sma_50 = self.ta.calculate_sma(data, 50).to_numpy()
+        return sma_20 > sma_50
 
     @staticmethod
-    def _check_reversal_pattern(data: pd.DataFrame) -> bool:
-        """Détecte les patterns de renversement"""
+    def _check_reversal_pattern(data: pd.DataFrame) -> np.ndarray:
+        """Détecte les patterns de renversement (trois plus hauts et plus bas décroissants)"""
         # Implémentation basique - à enrichir selon vos besoins
-        last_candles = data.tail(3)
-        return (last_candles['high'].is_monotonic_decreasing and
-                last_candles['low'].is_monotonic_decreasing)
-
+        def non_increasing(values: np.ndarray) -> np.ndarray:
+            falling = np.diff(values, prepend=np.nan) <= 0
+            return falling & np.concatenate(([False], falling[:-1]))
 
+        return (non_increasing(data['high'].to_numpy(dtype=float)) &
+                non_increasing(data['low'].to_numpy(dtype=float)))
@@ -1,19 +1,40 @@
-
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .market_context import MarketContext
 
 
 class BaseStrategy(ABC):
     def __init__(self, binance_service):
         self.binance_service = binance_service
 
-    def should_buy(self, symbol: str, current_price: Decimal) -> bool:
+    def should_buy(self, symbol: str, current_price: Decimal,
+                   context: Optional['MarketContext'] = None) -> bool:
         raise NotImplementedError
 
-    def should_sell(self, symbol: str, current_price: Decimal) -> bool:
+    def should_sell(self, symbol: str, current_price: Decimal,
+                    context: Optional['MarketContext'] = None) -> bool:
+        raise NotImplementedError
+
+    def generate_signals(self, ohlcv: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Interface vectorisée optionnelle: signaux sur tout l'historique
+        ``ohlcv``, sous forme de tableaux alignés sur ses barres (entrées,
+        sorties booléennes, fraction du capital engagée à chaque entrée)
+        """
         raise NotImplementedError
 
     @abstractmethod
     def calculate_position_size(self, symbol: str) -> Decimal:
-        pass
\ No newline at end of file
+        pass
+
+
+def has_signals(strategy) -> bool:
+    """Vrai si la stratégie implémente ``generate_signals``"""
+    method = getattr(type(strategy), 'generate_signals', None)
+    return callable(method) and method is not BaseStrategy.generate_signals
@@ -0,0 +1,95 @@
+import inspect
+from decimal import Decimal
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..backtesting.kline_store import arrays_to_frame, klines_to_arrays
+from ..indicators.cache import FUNCTIONS, IndicatorCache, frame_slot
+
+
+class MarketContext:
+    """
+    État du marché d'un symbole à une barre (ou un tick): bougies connues
+    jusqu'à cette barre, prix courant et valeurs d'indicateurs mémorisées.
+    Construit une fois par symbole et par barre, il est partagé par les
+    stratégies qui évaluent ce symbole, sans nouvel appel à l'API.
+    """
+
+    def __init__(self, symbol: str, interval: str, data: pd.DataFrame,
+                 price: Optional[Decimal] = None,
+                 indicator_cache: Optional[IndicatorCache] = None,
+                 signals: Optional[Dict] = None):
+        self.symbol = symbol
+        self.interval = interval
+        if frame_slot(data) != (symbol, interval):
+            # Permet à l'IndicatorCache de retrouver le créneau (symbole,
+            # intervalle), sur une copie superficielle: le DataFrame de
+            # l'appelant garde ses attributs
+            data = data.copy(deep=False)
+            data.attrs.update(symbol=symbol, interval=interval)
+        self.data = data
+        self.indicator_cache = indicator_cache
+        self._price = price
+        self._values: Dict[Hashable, object] = {}
+        # Signaux déjà calculés jusqu'à cette barre, par stratégie
+        self._signals = signals or {}
+
+    @classmethod
+    def fetch(cls, exchange_service, symbol: str, interval: str = '1h', limit: int = 100,
+              price: Optional[Decimal] = None,
+              indicator_cache: Optional[IndicatorCache] = None) -> 'MarketContext':
+        """Contexte construit à partir d'un seul appel ``get_klines``"""
+        klines = exchange_service.get_klines(symbol, interval, limit=limit)
+        data = arrays_to_frame(klines_to_arrays(klines))
+        return cls(symbol, interval, data, price=price, indicator_cache=indicator_cache)
+
+    @property
+    def price(self) -> Decimal:
+        """Prix courant, ou clôture de la dernière barre à défaut"""
+        if self._price is not None:
+            return self._price
+        return Decimal(str(self.data['close'].iloc[-1]))
+
+    @property
+    def timestamp(self):
+        return self.data.index[-1]
+
+    def array(self, column: str) -> np.ndarray:
+        """Colonne des bougies sous forme de tableau NumPy"""
+        return self.memo(('column', column), lambda: self.data[column].to_numpy(dtype=float))
+
+    def series(self, name: str, **params) -> np.ndarray:
+        """Série d'un calcul partagé de ``FUNCTIONS``, calculée une fois par contexte"""
+        if self.indicator_cache is not None:
+            return self.indicator_cache.series(self.symbol, self.interval, self.data, name, **params)
+        key = (name, tuple(sorted(params.items())))
+        return self.memo(key, lambda: FUNCTIONS[name](self.data, **params).to_numpy(dtype=float))
+
+    def signals(self, strategy) -> Tuple[np.ndarray, ...]:
+        """
+        Signaux (``generate_signals``) de la stratégie jusqu'à la barre du
+        contexte: fournis à la construction, sinon calculés une fois sur
+        ``data``
+        """
+        if strategy in self._signals:
+            return self._signals[strategy]
+        return self.memo(('signals', strategy), lambda: strategy.generate_signals(self.data))
+
+    def memo(self, key: Hashable, compute: Callable[[], object]):
+        """Valeur mémorisée pour ``key`` dans ce contexte, calculée au premier appel"""
+        if key not in self._values:
+            self._values[key] = compute()
+        return self._values[key]
+
+
+def accepts_context(method: Callable) -> bool:
+    """Vrai si la méthode (``should_buy``/``should_sell``) accepte ``context``"""
+    try:
+        parameters = inspect.signature(method).parameters
+    except (TypeError, ValueError):
+        return False
+    return 'context' in parameters or any(
+        parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()
+    )
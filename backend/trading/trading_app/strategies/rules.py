@@ -0,0 +1,311 @@
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..indicators.graph import (CLOSE, HIGH, LOW, OPERATIONS, VOLUME, Node, SeriesGraph,
+                                column, diff, ema, gain, loss, rolling_mean, rolling_std)
+
+# Opérande d'une règle compilée: nœud du graphe ou constante
+Operand = Union[Node, float]
+
+
+class RuleError(ValueError):
+    """Règle invalide: syntaxe, fonction inconnue ou types incompatibles"""
+
+
+TOKEN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_]\w*)|(<=|>=|==|!=|[<>()+\-*/,]))")
+
+COMPARISONS = {'<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge', '==': 'eq', '!=': 'ne'}
+# Comparaison équivalente une fois les opérandes échangés
+MIRRORED = {'lt': 'gt', 'le': 'ge', 'gt': 'lt', 'ge': 'le', 'eq': 'eq', 'ne': 'ne'}
+ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'div'}
+COMMUTATIVE = {'add', 'mul', 'and', 'or'}
+BOOLEAN = {'lt', 'le', 'gt', 'ge', 'eq', 'ne', 'and', 'or', 'not'}
+
+BINARY_FUNCTIONS: Dict[str, Callable] = {
+    'add': operator.add,
+    'sub': operator.sub,
+    'mul': operator.mul,
+    'div': operator.truediv,
+    'lt': operator.lt,
+    'le': operator.le,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'and': operator.and_,
+    'or': operator.or_
+}
+
+
+def _is_boolean(value: Operand) -> bool:
+    return isinstance(value, tuple) and value[0] in BOOLEAN
+
+
+def combine(operation: str, left: Operand, right: Operand) -> Operand:
+    """
+    Nœud binaire sous forme canonique: constantes regroupées, opérandes
+    ordonnés pour les opérations commutatives et les comparaisons, afin que
+    des écritures équivalentes partagent le même nœud
+    """
+    if not isinstance(left, tuple) and not isinstance(right, tuple):
+        if operation not in ARITHMETIC.values():
+            raise RuleError("Comparaison sans série")
+        try:
+            return float(BINARY_FUNCTIONS[operation](left, right))
+        except ZeroDivisionError:
+            raise RuleError("Division par zéro")
+
+    if operation in MIRRORED and (not isinstance(left, tuple) or
+                                  (isinstance(right, tuple) and repr(right) < repr(left))):
+        operation, left, right = MIRRORED[operation], right, left
+    elif operation in COMMUTATIVE and repr(right) < repr(left):
+        left, right = right, left
+    return (operation, left, right)
+
+
+def _macd_line(fast: int = 12, slow: int = 26) -> Node:
+    return combine('sub', ema(CLOSE, fast), ema(CLOSE, slow))
+
+
+def _macd_signal(fast: int = 12, slow: int = 26, signal: int = 9) -> Node:
+    return ema(_macd_line(fast, slow), signal)
+
+
+def _macd_hist(fast: int = 12, slow: int = 26, signal: int = 9) -> Node:
+    return combine('sub', _macd_line(fast, slow), _macd_signal(fast, slow, signal))
+
+
+def _rsi(period: int = 14) -> Node:
+    """RSI à moyennes simples, comme ``indicators.cache.sma_rsi``"""
+    delta = diff(CLOSE)
+    rs = combine('div', rolling_mean(gain(delta), period), rolling_mean(loss(delta), period))
+    return combine('sub', 100.0, combine('div', 100.0, combine('add', rs, 1.0)))
+
+
+# Fonctions du langage (arguments: entiers positifs)
+RULE_FUNCTIONS: Dict[str, Callable[..., Node]] = {
+    'open': lambda: column('open'),
+    'high': lambda: HIGH,
+    'low': lambda: LOW,
+    'close': lambda: CLOSE,
+    'volume': lambda: VOLUME,
+    'sma': lambda period: rolling_mean(CLOSE, period),
+    'ema': lambda span: ema(CLOSE, span),
+    'std': lambda period: rolling_std(CLOSE, period),
+    'volume_sma': lambda period: rolling_mean(VOLUME, period),
+    'rsi': _rsi,
+    'macd': _macd_line,
+    'macd_signal': _macd_signal,
+    'macd_hist': _macd_hist
+}
+
+
+class _Parser:
+    """Analyse descendante: or < and < not < comparaison < + - < * / < unaire"""
+
+    def __init__(self, text: str):
+        self.tokens: List[Tuple[str, str]] = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = TOKEN.match(text, position)
+            if match is None or match.end() == position:
+                raise RuleError(f"Caractère inattendu: {text[position:].lstrip()!r}")
+            number, name, symbol = match.groups()
+            if number is not None:
+                self.tokens.append(('number', number))
+            elif name is not None:
+                self.tokens.append(('name', name))
+            else:
+                self.tokens.append(('symbol', symbol))
+            position = match.end()
+        self.position = 0
+
+    def peek(self) -> Tuple[str, str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return ('end', '')
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, value: str):
+        kind, token = self.take()
+        if token != value:
+            raise RuleError(f"'{value}' attendu, '{token or 'fin de règle'}' trouvé")
+
+    def parse(self) -> Operand:
+        node = self.disjunction()
+        if self.peek()[0] != 'end':
+            raise RuleError(f"Élément inattendu: '{self.peek()[1]}'")
+        return node
+
+    def disjunction(self) -> Operand:
+        node = self.conjunction()
+        while self.peek() == ('name', 'or'):
+            self.take()
+            node = self.logical('or', node, self.conjunction())
+        return node
+
+    def conjunction(self) -> Operand:
+        node = self.negation()
+        while self.peek() == ('name', 'and'):
+            self.take()
+            node = self.logical('and', node, self.negation())
+        return node
+
+    def negation(self) -> Operand:
+        if self.peek() == ('name', 'not'):
+            self.take()
+            operand = self.negation()
+            if not _is_boolean(operand):
+                raise RuleError("'not' s'applique à une condition")
+            # Double négation éliminée
+            return operand[1] if operand[0] == 'not' else ('not', operand)
+        return self.comparison()
+
+    def comparison(self) -> Operand:
+        node = self.sum()
+        kind, token = self.peek()
+        if kind == 'symbol' and token in COMPARISONS:
+            self.take()
+            right = self.sum()
+            self.numeric(node, right)
+            node = combine(COMPARISONS[token], node, right)
+        return node
+
+    def sum(self) -> Operand:
+        node = self.product()
+        while self.peek() in (('symbol', '+'), ('symbol', '-')):
+            operation = ARITHMETIC[self.take()[1]]
+            right = self.product()
+            self.numeric(node, right)
+            node = combine(operation, node, right)
+        return node
+
+    def product(self) -> Operand:
+        node = self.unary()
+        while self.peek() in (('symbol', '*'), ('symbol', '/')):
+            operation = ARITHMETIC[self.take()[1]]
+            right = self.unary()
+            self.numeric(node, right)
+            node = combine(operation, node, right)
+        return node
+
+    def unary(self) -> Operand:
+        if self.peek() == ('symbol', '-'):
+            self.take()
+            operand = self.unary()
+            self.numeric(operand)
+            return combine('sub', 0.0, operand)
+        return self.atom()
+
+    def atom(self) -> Operand:
+        kind, token = self.take()
+        if kind == 'number':
+            return float(token)
+        if token == '(':
+            node = self.disjunction()
+            self.expect(')')
+            return node
+        if kind == 'name':
+            return self.call(token)
+        raise RuleError(f"Expression attendue, '{token or 'fin de règle'}' trouvé")
+
+    def call(self, name: str) -> Node:
+        function = RULE_FUNCTIONS.get(name)
+        if function is None:
+            raise RuleError(f"Fonction inconnue: '{name}'")
+
+        args = []
+        if self.peek() == ('symbol', '('):
+            self.take()
+            while self.peek() != ('symbol', ')'):
+                if args:
+                    self.expect(',')
+                kind, token = self.take()
+                if kind != 'number' or not float(token).is_integer() or float(token) < 1:
+                    raise RuleError(f"Argument de '{name}': entier positif attendu, '{token}' trouvé")
+                args.append(int(float(token)))
+            self.take()
+
+        try:
+            return function(*args)
+        except TypeError:
+            raise RuleError(f"Nombre d'arguments incorrect pour '{name}'")
+
+    @staticmethod
+    def logical(operation: str, left: Operand, right: Operand) -> Operand:
+        if not (_is_boolean(left) and _is_boolean(right)):
+            raise RuleError(f"'{operation}' relie des conditions")
+        return combine(operation, left, right)
+
+    @staticmethod
+    def numeric(*operands: Operand):
+        if any(_is_boolean(operand) for operand in operands):
+            raise RuleError("Opération numérique sur une condition")
+
+
+@lru_cache(maxsize=1024)
+def compile_rule(text: str) -> Node:
+    """
+    Compile une règle (ex. ``rsi(14) < 30 and macd_hist > 0``) en nœud de
+    graphe booléen
+    """
+    node = _Parser(text).parse()
+    if not _is_boolean(node):
+        raise RuleError("Une règle doit être une condition")
+    return node
+
+
+def _operand(graph: SeriesGraph, value: Operand):
+    return graph.get(value) if isinstance(value, tuple) else value
+
+
+def _binary(function: Callable) -> Callable:
+    def operation(graph: SeriesGraph, left: Operand, right: Operand) -> pd.Series:
+        return function(_operand(graph, left), _operand(graph, right))
+    return operation
+
+
+class RuleGraph(SeriesGraph):
+    """Graphe de séries étendu à l'arithmétique, aux comparaisons et à la logique des règles"""
+
+    operations = dict(
+        OPERATIONS,
+        **{name: _binary(function) for name, function in BINARY_FUNCTIONS.items()},
+        **{'not': lambda graph, source: ~graph.get(source)}
+    )
+
+
+class RuleSet:
+    """
+    Règles de plusieurs stratégies compilées dans un même graphe: les
+    sous-expressions communes (indicateurs, comparaisons identiques) sont
+    évaluées une seule fois pour toutes les stratégies d'un symbole.
+    """
+
+    def __init__(self):
+        self.rules: Dict[Hashable, Node] = {}
+
+    def add(self, key: Hashable, rule: str) -> Node:
+        node = compile_rule(rule)
+        self.rules[key] = node
+        return node
+
+    def evaluate(self, data: pd.DataFrame) -> Dict[Hashable, np.ndarray]:
+        """Valeur de chaque règle à chaque barre, en une évaluation du graphe"""
+        graph = RuleGraph(data)
+        graph.evaluate(self.rules.values())
+        return {key: graph.get(node).to_numpy(dtype=bool) for key, node in self.rules.items()}
+
+    def latest(self, data: pd.DataFrame) -> Dict[Hashable, bool]:
+        """Valeur de chaque règle à la dernière barre"""
+        return {key: bool(values[-1]) for key, values in self.evaluate(data).items()}
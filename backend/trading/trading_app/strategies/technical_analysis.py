@@ -2,50 +2,105 @@
 from decimal import Decimal
 import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from ..live_trading.kline_buffer import KlineBuffer
+from ..backtesting.resampler import BarResampler
+from ..indicators.cache import FUNCTIONS, IndicatorCache, frame_slot
+
+KLINE_FRAME_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close',
+    'volume', 'close_time', 'quote_asset_volume',
+    'number_of_trades', 'taker_buy_base_asset_volume',
+    'taker_buy_quote_asset_volume', 'ignore'
+]
+
+# Correspondance colonnes du stockage -> colonnes de l'API
+STORED_TO_FRAME = {
+    'quote_volume': 'quote_asset_volume',
+    'trades_count': 'number_of_trades',
+    'taker_buy_volume': 'taker_buy_base_asset_volume',
+    'taker_buy_quote_volume': 'taker_buy_quote_asset_volume'
+}
 
 
 class TechnicalAnalysis:
-    def __init__(self, binance_service):
+    def __init__(self, binance_service, resampler: Optional[BarResampler] = None,
+                 indicator_cache: Optional[IndicatorCache] = None,
+                 kline_buffer: Optional[KlineBuffer] = None):
         self.binance_service = binance_service
+        self.resampler = resampler
+        self.indicator_cache = indicator_cache
+        self.kline_buffer = kline_buffer
 
     def get_historical_data(self, symbol: str, interval: str,
                             limit: int = 100) -> pd.DataFrame:
         """Récupère les données historiques et calcule les indicateurs"""
+        # Bougies tenues à jour par le websocket, sans requête
+        if self.kline_buffer is not None:
+            arrays = self.kline_buffer.get(symbol, interval, limit)
+            if arrays is not None and len(arrays['timestamp']) >= limit:
+                return self._arrays_frame(arrays, symbol, interval)
+
+        # Intervalle dérivé des bougies fines déjà reçues, sans requête
+        if self.resampler is not None:
+            arrays = self.resampler.get(symbol, interval)
+            if arrays is not None and len(arrays['timestamp']) >= limit:
+                return self._arrays_frame(
+                    {name: values[-limit:] for name, values in arrays.items()}, symbol, interval
+                )
+
         klines = self.binance_service.client.get_historical_klines(
             symbol=symbol,
             interval=interval,
             limit=limit
         )
 
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close',
-            'volume', 'close_time', 'quote_asset_volume',
-            'number_of_trades', 'taker_buy_base_asset_volume',
-            'taker_buy_quote_asset_volume', 'ignore'
-        ])
+        df = pd.DataFrame(klines, columns=KLINE_FRAME_COLUMNS)
 
         df['close'] = pd.to_numeric(df['close'])
+        df.attrs.update(symbol=symbol, interval=interval)
         return df
 
-    def calculate_rsi(self, data: pd.DataFrame, period: int = 14) -> float:
+    @staticmethod
+    def _arrays_frame(arrays: Dict[str, np.ndarray], symbol: str, interval: str) -> pd.DataFrame:
+        """DataFrame au format de l'API construit depuis des colonnes stockées"""
+        df = pd.DataFrame({
+            STORED_TO_FRAME.get(name, name): values for name, values in arrays.items()
+        })
+        df['ignore'] = 0
+        df = df[KLINE_FRAME_COLUMNS]
+        df.attrs.update(symbol=symbol, interval=interval)
+        return df
+
+    def _series(self, data: pd.DataFrame, name: str, **params) -> pd.Series:
+        """Calcul partagé via le cache d'indicateurs si les données sont identifiées"""
+        slot = frame_slot(data)
+        if self.indicator_cache is None or slot is None:
+            return FUNCTIONS[name](data, **params)
+        values = self.indicator_cache.series(*slot, data, name, **params)
+        return pd.Series(values, index=data.index, copy=False)
+
+    def calculate_rsi(self, data: pd.DataFrame, period: int = 14,
+                      return_series: bool = False) -> float:
         """Calcule le RSI (Relative Strength Index)"""
         if data.empty or len(data) < period:
             raise ValueError("Insufficient data for calculation.")
 
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        rsi = self._series(data, 'rsi', period=period)
+        if return_series:
+            return rsi
         return rsi.iloc[-1]
 
+    def calculate_sma(self, data: pd.DataFrame, period: int) -> pd.Series:
+        """Moyenne mobile simple des clôtures"""
+        return self._series(data, 'sma', period=period)
+
     def calculate_macd(self, data: pd.DataFrame, return_series: bool = False) -> Dict[str, float]:
-        exp1 = data['close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['close'].ewm(span=26, adjust=False).mean()
+        exp1 = self._series(data, 'ema', span=12)
+        exp2 = self._series(data, 'ema', span=26)
         macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
+        signal = self._series(data, 'macd_signal', fast=12, slow=26, signal=9)
 
         if return_series:
             return {'macd_series': macd, 'signal_series': signal}
@@ -2,16 +2,21 @@
 # tasks/execute_trading_strategies.py
 from celery import shared_task
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, Optional
 from django.conf import settings
 import logging
 
 from ..models import TradingStrategy, Position, Trade
 from ..services.binance_service import BinanceService
 from ..services.exchange_factory import ExchangeFactory
+from ..strategies.market_context import MarketContext
+from ..strategies.rules import RuleError, RuleSet
 
 logger = logging.getLogger(__name__)
 
+# Глубина истории свечей для индикаторов в правилах (например, sma(200))
+HISTORY_LIMIT = 500
+
 
 class PositionManager:
     def __init__(self, exchange_service: BinanceService):
@@ -90,6 +95,21 @@ class PositionManager:
             return False
 
 
+def build_rule_sets(strategies) -> Dict[str, RuleSet]:
+    """Правила стратегий, сгруппированные по символу (общий граф выражений)"""
+    rule_sets: Dict[str, RuleSet] = {}
+    for strategy in strategies:
+        rule_set = rule_sets.setdefault(strategy.symbol, RuleSet())
+        for side, rule in (('buy', strategy.buy_rule), ('sell', strategy.sell_rule)):
+            if not rule:
+                continue
+            try:
+                rule_set.add((strategy.pk, side), rule)
+            except RuleError as e:
+                logger.error(f"Некорректное правило стратегии {strategy.id} ({side}): {str(e)}")
+    return rule_sets
+
+
 @shared_task
 def execute_trading_strategies():
     """Выполнение торговых стратегий"""
@@ -103,12 +123,30 @@ def execute_trading_strategies():
         )
 
         position_manager = PositionManager(exchange_service)
-        active_strategies = TradingStrategy.objects.filter(is_active=True)
+        active_strategies = list(TradingStrategy.objects.filter(is_active=True))
+        # Один рыночный контекст (свечи и индикаторы) на символ за запуск,
+        # общий для всех стратегий по этому символу
+        contexts = {}
+        # Правила всех стратегий символа вычисляются за один проход
+        rule_sets = build_rule_sets(active_strategies)
 
         for strategy in active_strategies:
             try:
-                # Получаем текущую цену
-                current_price = exchange_service.get_symbol_price(strategy.symbol)
+                context = contexts.get(strategy.symbol)
+                if context is None:
+                    context = MarketContext.fetch(
+                        exchange_service,
+                        strategy.symbol,
+                        limit=HISTORY_LIMIT,
+                        price=exchange_service.get_symbol_price(strategy.symbol)
+                    )
+                    contexts[strategy.symbol] = context
+
+                # Текущая цена из контекста
+                current_price = context.price
+                signals = context.memo(
+                    'rules', lambda: rule_sets[strategy.symbol].latest(context.data)
+                )
 
                 # Проверяем существующие позиции
                 position = Position.objects.filter(
@@ -131,14 +169,14 @@ def execute_trading_strategies():
                             position, current_price, reason='take_profit'
                         )
                     # Проверяем сигнал на продажу от стратегии
-                    elif strategy.should_sell(current_price):
+                    elif signals.get((strategy.pk, 'sell'), False):
                         position_manager.close_position(
                             position, current_price, reason='strategy_signal'
                         )
 
                 else:
                     # Проверяем сигнал на покупку
-                    if strategy.should_buy(current_price):
+                    if signals.get((strategy.pk, 'buy'), False):
                         position_manager.open_position(strategy, current_price)
 
             except Exception as e:
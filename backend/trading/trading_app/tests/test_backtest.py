@@ -1,18 +1,106 @@
+import importlib.util
+import os
+import shutil
+import tempfile
 import unittest
 from datetime import datetime, timedelta
 from decimal import Decimal
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from binance.client import Client
+import numpy as np
+import pandas as pd
 
 from ..services.binance_service import BinanceService
 from ..backtesting.backtest_engine import BacktestEngine
+from ..backtesting.batch_runner import BacktestJob, BatchBacktestRunner, run_job
 from ..backtesting.data_feed import HistoricalDataFeed
+from ..backtesting.result_cache import BacktestResultCache
+from ..backtesting.trade_ledger import TradeLedger
+from ..backtesting.portfolio_engine import PortfolioBacktestEngine, build_panel, strategy_signals
+from ..indicators.cache import close_ema, close_sma, macd_signal, sma_rsi
+from ..optimization.parameter_optimizer import StrategyOptimizer
 from ..strategies.advanced_strategy import AdvancedStrategy
+from ..strategies.base_strategy import BaseStrategy, has_signals
+from ..strategies.market_context import MarketContext, accepts_context
+from ..strategies.rules import RuleError, RuleGraph, RuleSet, compile_rule
+
+
+def make_ohlcv(n: int = 500, seed: int = 42) -> pd.DataFrame:
+    """Génère une série OHLCV synthétique (marche aléatoire)"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(10, 100, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h', name='timestamp'))
+
+
+class SignalReplayStrategy(BaseStrategy):
+    """Rejoue des signaux précalculés, à la barre du contexte"""
+
+    def __init__(self, index, entries, exits):
+        super().__init__(None)
+        self.index = index
+        self.entries = entries
+        self.exits = exits
+
+    def should_buy(self, symbol, current_price, context=None):
+        return bool(self.entries[self.index.get_loc(context.timestamp)])
+
+    def should_sell(self, symbol, current_price, entry_price=None, context=None):
+        return bool(self.exits[self.index.get_loc(context.timestamp)])
+
+    def calculate_position_size(self, symbol):
+        return Decimal('0')
+
+
+class CrossoverStrategy(BaseStrategy):
+    """Croisement de moyennes mobiles, signaux calculés sur tout l'historique"""
+
+    def __init__(self, binance_service, config):
+        super().__init__(binance_service)
+        self.fast = config.get('fast', 5)
+        self.slow = config.get('slow', 20)
+
+    def generate_signals(self, data):
+        fast = data['close'].rolling(self.fast).mean()
+        slow = data['close'].rolling(self.slow).mean()
+        return (fast > slow).to_numpy(), (fast < slow).to_numpy()
+
+    def calculate_position_size(self, symbol):
+        return Decimal('0')
+
+
+class OhlcvKlineClient:
+    """Client Binance simulé: bougies horaires ``make_ohlcv`` sur la page demandée"""
+
+    def __init__(self, seed: int = 1):
+        self.seed = seed
+
+    def klines(self, symbol, interval, startTime=None, endTime=None, limit=None):
+        step = 3_600_000
+        stamps = np.arange(-(-int(startTime) // step) * step, int(endTime) + 1, step)[:limit]
+        data = make_ohlcv(len(stamps), seed=self.seed)
+        return [
+            [int(stamp), str(o), str(h), str(l), str(c), str(v), int(stamp) + step - 1,
+             '0', 0, '0', '0', '0']
+            for stamp, o, h, l, c, v in zip(
+                stamps, data['open'], data['high'], data['low'], data['close'], data['volume']
+            )
+        ]
 
 
 class TestBacktesting(unittest.TestCase):
     def setUp(self):
-        self.binance_service = MagicMock()  # Mock pour les tests
+        self.binance_service = BinanceService()
+        # Série où l'achat en survente (RSI < 30, MACD positif, tendance
+        # haussière) se déclenche dans les 30 jours simulés
+        self.binance_service.client = OhlcvKlineClient(seed=909)
         self.data_feed = HistoricalDataFeed(self.binance_service)
         self.engine = BacktestEngine(self.data_feed)
 
@@ -50,6 +138,527 @@ class TestBacktesting(unittest.TestCase):
         pass
 
 
+class TestVectorizedBacktest(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv()
+        self.data_feed = MagicMock()
+        self.data_feed.get_historical_data.return_value = self.data
+        rng = np.random.default_rng(7)
+        self.entries = rng.random(len(self.data)) < 0.05
+        self.exits = rng.random(len(self.data)) < 0.05
+
+    def _run_both(self, stop_loss_pct=None, take_profit_pct=None):
+        loop_engine = BacktestEngine(self.data_feed)
+        strategy = SignalReplayStrategy(self.data.index, self.entries, self.exits)
+        reference = loop_engine.run(
+            strategy, 'BTCUSDT', datetime(2024, 1, 1), datetime(2024, 2, 1),
+            stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct
+        )
+
+        vector_engine = BacktestEngine(self.data_feed)
+        result = vector_engine.run_vectorized(
+            self.data, self.entries, self.exits, 'BTCUSDT',
+            stop_loss_pct=stop_loss_pct,
+            take_profit_pct=take_profit_pct
+        )
+        return loop_engine, reference, vector_engine, result
+
+    def test_identical_to_bar_loop(self):
+        """Le mode vectorisé reproduit exactement la boucle barre par barre"""
+        loop_engine, reference, vector_engine, result = self._run_both()
+
+        self.assertGreater(len(reference.trades), 0)
+        self.assertEqual(reference.trades, result.trades)
+        self.assertEqual(reference.metrics, result.metrics)
+        pd.testing.assert_series_equal(reference.equity_curve, result.equity_curve)
+        self.assertEqual(loop_engine.current_capital, vector_engine.current_capital)
+
+    def test_identical_with_stop_loss_take_profit(self):
+        """Les sorties stop-loss/take-profit dépendent du prix d'entrée"""
+        _, reference, _, result = self._run_both(stop_loss_pct=1, take_profit_pct=2)
+
+        self.assertEqual(reference.trades, result.trades)
+        self.assertEqual(reference.metrics, result.metrics)
+        pd.testing.assert_series_equal(reference.equity_curve, result.equity_curve)
+
+    def test_misaligned_signals(self):
+        engine = BacktestEngine(self.data_feed)
+        with self.assertRaises(ValueError):
+            engine.run_vectorized(self.data, self.entries[:-1], self.exits, 'BTCUSDT')
+
+    def test_online_metrics_without_equity_curve(self):
+        """L'accumulateur en ligne reproduit les métriques calculées sur la courbe"""
+        _, reference, _, _ = self._run_both(stop_loss_pct=1, take_profit_pct=2)
+
+        loop_engine = BacktestEngine(self.data_feed, keep_equity_curve=False)
+        streamed = loop_engine.run(
+            SignalReplayStrategy(self.data.index, self.entries, self.exits),
+            'BTCUSDT', datetime(2024, 1, 1), datetime(2024, 2, 1),
+            stop_loss_pct=1, take_profit_pct=2
+        )
+        vector_engine = BacktestEngine(self.data_feed, keep_equity_curve=False)
+        batched = vector_engine.run_vectorized(
+            self.data, self.entries, self.exits, 'BTCUSDT',
+            stop_loss_pct=1, take_profit_pct=2
+        )
+
+        for result in (streamed, batched):
+            self.assertIsNone(result.equity_curve)
+            self.assertEqual(result.metrics.keys(), reference.metrics.keys())
+            for key, value in reference.metrics.items():
+                self.assertAlmostEqual(result.metrics[key], value, places=9, msg=key)
+
+
+class TestStrategySignals(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(500, seed=1)
+        self.strategy = AdvancedStrategy(MagicMock(), {
+            'rsi_oversold': 60,
+            'rsi_overbought': 70,
+            'max_position_size': 0.5
+        })
+        self.entries, self.exits, self.size = self.strategy.generate_signals(self.data)
+
+    def test_per_tick_methods_read_latest_row(self):
+        self.assertGreater(self.entries.sum(), 0)
+        for end in range(60, len(self.data), 9):
+            self.strategy.ta.get_historical_data = MagicMock(return_value=self.data.iloc[:end + 1])
+            with self.subTest(bar=end):
+                self.assertEqual(self.strategy.should_buy('BTCUSDT', Decimal('100')), self.entries[end])
+                # Prix d'entrée égal au prix courant: ni stop-loss ni take-profit
+                self.assertEqual(
+                    self.strategy.should_sell('BTCUSDT', Decimal('100'), Decimal('100')),
+                    self.exits[end]
+                )
+
+    def test_engines_use_signals(self):
+        self.assertTrue(has_signals(self.strategy))
+        self.assertTrue(has_signals(CrossoverStrategy(None, {})))
+        self.assertFalse(has_signals(AlwaysInStrategy(None)))
+
+        result = BacktestEngine(MagicMock()).run_strategy(self.strategy, self.data, 'BTCUSDT')
+        expected = BacktestEngine(MagicMock()).run_vectorized(
+            self.data, self.entries, self.exits, 'BTCUSDT',
+            stop_loss_pct=5, take_profit_pct=10, allocation=0.5
+        )
+        self.assertGreater(len(result.trades), 0)
+        self.assertEqual(result.trades, expected.trades)
+        first = result.trades[0]
+        self.assertAlmostEqual(first['quantity'] * first['entry_price'], 10000.0 * 0.5)
+
+    def test_run_strategy_forwards_exit_levels(self):
+        result = BacktestEngine(MagicMock()).run_strategy(
+            self.strategy, self.data, 'BTCUSDT', stop_loss_pct=1, take_profit_pct=2
+        )
+        expected = BacktestEngine(MagicMock()).run_vectorized(
+            self.data, self.entries, self.exits, 'BTCUSDT',
+            stop_loss_pct=1, take_profit_pct=2, allocation=0.5
+        )
+        self.assertEqual(result.trades, expected.trades)
+
+        with self.assertRaises(ValueError):
+            BacktestEngine(MagicMock()).run_strategy(
+                self.strategy, self.data, 'BTCUSDT', intrabar_interval='1m'
+            )
+
+    def test_loop_matches_vectorized(self):
+        """Taille ``size`` et exécution haut/bas des stops identiques sur les deux chemins"""
+        self.strategy.ta.get_historical_data = MagicMock(side_effect=AssertionError('appel API'))
+        for levels in ({}, {'stop_loss_pct': 1, 'take_profit_pct': 2}):
+            loop_engine = BacktestEngine(MagicMock())
+            reference = loop_engine.run_on_data(self.strategy, self.data, 'BTCUSDT', **levels)
+            vector_engine = BacktestEngine(MagicMock())
+            result = vector_engine.run_strategy(self.strategy, self.data, 'BTCUSDT', **levels)
+            with self.subTest(**levels):
+                self.assertGreater(len(reference.trades), 0)
+                self.assertEqual(reference.trades, result.trades)
+                self.assertEqual(reference.metrics, result.metrics)
+                pd.testing.assert_series_equal(reference.equity_curve, result.equity_curve)
+                self.assertEqual(loop_engine.current_capital, vector_engine.current_capital)
+
+    def test_context_replaces_refetch(self):
+        self.strategy.ta.get_historical_data = MagicMock(side_effect=AssertionError('appel API'))
+        for end in range(60, len(self.data), 37):
+            context = MarketContext('BTCUSDT', '1h', self.data.iloc[:end + 1])
+            with self.subTest(bar=end), patch.object(
+                    self.strategy, 'generate_signals', wraps=self.strategy.generate_signals) as generate:
+                self.assertEqual(self.strategy.should_buy('BTCUSDT', context.price, context=context),
+                                 self.entries[end])
+                self.assertEqual(
+                    self.strategy.should_sell('BTCUSDT', context.price, context.price, context=context),
+                    self.exits[end]
+                )
+                # Achat et vente partagent un seul calcul par contexte
+                self.assertEqual(generate.call_count, 1)
+
+    def test_loop_passes_context(self):
+        self.strategy.ta.get_historical_data = MagicMock(side_effect=AssertionError('appel API'))
+        self.assertTrue(accepts_context(self.strategy.should_buy))
+        self.assertFalse(accepts_context(AlwaysInStrategy(None).should_buy))
+
+        with patch.object(self.strategy, 'generate_signals',
+                          wraps=self.strategy.generate_signals) as generate:
+            result = BacktestEngine(MagicMock()).run_on_data(self.strategy, self.data, 'BTCUSDT')
+        self.assertGreater(len(result.trades), 0)
+        self.strategy.ta.get_historical_data.assert_not_called()
+        # Signaux calculés une fois sur tout l'historique, pas à chaque barre
+        self.assertEqual(generate.call_count, 1)
+        # Les stratégies sans ``context`` restent évaluées comme avant
+        legacy = BacktestEngine(MagicMock()).run_on_data(AlwaysInStrategy(None), self.data, 'BTCUSDT')
+        self.assertEqual(len(legacy.trades), 0)
+        self.assertIsNotNone(legacy.equity_curve)
+
+
+class TestMarketContext(unittest.TestCase):
+    def test_fetch_builds_frame_once(self):
+        data = make_ohlcv(120, seed=4)
+        stamps = data.index.asi8 // 1_000_000
+        klines = [[int(t), *(str(v) for v in row), int(t) + 3_599_999, '0', 0, '0', '0', '0']
+                  for t, row in zip(stamps, data[['open', 'high', 'low', 'close', 'volume']].to_numpy())]
+        exchange = MagicMock()
+        exchange.get_klines.return_value = klines
+
+        context = MarketContext.fetch(exchange, 'BTCUSDT', limit=120)
+        exchange.get_klines.assert_called_once_with('BTCUSDT', '1h', limit=120)
+        self.assertEqual(context.timestamp, data.index[-1])
+        np.testing.assert_allclose(context.array('close'), data['close'].to_numpy(), rtol=1e-6)
+        self.assertEqual(context.price, Decimal(str(context.data['close'].iloc[-1])))
+        self.assertEqual(context.data.attrs, {'symbol': 'BTCUSDT', 'interval': '1h'})
+
+    def test_series_computed_once(self):
+        context = MarketContext('BTCUSDT', '1h', make_ohlcv(100), price=Decimal('101.5'))
+        self.assertEqual(context.price, Decimal('101.5'))
+        first = context.series('sma', period=20)
+        self.assertIs(context.series('sma', period=20), first)
+        np.testing.assert_allclose(first[19:], context.data['close'].rolling(20).mean().to_numpy()[19:])
+
+    def test_caller_frame_untouched(self):
+        data = make_ohlcv(100)
+        data.attrs.update(symbol='ETHUSDT', interval='4h')
+        context = MarketContext('BTCUSDT', '1h', data)
+        self.assertEqual(data.attrs, {'symbol': 'ETHUSDT', 'interval': '4h'})
+        self.assertEqual(context.data.attrs, {'symbol': 'BTCUSDT', 'interval': '1h'})
+        self.assertTrue(np.shares_memory(context.array('close'), data['close'].to_numpy()))
+        # Données déjà identifiées: pas de copie
+        self.assertIs(MarketContext('ETHUSDT', '4h', data).data, data)
+
+
+class TestRules(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(500, seed=3)
+        self.rsi = sma_rsi(self.data).to_numpy()
+        self.histogram = (close_ema(self.data, 12) - close_ema(self.data, 26)
+                          - macd_signal(self.data)).to_numpy()
+
+    def test_rules_match_indicators(self):
+        rules = RuleSet()
+        rules.add('trend', 'rsi(14) < 45 and macd_hist > 0 and sma(20) > sma(50)')
+        rules.add('bar', 'not (close < open) or 45 > rsi(14)')
+        rules.add('band', 'close > sma(20) * 1.01 - -0.5')
+        signals = rules.evaluate(self.data)
+
+        close = self.data['close'].to_numpy()
+        sma_20 = close_sma(self.data, 20).to_numpy()
+        trend = (self.rsi < 45) & (self.histogram > 0) & (sma_20 > close_sma(self.data, 50).to_numpy())
+        self.assertGreater(trend.sum(), 0)
+        np.testing.assert_array_equal(signals['trend'], trend)
+        np.testing.assert_array_equal(signals['bar'], (close >= self.data['open'].to_numpy()) | (self.rsi < 45))
+        np.testing.assert_array_equal(signals['band'], close > sma_20 * 1.01 + 0.5)
+        self.assertEqual(rules.latest(self.data), {key: bool(values[-1]) for key, values in signals.items()})
+
+    def test_equivalent_rules_share_nodes(self):
+        self.assertEqual(compile_rule('rsi(14) < 30'), compile_rule('30 > rsi(14)'))
+        self.assertEqual(compile_rule('sma(20) > sma(50) and volume > 0'),
+                         compile_rule('volume > 0 and sma(50) < sma(20)'))
+
+        rules = RuleSet()
+        for key, rule in enumerate(['rsi(14) < 30 and macd_hist > 0',
+                                    'macd_hist > 0 or rsi(14) > 70',
+                                    '30 > rsi(14)']):
+            rules.add(key, rule)
+        plan = RuleGraph.plan(rules.rules.values())
+        separate = sum(len(RuleGraph.plan([node])) for node in rules.rules.values())
+        self.assertLess(len(plan), separate)
+
+        # Chaque nœud commun n'est évalué qu'une fois
+        graph = RuleGraph(self.data)
+        graph.evaluate(rules.rules.values())
+        self.assertEqual(graph.evaluations, len(plan))
+
+    def test_invalid_rules(self):
+        for rule in ['rsi(14) <', 'foo(3) > 1', 'rsi(14) and close > 1', 'close + 1',
+                     'sma(0) > 1', 'sma > 1', '1 < 2', 'close > 1 $', '(close > 1']:
+            with self.subTest(rule=rule), self.assertRaises(RuleError):
+                compile_rule(rule)
+
+
+class AlwaysInStrategy(BaseStrategy):
+    """Achète dès que possible; les sorties viennent du stop/objectif"""
+
+    def should_buy(self, symbol, current_price):
+        return True
+
+    def should_sell(self, symbol, current_price, entry_price=None):
+        return False
+
+    def calculate_position_size(self, symbol):
+        return Decimal('0')
+
+
+class TestIntrabarDrillDown(unittest.TestCase):
+    def setUp(self):
+        self.fine = make_ohlcv(60 * 24 * 5, seed=11)
+        self.fine.index = pd.date_range('2024-01-01', periods=len(self.fine), freq='min', name='timestamp')
+        self.coarse = self.fine.resample('h').agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+        })
+        self.fine_requests = 0
+
+        def get_historical_data(symbol, start_time, end_time, interval):
+            if interval == '1m':
+                self.fine_requests += 1
+                return self.fine
+            return self.coarse
+
+        self.data_feed = MagicMock()
+        self.data_feed.get_historical_data.side_effect = get_historical_data
+
+    def test_fills_at_first_fine_bar_crossing(self):
+        engine = BacktestEngine(self.data_feed)
+        result = engine.run(
+            AlwaysInStrategy(None), 'BTCUSDT', datetime(2024, 1, 1), datetime(2024, 1, 5), '1h',
+            stop_loss_pct=0.5, take_profit_pct=0.5, intrabar_interval='1m'
+        )
+
+        self.assertGreater(len(result.trades), 0)
+        # Barres fines chargées uniquement pour les barres franchissant un niveau
+        self.assertEqual(self.fine_requests, engine.intrabar_resolver.drilldowns)
+        self.assertLess(self.fine_requests, len(self.coarse))
+
+        for trade in result.trades:
+            stop = trade['entry_price'] * (1 - 0.5 / 100)
+            target = trade['entry_price'] * (1 + 0.5 / 100)
+            bar = self.fine.loc[trade['exit_time']]
+            self.assertTrue(bar['low'] <= stop or bar['high'] >= target)
+            self.assertTrue(np.isclose(trade['exit_price'], stop) or np.isclose(trade['exit_price'], target)
+                            or trade['exit_price'] == bar['open'])
+
+            before = self.fine.loc[trade['exit_time'].floor('h'):trade['exit_time']].iloc[:-1]
+            self.assertFalse(((before['low'] <= stop) | (before['high'] >= target)).any())
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(400)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _run(self, cache, params, data=None):
+        engine = BacktestEngine(None, result_cache=cache)
+        return engine.run_cached(CrossoverStrategy, params, self.data if data is None else data, 'BTCUSDT')
+
+    def test_hit_returns_stored_result(self):
+        cache = BacktestResultCache(self.directory)
+        first = self._run(cache, {'fast': 5, 'slow': 20})
+        second = self._run(cache, {'slow': 20, 'fast': np.int64(5)})
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIsNot(first, second)
+        self.assertEqual(first.trades, second.trades)
+        self.assertEqual(first.metrics, second.metrics)
+        pd.testing.assert_series_equal(first.equity_curve, second.equity_curve)
+
+        # Paramètres ou données différents: nouvelle clé
+        self._run(cache, {'fast': 8, 'slow': 20})
+        shifted = self.data.copy()
+        shifted['close'] *= 1.01
+        self._run(cache, {'fast': 5, 'slow': 20}, shifted)
+        self.assertEqual(cache.misses, 3)
+
+    def test_repeated_run_on_same_engine_hits(self):
+        cache = BacktestResultCache()
+        engine = BacktestEngine(None, result_cache=cache)
+        # Historique qui se termine en position
+        data = self.data.iloc[:380]
+        first = engine.run_cached(CrossoverStrategy, {'fast': 5, 'slow': 20}, data, 'BTCUSDT')
+        state = (engine.current_capital, engine.position)
+        self.assertIsNotNone(engine.position)
+
+        # Le second run part du capital initial, pas du capital final du premier
+        second = engine.run_cached(CrossoverStrategy, {'fast': 5, 'slow': 20}, data, 'BTCUSDT')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIs(engine.result, second)
+        self.assertEqual(first.trades, second.trades)
+        self.assertEqual((engine.current_capital, engine.position), state)
+
+        # Un run différent puis le même: l'état restitué est celui du résultat
+        engine.run_cached(CrossoverStrategy, {'fast': 8, 'slow': 20}, data, 'BTCUSDT')
+        engine.run_cached(CrossoverStrategy, {'fast': 5, 'slow': 20}, data, 'BTCUSDT')
+        self.assertEqual((engine.current_capital, engine.position), state)
+
+    def test_disk_tier_and_eviction(self):
+        self._run(BacktestResultCache(self.directory), {'fast': 5, 'slow': 20})
+
+        # Nouveau processus: LRU vide, résultat relu depuis le disque
+        cache = BacktestResultCache(self.directory, max_entries=1)
+        self._run(cache, {'fast': 5, 'slow': 20})
+        self.assertEqual(cache.hits, 1)
+
+        entry_size = os.path.getsize(os.path.join(self.directory, os.listdir(self.directory)[0]))
+        cache.max_disk_bytes = int(entry_size * 2.5)
+        for fast in (3, 4, 6, 7):
+            self._run(cache, {'fast': fast, 'slow': 20})
+        self.assertLessEqual(len(os.listdir(self.directory)), 2)
+
+
+class TestStrategyOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(800, seed=5)
+        self.optimizer = StrategyOptimizer(
+            AdvancedStrategy,
+            {'rsi_period': (7, 21), 'rsi_oversold': (30, 50)},
+            self.data,
+            indicator_parameters={'rsi_period': ('rsi', 'period')}
+        )
+
+    def test_grid_search_reads_preloaded_indicators(self):
+        train, _ = self.optimizer._split_data_train_val()
+        best = self.optimizer._grid_search(train, 'total_return', 9)
+
+        self.assertEqual(set(best), {'rsi_period', 'rsi_oversold'})
+        self.assertEqual(len(self.optimizer.optimization_history), 9)
+        # RSI servis par le préchargement; les autres séries calculées une fois
+        cache = self.optimizer.indicator_cache
+        self.assertGreaterEqual(cache.hits, 9)
+        self.assertLess(cache.misses, 9)
+        returns = [entry['metrics']['total_return'] for entry in self.optimizer.optimization_history]
+        self.assertEqual(self.optimizer._calculate_metrics(best, train)['total_return'], max(returns))
+        # Les données de l'appelant ne sont pas identifiées à sa place
+        self.assertEqual(train.attrs, {})
+
+    def test_repeated_backtest_hits_result_cache(self):
+        params = {'rsi_period': 14, 'rsi_oversold': 40}
+        first = self.optimizer._run_backtest(params, self.data)
+        second = self.optimizer._run_backtest(params, self.data)
+        self.assertEqual((self.optimizer.result_cache.hits, self.optimizer.result_cache.misses), (1, 1))
+        self.assertEqual(first.metrics, second.metrics)
+
+    def test_optimize_grid_search(self):
+        result = self.optimizer.optimize(metric='total_return', method='grid_search', max_iterations=9)
+        self.assertEqual(set(result.parameters), {'rsi_period', 'rsi_oversold'})
+        self.assertIn('sharpe_ratio', result.validation_metrics)
+        self.assertTrue(0 <= result.robustness_score <= 1)
+
+        with self.assertRaises(ValueError):
+            self.optimizer.optimize(method='random')
+
+
+class TestTradeLedger(unittest.TestCase):
+    def setUp(self):
+        self.index = pd.date_range('2024-01-01', periods=3000, freq='min', tz='UTC')
+        self.ledger = TradeLedger(capacity=4)
+        for i in range(0, 3000, 2):
+            self.ledger.append({
+                'entry_time': self.index[i],
+                'exit_time': self.index[i + 1],
+                'symbol': 'BTCUSDT' if i % 4 else 'ETHUSDT',
+                'entry_price': 100.0 + i,
+                'exit_price': 101.0 + i,
+                'quantity': 0.5,
+                'pnl': 0.5 if i % 3 else -0.25,
+                'return': 0.01
+            })
+
+    def test_growable_storage_and_dict_view(self):
+        self.assertEqual(len(self.ledger), 1500)
+        self.assertEqual(self.ledger.array.itemsize, 60)
+        trade = self.ledger[-1]
+        self.assertEqual(trade['entry_time'], self.index[2998])
+        self.assertEqual(trade['symbol'], 'BTCUSDT')
+        self.assertEqual(trade['exit_price'], 3099.0)
+        self.assertEqual(len(self.ledger.for_symbol('ETHUSDT')), 750)
+
+    def test_to_pandas(self):
+        frame = self.ledger.to_pandas()
+        self.assertEqual(len(frame), 1500)
+        self.assertEqual(frame['exit_time'].iloc[0], self.index[1])
+        self.assertEqual(frame['pnl'].sum(), self.ledger.column('pnl').sum())
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow non installé')
+    def test_parquet_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trades.parquet')
+            self.ledger.to_parquet(path)
+            pd.testing.assert_frame_equal(pd.read_parquet(path), self.ledger.to_pandas())
+
+
+class TestPortfolioBacktest(unittest.TestCase):
+    def setUp(self):
+        self.frames = {
+            'BTCUSDT': make_ohlcv(400, seed=1),
+            'ETHUSDT': make_ohlcv(400, seed=2),
+            # Symbole coté plus tard: barres manquantes au début
+            'SOLUSDT': make_ohlcv(400, seed=3).iloc[150:]
+        }
+        self.panel = build_panel(self.frames)
+        close = self.panel['close']
+        fast = close.rolling(5).mean()
+        slow = close.rolling(20).mean()
+        self.entries = fast > slow
+        self.exits = fast < slow
+        self.engine = PortfolioBacktestEngine(MagicMock())
+
+    def test_shared_capital_and_ledgers(self):
+        result = self.engine.run_on_panel(self.panel, self.entries, self.exits)
+
+        self.assertEqual(len(result.equity_curve), len(self.panel['close']))
+        self.assertEqual(
+            len(result.trades),
+            sum(len(trades) for trades in result.symbol_trades.values())
+        )
+        for symbol, trades in result.symbol_trades.items():
+            self.assertTrue(all(t['symbol'] == symbol for t in trades))
+        self.assertTrue(all(
+            t['entry_time'] >= self.frames['SOLUSDT'].index[0]
+            for t in result.symbol_trades['SOLUSDT']
+        ))
+        # Tant qu'aucun trade n'est ouvert, l'équité reste au capital initial
+        self.assertEqual(result.equity_curve.iloc[0], 10000.0)
+        self.assertIn('sharpe_ratio', result.metrics)
+
+    def test_strategy_signal_function(self):
+        entries, exits = strategy_signals(CrossoverStrategy(None, {'fast': 5, 'slow': 20}))(self.panel)
+        pd.testing.assert_frame_equal(entries, self.entries)
+        pd.testing.assert_frame_equal(exits, self.exits)
+
+    def test_weights_cap_exposure(self):
+        engine = PortfolioBacktestEngine(
+            MagicMock(), allocation={'BTCUSDT': 0.5, 'ETHUSDT': 0.5}
+        )
+        result = engine.run_on_panel(self.panel, self.entries, self.exits)
+        self.assertEqual(result.symbol_trades['SOLUSDT'], [])
+        self.assertGreater(len(result.symbol_trades['BTCUSDT']), 0)
+
+
+class TestBatchRunner(unittest.TestCase):
+    def test_parallel_results_match_sequential(self):
+        frames = {'BTCUSDT': make_ohlcv(300, seed=1), 'ETHUSDT': make_ohlcv(300, seed=2)}
+        jobs = [
+            BacktestJob(CrossoverStrategy, symbol, {'fast': fast, 'slow': 20})
+            for symbol in frames
+            for fast in (3, 5, 8)
+        ]
+
+        results = BatchBacktestRunner(frames, max_workers=2).run(jobs)
+
+        self.assertEqual(len(results), len(jobs))
+        self.assertEqual(list(results['symbol']), [job.symbol for job in jobs])
+        for row, job in zip(results.to_dict('records'), jobs):
+            expected = run_job(job, frames[job.symbol], 10000.0, 0.001)
+            self.assertEqual(row['fast'], job.params['fast'])
+            self.assertAlmostEqual(row['total_pnl'], expected['total_pnl'])
+
+
 # Exemple d'utilisation
 if __name__ == '__main__':
     # Configuration du backtest
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+import unittest
+from decimal import Decimal
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from ..backtesting.kline_store import interval_to_ms
+from ..services.async_binance_service import AsyncBinanceService, ExchangeAPIError
+from ..services.binance_service import BinanceService
+from ..services.rate_limiter import RequestWeightLimiter
+
+
+class TestKlinesRange(unittest.TestCase):
+    def setUp(self):
+        self.service = BinanceService()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+        def fake_get_klines(symbol, interval, start_time=None, end_time=None, limit=None):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.01)
+            with self.lock:
+                self.active -= 1
+            step = interval_to_ms(interval)
+            return [
+                [t, '1', '1', '1', '1', '1', t + step - 1, '1', 1, '1', '1', '0']
+                for t in range(start_time, end_time + 1, step)
+            ][:limit]
+
+        self.service.get_klines = fake_get_klines
+
+    def test_pages_are_complete_and_ordered(self):
+        start = 1_704_067_200_000
+        end = start + 5_000 * 60_000 - 1
+        chunks = list(self.service.get_klines_range(
+            'BTCUSDT', '1m', start, end, limit=1000, max_workers=4
+        ))
+
+        self.assertEqual(len(chunks), 5)
+        timestamps = [ts for chunk in chunks for ts in chunk.index.asi8 // 10 ** 6]
+        self.assertEqual(timestamps, list(range(start, end + 1, 60_000)))
+        self.assertGreater(self.max_active, 1)
+        self.assertLessEqual(self.max_active, 4)
+
+    def test_weight_budget_is_shared(self):
+        limiter = RequestWeightLimiter(max_weight=100, period=60)
+        start = 1_704_067_200_000
+        list(self.service.get_klines_range(
+            'BTCUSDT', '1m', start, start + 3_000 * 60_000 - 1, weight_limiter=limiter
+        ))
+        self.assertEqual(limiter.used_weight, 3 * BinanceService.KLINES_WEIGHT)
+
+    def test_services_share_default_budget(self):
+        self.assertIs(BinanceService().weight_limiter, self.service.weight_limiter)
+
+        limiter = RequestWeightLimiter()
+        service = BinanceService(weight_limiter=limiter)
+        service.get_klines = self.service.get_klines
+        start = 1_704_067_200_000
+        pages = list(service.get_kline_arrays_range('BTCUSDT', '1m', start, start + 2_000 * 60_000 - 1))
+        self.assertEqual(limiter.used_weight, 2 * BinanceService.KLINES_WEIGHT)
+        self.assertEqual(sum(len(page['close_time']) for page in pages), 2_000)
+
+
+class TestAsyncBinanceService(unittest.IsolatedAsyncioTestCase):
+    """Client asynchrone contre une fausse API Binance locale"""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.peers = set()
+        self.failures = {}
+        app = web.Application()
+        app.router.add_get('/api/v3/ticker/price', self.ticker)
+        app.router.add_get('/api/v3/account', self.account)
+        app.router.add_post('/api/v3/order', self.order)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.service = AsyncBinanceService(
+            'key', 'secret', base_url=str(self.server.make_url('')).rstrip('/'),
+            timeout=0.5, max_retries=2, backoff=0
+        )
+
+    async def asyncTearDown(self):
+        await self.service.close()
+        await self.server.close()
+
+    async def respond(self, request, payload):
+        self.requests.append((request.method, request.path))
+        self.peers.add(request.transport.get_extra_info('peername'))
+        failure = self.failures.get(request.path)
+        if failure:
+            status, headers = failure.pop(0)
+            if status == 'slow':
+                await asyncio.sleep(1)
+            else:
+                return web.json_response({'code': -1003, 'msg': 'erreur'}, status=status, headers=headers)
+        return web.json_response(payload)
+
+    def check_signature(self, request):
+        query = request.query_string
+        unsigned, signature = query.rsplit('&signature=', 1)
+        expected = hmac.new(b'secret', unsigned.encode(), hashlib.sha256).hexdigest()
+        if request.headers.get('X-MBX-APIKEY') != 'key' or signature != expected:
+            raise web.HTTPUnauthorized()
+
+    async def ticker(self, request):
+        return await self.respond(request, {'symbol': request.query['symbol'], 'price': '42000.50'})
+
+    async def account(self, request):
+        self.check_signature(request)
+        return await self.respond(request, {'balances': [{'asset': 'USDT', 'free': '1234.5', 'locked': '0'}]})
+
+    async def order(self, request):
+        self.check_signature(request)
+        return await self.respond(request, {'orderId': 1, 'status': 'FILLED', **request.query})
+
+    async def test_signed_requests_reuse_connection(self):
+        for _ in range(5):
+            self.assertEqual(await self.service.get_account_balance('USDT'), Decimal('1234.5'))
+        self.assertEqual(await self.service.get_account_balance('BTC'), Decimal('0'))
+        order = await self.service.place_market_buy('BTCUSDT', Decimal('0.00100'))
+        self.assertEqual((order['side'], order['quantity']), ('BUY', '0.001'))
+        # Une seule connexion keep-alive pour toutes les requêtes
+        self.assertEqual(len(self.peers), 1)
+
+    async def test_reads_are_retried(self):
+        self.failures['/api/v3/ticker/price'] = [(503, None), (429, {'Retry-After': '0'})]
+        self.assertEqual(await self.service.get_symbol_price('BTCUSDT'), Decimal('42000.50'))
+        self.assertEqual(len(self.requests), 3)
+
+        self.failures['/api/v3/ticker/price'] = [('slow', None)] * 3
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.service.get_symbol_price('BTCUSDT')
+        self.assertEqual(len(self.requests), 6)
+
+    async def test_orders_retried_only_when_rejected(self):
+        self.failures['/api/v3/order'] = [(429, None)]
+        await self.service.place_market_sell('BTCUSDT', Decimal('1'))
+        self.assertEqual(len(self.requests), 2)
+
+        # Erreur serveur: l'ordre a pu être exécuté, pas de nouvel envoi
+        self.failures['/api/v3/order'] = [(502, None)]
+        with self.assertRaises(ExchangeAPIError) as error:
+            await self.service.place_market_sell('BTCUSDT', Decimal('1'))
+        self.assertEqual((error.exception.status, error.exception.code), (502, -1003))
+        self.assertEqual(len(self.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,334 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import websockets
+
+from ..backtesting.data_feed import HistoricalDataFeed
+from ..backtesting.kline_store import KlineStore, interval_to_ms, klines_to_arrays, subtract_ranges
+from ..backtesting.resampler import BarResampler, resample_arrays
+from ..live_trading.kline_buffer import KlineBuffer, KlineRing
+from ..services.binance_service import BinanceService
+from ..services.rate_limiter import RequestWeightLimiter
+from ..strategies.technical_analysis import TechnicalAnalysis
+
+
+class FakeKlineClient:
+    """Client Binance simulé: bougies déterministes, appels comptabilisés"""
+
+    def __init__(self):
+        self.calls = []
+
+    def klines(self, symbol, interval, startTime=None, endTime=None, limit=None):
+        """Une page de ``/api/v3/klines``, appelée par ``BinanceService.get_klines``"""
+        self.calls.append((symbol, interval, startTime, endTime))
+        return self.get_historical_klines(symbol, interval, startTime, endTime)[:limit]
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str, **kwargs):
+        if interval == '1M':
+            months = pd.date_range(pd.Timestamp(int(start_str), unit='ms').ceil('D'),
+                                   pd.Timestamp(int(end_str), unit='ms'), freq='MS')
+            open_times = months.asi8 // 1_000_000
+            close_times = (months + pd.offsets.MonthBegin()).asi8 // 1_000_000 - 1
+            return [
+                [int(open_time), '100', '101', '99', '100.5', '10.0', int(close_time),
+                 '1000.0', 42, '5.0', '500.0', '0']
+                for open_time, close_time in zip(open_times, close_times)
+            ]
+
+        step = interval_to_ms(interval)
+        first = -(-int(start_str) // step) * step
+        klines = []
+        for open_time in range(first, int(end_str) + 1, step):
+            price = 100 + (open_time // step) % 50
+            klines.append([
+                open_time, str(price), str(price + 1), str(price - 1), str(price + 0.5),
+                '10.0', open_time + step - 1, '1000.0', 42, '5.0', '500.0', '0'
+            ])
+        return klines
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestKlineStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.client = FakeKlineClient()
+        service = BinanceService()
+        service.client = self.client
+        self.service = service
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _feed(self):
+        return HistoricalDataFeed(self.service, store=KlineStore(self.root))
+
+    def test_monthly_klines_bypass_store(self):
+        """Bougies mensuelles (durée variable) téléchargées directement, en une page"""
+        feed = self._feed()
+        df = feed.get_historical_data('BTCUSDT', utc(2022, 1, 1), utc(2024, 1, 1), '1M')
+        self.assertEqual(len(df), 25)
+        self.assertEqual(df.index[0], pd.Timestamp('2022-01-01'))
+        self.assertEqual(df.index[-1], pd.Timestamp('2024-01-01'))
+        self.assertEqual(len(self.client.calls), 1)
+        self.assertEqual(df.attrs, {'symbol': 'BTCUSDT', 'interval': '1M'})
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_second_feed_reads_from_disk(self):
+        """Un nouveau flux (autre worker) relit le disque sans appel réseau"""
+        df = self._feed().get_historical_data('BTCUSDT', utc(2024, 1, 20), utc(2024, 2, 10), '1h')
+        self.assertEqual(len(self.client.calls), 1)
+        self.assertEqual(len(df), 21 * 24 + 1)
+        self.assertTrue(df.index.is_monotonic_increasing)
+
+        again = self._feed().get_historical_data('BTCUSDT', utc(2024, 1, 20), utc(2024, 2, 10), '1h')
+        self.assertEqual(len(self.client.calls), 1)
+        np.testing.assert_array_equal(again['close'].to_numpy(), df['close'].to_numpy())
+
+    def test_only_missing_ranges_are_fetched(self):
+        self._feed().get_historical_data('BTCUSDT', utc(2024, 1, 10), utc(2024, 1, 20), '1h')
+        df = self._feed().get_historical_data('BTCUSDT', utc(2024, 1, 1), utc(2024, 1, 31), '1h')
+
+        # Deux plages manquantes: avant et après la plage déjà stockée
+        self.assertEqual(len(self.client.calls), 3)
+        self.assertEqual(len(df), 30 * 24 + 1)
+        self.assertFalse(df.index.has_duplicates)
+        step = np.diff(df.index.asi8) // 10 ** 6
+        self.assertTrue((step == interval_to_ms('1h')).all())
+
+    def test_concurrent_writes_keep_rows_and_coverage(self):
+        """Des workers écrivant le même mois ne perdent ni bougies ni plages"""
+        arrays = klines_to_arrays(self.client.get_historical_klines(
+            'BTCUSDT', '1h', 1704067200000, 1704067200000 + 20 * 86_400_000 - 1
+        ))
+        day = 24
+        barrier = threading.Barrier(10)
+
+        def write(index):
+            rows = slice(2 * index * day, (2 * index + 1) * day)
+            chunk = {name: values[rows] for name, values in arrays.items()}
+            barrier.wait()
+            KlineStore(self.root).write(
+                'BTCUSDT', '1h', chunk,
+                (int(chunk['timestamp'][0]), int(chunk['timestamp'][-1]) + interval_to_ms('1h'))
+            )
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        store = KlineStore(self.root)
+        self.assertEqual(len(store.coverage('BTCUSDT', '1h')), 10)
+        stored = store.read('BTCUSDT', '1h', 1704067200000, 1704067200000 + 20 * 86_400_000)
+        self.assertEqual(len(stored['timestamp']), 10 * day)
+        self.assertEqual({len(values) for values in stored.values()}, {10 * day})
+
+        # Seules la version publiée et son lien restent sur disque
+        series_dir = os.path.join(self.root, 'BTCUSDT', '1h')
+        self.assertEqual(len([n for n in os.listdir(series_dir) if n.startswith('.2024-01')]), 1)
+
+    def test_subtract_ranges(self):
+        self.assertEqual(subtract_ranges(0, 100, [(10, 20), (15, 30), (50, 60)]),
+                         [(0, 10), (30, 50), (60, 100)])
+        self.assertEqual(subtract_ranges(0, 100, [(0, 100)]), [])
+
+
+class TestKlineRangeCache(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeKlineClient()
+        service = BinanceService(weight_limiter=RequestWeightLimiter())
+        service.client = self.client
+        self.feed = HistoricalDataFeed(service)
+
+    def test_sub_window_served_from_superset(self):
+        """Jan–Mar après Jan–Jun: tranche sans copie, aucun téléchargement"""
+        full = self.feed.get_historical_data('BTCUSDT', utc(2024, 1, 1), utc(2024, 6, 30), '1h')
+        downloads = len(self.client.calls)
+        window = self.feed.get_historical_data('BTCUSDT', utc(2024, 1, 1), utc(2024, 3, 31), '1h')
+
+        # Une page par tranche de 1000 bougies, aucune pour la fenêtre
+        self.assertEqual(downloads, -(-len(full) // BinanceService.KLINES_LIMIT))
+        self.assertEqual(len(self.client.calls), downloads)
+        # Pages décomptées du budget de poids du service
+        self.assertEqual(self.feed.binance_service.weight_limiter.used_weight,
+                         downloads * BinanceService.KLINES_WEIGHT)
+        self.assertEqual(window.index[-1], full.loc['2024-03-31'].index[0])
+        self.assertTrue(np.shares_memory(window['close'].to_numpy(), full['close'].to_numpy()))
+
+    def test_partial_overlap_fetches_gaps_only(self):
+        self.feed.get_historical_data('BTCUSDT', utc(2024, 2, 1), utc(2024, 3, 1), '1h')
+        self.feed.get_historical_data('BTCUSDT', utc(2024, 4, 1), utc(2024, 5, 1), '1h')
+        df = self.feed.get_historical_data('BTCUSDT', utc(2024, 1, 15), utc(2024, 4, 15), '1h')
+
+        # Trous: 15/01–01/02 et 01/03–01/04
+        gap_calls = self.client.calls[2:]
+        self.assertEqual(len(gap_calls), 2)
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertFalse(df.index.has_duplicates)
+        self.assertEqual(len(self.feed.data_cache.covered_ranges('BTCUSDT', '1h')), 1)
+
+
+class TestBarResampler(unittest.TestCase):
+    def setUp(self):
+        start = int(utc(2024, 1, 1).timestamp() * 1000)
+        klines = FakeKlineClient().get_historical_klines(
+            'BTCUSDT', '1m', start, start + 3 * 86_400_000 - 1
+        )
+        self.minutes = klines_to_arrays(klines)
+
+    def _expected(self, arrays, rule):
+        frame = pd.DataFrame(arrays)
+        frame.index = pd.to_datetime(frame['timestamp'], unit='ms')
+        return frame.resample(rule).agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+            'volume': 'sum', 'quote_volume': 'sum', 'trades_count': 'sum'
+        })
+
+    def test_aggregation_matches_pandas(self):
+        for interval, rule in (('1h', 'h'), ('4h', '4h'), ('1d', 'D')):
+            derived = resample_arrays(self.minutes, interval)
+            expected = self._expected(self.minutes, rule)
+            for name in expected.columns:
+                np.testing.assert_allclose(derived[name], expected[name].to_numpy(), err_msg=name)
+
+    def test_incremental_partial_bar(self):
+        """Nouvelles bougies 1m (et révision de la dernière) intégrées au fil de l'eau"""
+        resampler = BarResampler()
+        head = {name: values[:1000] for name, values in self.minutes.items()}
+        resampler.resample('BTCUSDT', '1h', head)
+        resampler.resample('BTCUSDT', '4h', head)
+
+        for start in range(1000, len(self.minutes['timestamp']), 7):
+            chunk = {name: values[start:start + 7].copy() for name, values in self.minutes.items()}
+            revised = {name: values[-1:].copy() for name, values in chunk.items()}
+            chunk['close'][-1] += 3
+            resampler.update('BTCUSDT', chunk)
+            held = resampler.get('BTCUSDT', '1h')
+            snapshot = {name: values.copy() for name, values in held.items()}
+            resampler.update('BTCUSDT', revised)
+            # La révision ne modifie pas les tableaux déjà remis
+            for name, values in snapshot.items():
+                np.testing.assert_array_equal(held[name], values, err_msg=name)
+            self.assertFalse(held['close'].flags.writeable)
+
+        for interval in ('1h', '4h'):
+            expected = resample_arrays(self.minutes, interval)
+            derived = resampler.get('BTCUSDT', interval)
+            for name, values in expected.items():
+                np.testing.assert_array_equal(derived[name], values, err_msg=name)
+
+    def test_feed_derives_coarse_interval_from_stored_minutes(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        client = FakeKlineClient()
+        service = BinanceService()
+        service.client = client
+
+        HistoricalDataFeed(service, store=KlineStore(root)).get_historical_data(
+            'BTCUSDT', utc(2024, 1, 1), utc(2024, 1, 4), '1m'
+        )
+        hourly = HistoricalDataFeed(service, store=KlineStore(root)).get_historical_data(
+            'BTCUSDT', utc(2024, 1, 1), utc(2024, 1, 3), '1h'
+        )
+
+        self.assertEqual({call[1] for call in client.calls}, {'1m'})
+        self.assertEqual(len(hourly), 2 * 24 + 1)
+        expected = self._expected(self.minutes, 'h').iloc[:len(hourly)]
+        np.testing.assert_allclose(hourly['high'].to_numpy(), expected['high'].to_numpy())
+        np.testing.assert_allclose(hourly['volume'].to_numpy(), expected['volume'].to_numpy())
+
+
+def kline_event(kline, symbol='BTCUSDT', interval='1m', closed=True) -> str:
+    """Message du flux combiné Binance pour une bougie brute de l'API"""
+    return json.dumps({'stream': f"{symbol.lower()}@kline_{interval}", 'data': {
+        'e': 'kline', 'E': kline[6], 's': symbol, 'k': {
+            't': kline[0], 'T': kline[6], 's': symbol, 'i': interval,
+            'o': kline[1], 'h': kline[2], 'l': kline[3], 'c': kline[4], 'v': kline[5],
+            'n': kline[8], 'x': closed, 'q': kline[7], 'V': kline[9], 'Q': kline[10]
+        }
+    }})
+
+
+class TestKlineBuffer(unittest.TestCase):
+    def setUp(self):
+        start = int(utc(2024, 1, 1, 0, 17).timestamp() * 1000)
+        self.klines = FakeKlineClient().get_historical_klines(
+            'BTCUSDT', '1m', start, start + 900 * 60_000 - 1
+        )
+        self.minutes = klines_to_arrays(self.klines)
+
+    def test_ring_keeps_latest_bars_contiguous(self):
+        ring = KlineRing(50)
+        for i in range(len(self.klines)):
+            row = {name: values[i:i + 1].copy() for name, values in self.minutes.items()}
+            # Bougie en cours puis bougie close, au même horodatage
+            partial = {name: values.copy() for name, values in row.items()}
+            partial['close'] += 7
+            ring.extend(partial)
+            ring.extend(row)
+
+            if i % 37 == 0 or i == len(self.klines) - 1:
+                arrays = ring.arrays()
+                for name, values in self.minutes.items():
+                    np.testing.assert_array_equal(arrays[name], values[max(0, i - 49):i + 1], err_msg=name)
+
+        latest = ring.arrays(10)
+        self.assertTrue(np.shares_memory(latest['close'], ring.arrays()['close']))
+        self.assertFalse(latest['close'].flags.writeable)
+
+    def test_websocket_updates_buffer_and_resampler(self):
+        exchange = MagicMock()
+        exchange.get_klines.return_value = self.klines[:600]
+        buffer = KlineBuffer(capacity=600, resampler=BarResampler('1m'))
+        buffer.seed(exchange, 'BTCUSDT', '1m')
+        exchange.get_klines.assert_called_once_with('BTCUSDT', '1m', limit=600)
+        buffer.derive('BTCUSDT', '1h')
+
+        messages = [json.dumps({'result': None, 'id': 1})]
+        for kline in self.klines[600:]:
+            partial = list(kline)
+            partial[4] = str(float(kline[4]) + 3)
+            messages += [kline_event(partial, closed=False), kline_event(kline)]
+
+        async def scenario():
+            async def handler(websocket):
+                for message in messages:
+                    await websocket.send(message)
+
+            async with websockets.serve(handler, '127.0.0.1', 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                await buffer.listen(f"ws://127.0.0.1:{port}/stream?streams=btcusdt@kline_1m")
+
+        asyncio.run(asyncio.wait_for(scenario(), timeout=30))
+
+        arrays = buffer.get('BTCUSDT', '1m')
+        for name, values in self.minutes.items():
+            np.testing.assert_array_equal(arrays[name], values[-600:], err_msg=name)
+        expected = resample_arrays(self.minutes, '1h')
+        derived = buffer.resampler.get('BTCUSDT', '1h')
+        for name, values in expected.items():
+            np.testing.assert_array_equal(derived[name], values, err_msg=name)
+
+        # L'analyse technique lit le tampon sans requête REST
+        ta = TechnicalAnalysis(exchange, kline_buffer=buffer)
+        frame = ta.get_historical_data('BTCUSDT', '1m', limit=100)
+        exchange.client.get_historical_klines.assert_not_called()
+        np.testing.assert_array_equal(frame['close'].to_numpy(), self.minutes['close'][-100:])
+        self.assertEqual(frame.attrs, {'symbol': 'BTCUSDT', 'interval': '1m'})
+
+
+if __name__ == '__main__':
+    unittest.main()
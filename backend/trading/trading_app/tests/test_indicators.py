@@ -0,0 +1,475 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from .test_backtest import make_ohlcv
+from ..backtesting.portfolio_engine import build_panel
+from ..indicators.base import SIGNAL_CODES
+from ..indicators.cache import IndicatorCache, close_ema, data_version, macd_line, macd_signal, sma_rsi
+from ..indicators.composite_analysis import CompositeAnalysis
+from ..indicators.graph import SeriesGraph
+from ..indicators.kernels import (bollinger_bands, emas, macd_signals,
+                                  rolling_means, rolling_stds, sma_rsis)
+from ..indicators.momentum import MACD, RSI
+from ..indicators.panel import PanelAnalysis, PanelGraph, panel_frame
+from ..indicators.precision import precision_report
+from ..indicators.smoothing import ema, rolling_std, sma, wilder
+from ..indicators.streaming import (StreamingADX, StreamingBollingerBands,
+                                    StreamingMACD, StreamingOBV, StreamingRSI)
+from ..indicators.trend import ADX
+from ..indicators.volatility import BollingerBands
+from ..indicators.volume import DIVERGENCE_NAMES, OBV
+from ..strategies.technical_analysis import TechnicalAnalysis
+
+
+def default_indicators():
+    return {
+        'RSI': RSI(period=14, oversold=30, overbought=70),
+        'MACD': MACD(fast_period=12, slow_period=26, signal_period=9),
+        'BollingerBands': BollingerBands(period=20, num_std=2.0),
+        'ADX': ADX(period=14, threshold=25),
+        'OBV': OBV(smooth_period=20)
+    }
+
+
+class TestIndicatorSeries(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(300)
+        self.indicators = default_indicators()
+
+    def test_series_matches_calculate(self):
+        """Chaque barre de la série correspond à calculate() sur l'historique tronqué"""
+        for name, indicator in self.indicators.items():
+            series = indicator.calculate_series(self.data)
+            self.assertEqual(len(series), len(self.data))
+
+            for end in (60, 120, 199, 299):
+                expected = indicator.calculate(self.data.iloc[:end + 1])
+                actual = series.at(end)
+                with self.subTest(indicator=name, bar=end):
+                    np.testing.assert_allclose(actual.value, expected.value, rtol=1e-9)
+                    np.testing.assert_allclose(actual.strength, expected.strength, rtol=1e-9)
+                    self.assertEqual(actual.signal, expected.signal)
+
+    def test_combined_signal_series(self):
+        """Le signal combiné vectoriel reproduit get_combined_signal"""
+        analyzer = CompositeAnalysis(self.indicators)
+        combined = analyzer.get_combined_signal_series(
+            analyzer.analyze_series(self.data)
+        )
+
+        for end in (80, 150, 299):
+            expected = analyzer.get_combined_signal(
+                analyzer.analyze(self.data.iloc[:end + 1])
+            )
+            with self.subTest(bar=end):
+                self.assertEqual(combined['signal'][end], SIGNAL_CODES[expected['signal']])
+                np.testing.assert_allclose(combined['strength'][end], expected['strength'], rtol=1e-9)
+                np.testing.assert_allclose(combined['confidence'][end], expected['confidence'], rtol=1e-9)
+
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(260).reset_index(drop=True)
+        self.pairs = {
+            'RSI': (RSI(14, 30, 70), StreamingRSI(14, 30, 70)),
+            'MACD': (MACD(12, 26, 9), StreamingMACD(12, 26, 9)),
+            'BollingerBands': (BollingerBands(20, 2.0), StreamingBollingerBands(20, 2.0)),
+            'ADX': (ADX(14, 25), StreamingADX(14, 25)),
+            'OBV': (OBV(20), StreamingOBV(20))
+        }
+
+    def assertResultsClose(self, actual, expected):
+        np.testing.assert_allclose(actual.value, expected.value, rtol=1e-8)
+        np.testing.assert_allclose(actual.strength, expected.strength, rtol=1e-8)
+        self.assertEqual(actual.signal, expected.signal)
+        for key, value in (expected.additional_data or {}).items():
+            if isinstance(value, str):
+                self.assertEqual(actual.additional_data[key], value)
+            else:
+                np.testing.assert_allclose(actual.additional_data[key], value, rtol=1e-8)
+
+    def test_updates_match_batch(self):
+        """Les mises à jour incrémentales égalent calculate() barre par barre"""
+        warmup_size = 200
+        for name, (batch, streaming) in self.pairs.items():
+            streaming.warmup(self.data.iloc[:warmup_size])
+            for end in range(warmup_size, len(self.data)):
+                bar = self.data.iloc[end].to_dict()
+                result = streaming.update(bar, end)
+                if end % 10 == 0 or end == len(self.data) - 1:
+                    with self.subTest(indicator=name, bar=end):
+                        self.assertResultsClose(
+                            result, batch.calculate(self.data.iloc[:end + 1])
+                        )
+
+    def test_revised_bar(self):
+        """Une barre révisée (même horodatage) remplace la valeur provisoire"""
+        for name, (batch, streaming) in self.pairs.items():
+            streaming.warmup(self.data.iloc[:-1])
+            final_bar = self.data.iloc[-1].to_dict()
+            provisional = {key: value * 1.01 for key, value in final_bar.items()}
+
+            streaming.update(provisional, len(self.data) - 1)
+            result = streaming.update(final_bar, len(self.data) - 1)
+            with self.subTest(indicator=name):
+                self.assertResultsClose(result, batch.calculate(self.data))
+
+    def test_smoothings_match_batch(self):
+        """RSI et ADX incrémentaux suivent le lissage demandé"""
+        for smoothing in ('sma', 'wilder', 'wilder_exact'):
+            pairs = {
+                'RSI': (RSI(14, 30, 70, smoothing=smoothing), StreamingRSI(14, 30, 70, smoothing=smoothing)),
+                'ADX': (ADX(14, 25, smoothing=smoothing), StreamingADX(14, 25, smoothing=smoothing))
+            }
+            for name, (batch, streaming) in pairs.items():
+                streaming.reset()
+                for end in range(len(self.data)):
+                    bar = self.data.iloc[end].to_dict()
+                    streaming.update({key: value * 1.01 for key, value in bar.items()}, end)
+                    result = streaming.update(bar, end)
+                    if end in (5, 20, 40) or end % 50 == 0 or end == len(self.data) - 1:
+                        with self.subTest(indicator=name, smoothing=smoothing, bar=end):
+                            self.assertResultsClose(result, batch.calculate(self.data.iloc[:end + 1]))
+
+    def test_repeated_revisions(self):
+        """Plusieurs révisions par barre, fenêtres pleines ou non, puis barres suivantes"""
+        for name, (batch, streaming) in self.pairs.items():
+            streaming.reset()
+            for end in range(len(self.data)):
+                bar = self.data.iloc[end].to_dict()
+                for factor in (1.02, 0.97, 1.01):
+                    streaming.update({key: value * factor for key, value in bar.items()}, end)
+                result = streaming.update(bar, end)
+            with self.subTest(indicator=name):
+                self.assertResultsClose(result, batch.calculate(self.data))
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(300).reset_index(drop=True)
+        self.data.attrs.update(symbol='BTCUSDT', interval='1h')
+        self.cache = IndicatorCache()
+
+    def test_shared_between_strategies(self):
+        first = TechnicalAnalysis(None, indicator_cache=self.cache)
+        second = TechnicalAnalysis(None, indicator_cache=self.cache)
+
+        rsi = first.calculate_rsi(self.data)
+        self.assertEqual(second.calculate_rsi(self.data), rsi)
+        self.assertEqual(TechnicalAnalysis(None).calculate_rsi(self.data), rsi)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        sma = first.calculate_sma(self.data, 20)
+        with self.assertRaises(ValueError):
+            sma.to_numpy()[0] = 1.0
+
+        # Nouvelle barre: les séries sont recalculées
+        first.calculate_rsi(self.data.iloc[:-1])
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_revised_values_invalidate(self):
+        analysis = CompositeAnalysis(default_indicators(), self.cache)
+        analysis.analyze_series(self.data)
+
+        # Bougie en cours révisée (plus haut et volume, même clôture)
+        revised = self.data.copy()
+        revised.attrs.update(self.data.attrs)
+        revised.loc[revised.index[-1], ['high', 'volume']] *= 1.5
+        misses = self.cache.misses
+        analysis.analyze_series(revised)
+        self.assertEqual(self.cache.misses, misses + len(default_indicators()))
+
+        # Même révision appliquée en place
+        analysis.analyze_series(self.data)
+        misses = self.cache.misses
+        self.data.loc[self.data.index[-1], 'low'] *= 0.5
+        analysis.analyze_series(self.data)
+        self.assertEqual(self.cache.misses, misses + len(default_indicators()))
+
+        # Barre intérieure différente, mêmes bornes et même dernière clôture
+        interior = self.data.copy()
+        interior.attrs.update(self.data.attrs)
+        interior.loc[interior.index[100], 'close'] += 1
+        self.assertNotEqual(data_version(interior), data_version(self.data))
+
+    def test_composite_analysis_reuses_results(self):
+        analyzers = [CompositeAnalysis(default_indicators(), self.cache) for _ in range(2)]
+        results = [analyzer.analyze(self.data) for analyzer in analyzers]
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], CompositeAnalysis(default_indicators()).analyze(self.data))
+        self.assertEqual(self.cache.stats()['hits'], 5)
+
+
+class TestSeriesGraph(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(300)
+
+    def test_shared_graph_matches_separate_series(self):
+        indicators = default_indicators()
+        indicators['BollingerBands_3'] = BollingerBands(num_std=3)
+        analyzer = CompositeAnalysis(indicators)
+
+        shared = analyzer.analyze_series(self.data)
+        for name, indicator in indicators.items():
+            separate = indicator.calculate_series(self.data)
+            with self.subTest(indicator=name):
+                np.testing.assert_array_equal(shared[name].value, separate.value)
+                np.testing.assert_array_equal(shared[name].signal, separate.signal)
+                np.testing.assert_array_equal(shared[name].strength, separate.strength)
+
+    def test_each_node_evaluated_once(self):
+        indicators = default_indicators()
+        indicators['BollingerBands_3'] = BollingerBands(num_std=3)
+        nodes = [node for indicator in indicators.values() for node in indicator.dependencies()]
+
+        graph = CompositeAnalysis(indicators).build_graph(self.data)
+        self.assertEqual(graph.evaluations, len(SeriesGraph.plan(nodes)))
+
+        separate = 0
+        for indicator in indicators.values():
+            indicator_graph = SeriesGraph(self.data)
+            indicator.calculate_series(self.data, indicator_graph)
+            separate += indicator_graph.evaluations
+        self.assertLess(graph.evaluations, separate)
+
+        # Seuls les nœuds demandés restent en mémoire
+        self.assertEqual(set(graph.values), set(nodes))
+
+
+class TestIndicatorKernels(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(500)
+        self.close = self.data['close']
+
+    def assertColumnsEqual(self, matrix, expected, rtol=1e-9, atol=1e-9):
+        np.testing.assert_allclose(matrix, np.column_stack(expected), rtol=rtol, atol=atol)
+
+    def test_rolling_and_ema_matrices_match_pandas(self):
+        windows = [2, 5, 14, 20, 50]
+        self.assertColumnsEqual(rolling_means(self.close, windows),
+                                [self.close.rolling(w).mean() for w in windows])
+        self.assertColumnsEqual(rolling_stds(self.close, windows),
+                                # pandas accumule lui-même une erreur d'arrondi
+                                [self.close.rolling(w).std() for w in windows], rtol=1e-6, atol=1e-7)
+
+        spans = [1, 2, 9, 12, 26, 200]
+        self.assertColumnsEqual(emas(self.close, spans),
+                                [self.close.ewm(span=s, adjust=False).mean() for s in spans])
+
+    def test_indicator_matrices(self):
+        periods = [7, 14, 21]
+        self.assertColumnsEqual(sma_rsis(self.close, periods),
+                                [sma_rsi(self.data, p) for p in periods])
+
+        combinations = [(12, 26, 9), (12, 26, 5), (8, 30, 9)]
+        self.assertColumnsEqual(macd_signals(self.close, combinations),
+                                [macd_signal(self.data, *c) for c in combinations])
+
+        bands = bollinger_bands(self.close, [20, 30], [2.0, 3.0])
+        self.assertEqual(bands['upper'].shape, (len(self.close), 2, 2))
+        expected = BollingerBands(period=30, num_std=3.0).calculate_series(
+            self.data.assign(high=self.close, low=self.close)
+        )
+        np.testing.assert_allclose(bands['upper'][:, 1, 1],
+                                   expected.additional_data['upper'], rtol=1e-6)
+
+    def test_preload_serves_series(self):
+        data = self.data.reset_index(drop=True)
+        data.attrs.update(symbol='BTCUSDT', interval='1h')
+        cache = IndicatorCache()
+
+        matrix = cache.preload('BTCUSDT', '1h', data, 'rsi', [{'period': p} for p in (7, 14, 21)])
+        self.assertEqual(matrix.shape, (len(data), 3))
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+        rsi = TechnicalAnalysis(None, indicator_cache=cache).calculate_rsi(data, period=14)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        np.testing.assert_allclose(rsi, sma_rsi(data, 14).iloc[-1], rtol=1e-9)
+
+
+class TestSmoothingKernels(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(400)
+        close = self.data['close'].to_numpy()
+        # NaN de tête et en cours de série
+        close[:3] = np.nan
+        close[[50, 51, 200]] = np.nan
+        self.close = pd.Series(close)
+
+    def assertMatches(self, actual, expected, rtol=1e-9, atol=0):
+        np.testing.assert_array_equal(np.isnan(actual), expected.isna().to_numpy())
+        np.testing.assert_allclose(actual, expected.to_numpy(), rtol=rtol, atol=atol)
+
+    def test_filters_match_pandas(self):
+        close = self.close
+        for window in (1, 5, 20):
+            self.assertMatches(sma(close, window), close.rolling(window).mean())
+        for window in (2, 5, 20):
+            self.assertMatches(rolling_std(close, window), close.rolling(window).std(), rtol=1e-6, atol=1e-7)
+        for span in (1, 9, 26, 200):
+            self.assertMatches(ema(close, span), close.ewm(span=span, adjust=False, ignore_na=True).mean())
+            self.assertMatches(ema(close, span, adjust=True), close.ewm(span=span, ignore_na=True).mean())
+        self.assertMatches(wilder(close, 14), close.ewm(alpha=1 / 14, adjust=False, ignore_na=True).mean())
+
+    def test_matrices_and_single_series_agree(self):
+        """Un seul calcul: les filtres à un paramètre sont une colonne des noyaux"""
+        windows = [2, 5, 20]
+        np.testing.assert_array_equal(rolling_means(self.close, windows),
+                                      np.column_stack([sma(self.close, w) for w in windows]))
+        np.testing.assert_array_equal(rolling_stds(self.close, windows),
+                                      np.column_stack([rolling_std(self.close, w) for w in windows]))
+        for window in windows:
+            self.assertMatches(rolling_means(self.close, [window])[:, 0], self.close.rolling(window).mean())
+
+        known = self.close.dropna().to_numpy()
+        np.testing.assert_array_equal(emas(known, [1, 9, 26]),
+                                      np.column_stack([ema(known, s) for s in (1, 9, 26)]))
+
+    def test_exact_wilder_seed(self):
+        values = np.array([np.nan, 1.0, 2.0, 3.0, 4.0, 10.0, 6.0])
+        smoothed = wilder(values, 4, exact=True)
+        self.assertTrue(np.isnan(smoothed[:4]).all())
+        self.assertEqual(smoothed[4], 2.5)
+        self.assertAlmostEqual(smoothed[5], (2.5 * 3 + 10.0) / 4)
+        self.assertAlmostEqual(smoothed[6], (smoothed[5] * 3 + 6.0) / 4)
+
+    def test_wilder_indicators(self):
+        data = make_ohlcv(300)
+        for smoothing in ('wilder', 'wilder_exact'):
+            for indicator in (RSI(smoothing=smoothing), ADX(smoothing=smoothing)):
+                series = indicator.calculate_series(data)
+                for end in (80, 299):
+                    expected = indicator.calculate(data.iloc[:end + 1])
+                    with self.subTest(indicator=type(indicator).__name__, smoothing=smoothing, bar=end):
+                        np.testing.assert_allclose(series.at(end).value, expected.value, rtol=1e-9)
+                        self.assertEqual(series.at(end).signal, expected.signal)
+
+        # RSI de Wilder usuel: gains et pertes lissés par ewm(alpha=1/période)
+        delta = data['close'].diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+        expected = 100 - 100 / (1 + gain / loss)
+        np.testing.assert_allclose(RSI(smoothing='wilder').calculate_series(data).value,
+                                   expected.to_numpy(), rtol=1e-9)
+
+        with self.assertRaises(ValueError):
+            ADX(smoothing='median')
+
+
+class TestObvDivergence(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(300)
+        # Prix plat: variations nulles dans la fenêtre
+        self.data.loc[self.data.index[100:110], 'close'] = self.data['close'].iloc[100]
+
+    def test_history_matches_calculate(self):
+        for window in (5, 12):
+            indicator = OBV(divergence_window=window)
+            codes = indicator.divergence_series(self.data)
+            self.assertEqual(codes.shape, (len(self.data),))
+            for end in (1, 3, 60, 105, 299):
+                expected = indicator.calculate(self.data.iloc[:end + 1]).additional_data['divergence']
+                with self.subTest(window=window, bar=end):
+                    self.assertEqual(DIVERGENCE_NAMES[int(codes[end])], expected)
+
+    def test_panel_columns(self):
+        frames = {'S0': self.data, 'S1': make_ohlcv(300, seed=3)}
+        late = make_ohlcv(150, seed=5)
+        late.index = self.data.index[150:]
+        frames['LATE'] = late
+        panel = build_panel(frames, ['open', 'high', 'low', 'close', 'volume'])
+        data = panel_frame(panel)
+
+        codes = OBV().divergence_series(data, PanelGraph(data))
+        self.assertEqual(codes.shape, panel['close'].shape)
+        for j, (symbol, frame) in enumerate(frames.items()):
+            offset = len(data) - len(frame)
+            with self.subTest(symbol=symbol):
+                np.testing.assert_array_equal(codes[offset:, j], OBV().divergence_series(frame))
+                self.assertTrue((codes[:offset, j] == 0).all())
+
+
+class TestPanelAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.frames = {f'S{i}': make_ohlcv(300, seed=i) for i in range(3)}
+        # Symbole coté plus tard: barres absentes en début de panel
+        late = make_ohlcv(200, seed=7)
+        late.index = self.frames['S0'].index[100:]
+        self.frames['LATE'] = late
+        self.panel = build_panel(self.frames, ['open', 'high', 'low', 'close', 'volume'])
+        self.analysis = PanelAnalysis(default_indicators())
+
+    def test_columns_match_per_symbol_series(self):
+        series = self.analysis.analyze_series(self.panel)
+        for j, (symbol, frame) in enumerate(self.frames.items()):
+            offset = len(self.panel['close']) - len(frame)
+            for name, indicator in default_indicators().items():
+                expected = indicator.calculate_series(frame)
+                actual = series[name].column(j)
+                with self.subTest(symbol=symbol, indicator=name):
+                    np.testing.assert_allclose(actual.value[offset:], expected.value, rtol=1e-7, atol=1e-12)
+                    np.testing.assert_allclose(actual.strength[offset:], expected.strength, rtol=1e-6)
+                    np.testing.assert_array_equal(actual.signal[offset:], expected.signal)
+                    self.assertTrue((actual.signal[:offset] == 0).all())
+
+    def test_results_and_signal_matrix(self):
+        results = self.analysis.analyze(self.panel)
+        signals = self.analysis.signal_matrix(self.panel)
+        self.assertEqual(signals.shape, self.panel['close'].shape)
+
+        composite = CompositeAnalysis(default_indicators())
+        for symbol, frame in self.frames.items():
+            series = composite.analyze_series(frame)
+            self.assertEqual(results[symbol]['RSI'].signal, series['RSI'].at(-1).signal)
+            np.testing.assert_allclose(results[symbol]['MACD'].value, series['MACD'].at(-1).value, rtol=1e-7)
+
+            expected = composite.get_combined_signal_series(series)['signal']
+            np.testing.assert_array_equal(signals[symbol].loc[frame.index].to_numpy(), expected)
+
+
+class TestCompactPrecision(unittest.TestCase):
+    def setUp(self):
+        self.data = make_ohlcv(500)
+
+    def test_float32_series(self):
+        compact = CompositeAnalysis(default_indicators(), dtype=np.float32).analyze_series(self.data)
+        reference = CompositeAnalysis(default_indicators()).analyze_series(self.data)
+        for name, series in compact.items():
+            with self.subTest(indicator=name):
+                self.assertEqual(series.value.dtype, np.float32)
+                self.assertEqual(series.strength.dtype, np.float32)
+                np.testing.assert_allclose(series.value, reference[name].value, rtol=1e-3, atol=1e-3)
+
+    def test_cache_keeps_precisions_apart(self):
+        data = self.data.copy()
+        data.attrs.update(symbol='BTCUSDT', interval='1h')
+        cache = IndicatorCache()
+        CompositeAnalysis(default_indicators(), cache).analyze_series(data)
+        compact = CompositeAnalysis(default_indicators(), cache, dtype=np.float32).analyze_series(data)
+        self.assertEqual(compact['RSI'].value.dtype, np.float32)
+        self.assertEqual(cache.hits, 0)
+
+    def test_precision_report(self):
+        report = precision_report(self.data, default_indicators())
+        self.assertEqual(list(report.index), list(default_indicators()) + ['combined'])
+        self.assertTrue((report.loc[list(default_indicators()), 'dtype'] == 'float32').all())
+        self.assertTrue(np.isfinite(report['max_strength_deviation']).all())
+        self.assertLess(report['signal_mismatch_rate'].max(), 0.01)
+
+    def test_macd_line_before_cast(self):
+        # Prix élevés: l'écart des EMA en float32 perd ses derniers chiffres
+        data = self.data.assign(close=self.data['close'] + 60000)
+        reference = (close_ema(data, 12) - close_ema(data, 26)).to_numpy()
+        compact = macd_line(data).to_numpy().astype(np.float32)
+        np.testing.assert_allclose(compact, reference, rtol=1e-6, atol=1e-5)
+        np.testing.assert_array_equal(
+            macd_signal(data).to_numpy(),
+            ema(reference, 9)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()